@@ -0,0 +1,63 @@
+"""add_jobs
+
+Revision ID: b7e2c4d91a3f
+Revises: 644e26c223b7
+Create Date: 2026-10-18 10:12:41.508233
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+from app.infrastructure.db.types import JsonType
+
+# revision identifiers, used by Alembic.
+revision: str = "b7e2c4d91a3f"
+down_revision: Union[str, Sequence[str], None] = "644e26c223b7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "jobs",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("owner_user_id", sa.UUID(), nullable=False),
+        sa.Column("dataset_id", sa.UUID(), nullable=True),
+        sa.Column("kind", sa.String(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("progress_percent", sa.Float(), nullable=False),
+        sa.Column("request_json", JsonType(), nullable=False),
+        sa.Column("result_json", JsonType(), nullable=True),
+        sa.Column("error", sa.String(), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(
+            ["dataset_id"],
+            ["datasets.id"],
+            ondelete="SET NULL",
+        ),
+        sa.ForeignKeyConstraint(
+            ["owner_user_id"],
+            ["users.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("jobs")
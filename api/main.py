@@ -4,7 +4,7 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 import app.infrastructure.db.models  # noqa: F401
-from api.routes import auth, data, datasets, rules, runs, simulation, users
+from api.routes import auth, data, datasets, jobs, rules, runs, simulation, users
 from app.core.settings import settings
 
 
@@ -41,3 +41,4 @@ app.include_router(simulation.router)
 app.include_router(data.router)
 app.include_router(datasets.router)
 app.include_router(runs.router)
+app.include_router(jobs.router)
@@ -4,9 +4,11 @@ from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
 from sqlalchemy.orm import Session
 
 from api.dependencies import get_current_user
+from api.routes.jobs import enqueue_job, serialize_job
 from app.application.dataset_service import DatasetService
 from app.application.dataset_simulation_models import DatasetSimulateRequest
 from app.application.dataset_sweep_service import DatasetSweepService
+from app.application.job_service import JobService
 from app.domain.simulation.rules import RuleCompileError
 from app.infrastructure.db.session import get_db
 from app.infrastructure.persistence_models.user import User
@@ -127,6 +129,27 @@ def simulate_dataset(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post("/{dataset_id}/simulate/jobs", status_code=202)
+def submit_simulation_job(
+    dataset_id: UUID,
+    payload: DatasetSimulateRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    service = JobService(db, enqueue=enqueue_job)
+
+    try:
+        job = service.submit_simulation(
+            dataset_id=dataset_id,
+            owner_user_id=current_user.id,
+            payload=payload,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return serialize_job(job)
+
+
 @router.get("/{dataset_id}/distinct-values")
 def get_distinct_values(
     dataset_id: UUID,
@@ -170,6 +193,36 @@ def run_dataset_sweep(
             base_request=body.base_request,
             grid=body.grid,
             persist_runs=body.persist_runs,
+            result_mode=body.result_mode,
+            execution=body.execution,
+            max_workers=body.max_workers,
+            search_mode=body.search_mode,
+            halving_stages=body.halving_stages,
+            halving_keep_fraction=body.halving_keep_fraction,
+            halving_metric=body.halving_metric,
+            halving_metric_order=body.halving_metric_order,
+            top_k=body.top_k,
         )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/{dataset_id}/sweeps/jobs", status_code=202)
+def submit_dataset_sweep_job(
+    dataset_id: UUID,
+    body: DatasetSweepRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    service = JobService(db, enqueue=enqueue_job)
+
+    try:
+        job = service.submit_sweep(
+            dataset_id=dataset_id,
+            owner_user_id=current_user.id,
+            body=body,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return serialize_job(job)
@@ -0,0 +1,49 @@
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from api.dependencies import get_current_user
+from app.application.job_service import JobService
+from app.infrastructure.db.session import get_db
+from app.infrastructure.persistence_models.job import Job
+from app.infrastructure.persistence_models.user import User
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+def enqueue_job(job_id: str) -> None:
+    # Imported lazily so the API process only needs Celery to submit jobs.
+    from worker.tasks import run_job
+
+    run_job.delay(job_id)
+
+
+def serialize_job(job: Job) -> dict:
+    return {
+        "job_id": str(job.id),
+        "kind": job.kind,
+        "status": job.status,
+        "progress_percent": job.progress_percent,
+        "dataset_id": str(job.dataset_id) if job.dataset_id else None,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "updated_at": job.updated_at.isoformat() if job.updated_at else None,
+        "result": job.result_json,
+        "error": job.error,
+    }
+
+
+@router.get("/{job_id}")
+def get_job(
+    job_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    service = JobService(db)
+
+    try:
+        job = service.get_job(job_id=job_id, owner_user_id=current_user.id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    return serialize_job(job)
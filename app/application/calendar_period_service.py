@@ -8,7 +8,7 @@ from typing import Any
 
 from app.application.strategy_factory import build_strategy
 from app.domain.simulation.config import SimulationConfig
-from app.domain.simulation.context import RollingContext
+from app.domain.simulation.context import DEFAULT_WINDOW_SIZE, RollingContext
 
 DAY_TO_INDEX = {
     "mon": 0,
@@ -285,7 +285,11 @@ class CalendarPeriodService:
         self, period_matches, config: SimulationConfig
     ) -> list[PeriodCandidate]:
         strategy = build_strategy(config)
-        context = RollingContext(window_size=5)
+        update_context = getattr(strategy, "uses_context", True)
+        context = RollingContext(
+            window_size=DEFAULT_WINDOW_SIZE,
+            extra_windows=getattr(strategy, "rolling_windows", frozenset()),
+        )
         candidates: list[PeriodCandidate] = []
 
         for match in sorted(period_matches, key=lambda m: m.kickoff):
@@ -303,7 +307,8 @@ class CalendarPeriodService:
                     )
                 )
 
-            context.update(match)
+            if update_context:
+                context.update(match)
 
         return candidates
 
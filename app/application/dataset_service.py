@@ -5,14 +5,25 @@ import math
 import os
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 
 from app.application.calendar_period_service import CalendarPeriodService
-from app.application.in_memory_dataset_loader import load_matches_from_csv
+from app.application.in_memory_dataset_loader import (
+    iter_match_frames_from_csv,
+    load_match_frame_from_csv,
+)
+from app.application.match_frame_sidecar import delete_sidecars
+from app.application.simulation_result_cache import (
+    dataset_fingerprint,
+    invalidate_dataset_file,
+    result_cache,
+    result_cache_key,
+)
 from app.application.strategy_factory import build_strategy
 from app.application.walk_forward_service import WalkForwardService
 from app.domain.simulation.config import SimulationConfig
 from app.domain.simulation.engine import SimulationEngine
+from app.domain.simulation.match_frame import MatchFrame
 from app.infrastructure.persistence_models.dataset import Dataset
 from app.infrastructure.persistence_models.simulation_run import SimulationRun
 from app.infrastructure.repositories.simulation_run_repository import (
@@ -20,6 +31,9 @@ from app.infrastructure.repositories.simulation_run_repository import (
 )
 
 UPLOAD_ROOT = Path(os.getenv("UPLOAD_ROOT", "app/data/uploads"))
+# Datasets at least this large are simulated from a kickoff-ordered stream
+# instead of being loaded into memory whole.
+STREAMING_MIN_BYTES = int(os.getenv("STREAMING_MIN_BYTES", str(256 * 1024 * 1024)))
 
 
 @dataclass(frozen=True)
@@ -82,6 +96,8 @@ class DatasetService:
         try:
             p = Path(ds.stored_path)
             if p.exists():
+                invalidate_dataset_file(p)
+                delete_sidecars(p)
                 p.unlink()
         except Exception:
             pass
@@ -161,6 +177,9 @@ class DatasetService:
         return out
 
     def _filter_matches_for_request(self, matches, request):
+        if isinstance(matches, MatchFrame):
+            return self._filter_frame_for_request(matches, request)
+
         filtered = matches
 
         if request.season:
@@ -186,27 +205,43 @@ class DatasetService:
 
         return filtered
 
-    def _validate_walk_forward_request(self, request):
-        if not request.walk_forward:
+    def _filter_frame_for_request(self, frame: MatchFrame, request) -> MatchFrame:
+        leagues = None
+        if request.leagues:
+            leagues = {
+                league.strip()
+                for league in request.leagues
+                if league and league.strip()
+            }
+        elif request.league:
+            leagues = {request.league.strip()}
+
+        return frame.filter_scope(
+            season=request.season.strip() if request.season else None,
+            leagues=leagues,
+        )
+
+    def _validate_walk_forward_request(self, config: SimulationConfig):
+        if not config.walk_forward_enabled:
             return
 
-        if not request.train_window_matches or not request.test_window_matches:
+        if not config.train_window_matches or not config.test_window_matches:
             raise ValueError(
                 "train_window_matches and test_window_matches are required when walk_forward=True"
             )
 
-        if request.train_window_matches <= 0 or request.test_window_matches <= 0:
+        if config.train_window_matches <= 0 or config.test_window_matches <= 0:
             raise ValueError("walk-forward window sizes must be positive")
 
-        if request.step_matches is not None and request.step_matches <= 0:
+        if config.step_matches is not None and config.step_matches <= 0:
             raise ValueError("step_matches must be positive")
 
-    def _validate_calendar_request(self, request):
-        if request.period_mode == "none":
+    def _validate_calendar_request(self, config: SimulationConfig):
+        if config.period_mode == "none":
             return
 
-        if request.period_mode == "custom":
-            if not request.custom_periods:
+        if config.period_mode == "custom":
+            if not config.custom_periods:
                 raise ValueError("custom_periods is required when period_mode='custom'")
 
     def _sanitize_json_value(self, value):
@@ -235,13 +270,51 @@ class DatasetService:
         request,
         persist: bool = True,
         runs_repo=None,
+        progress_callback: Callable[[int, int | None, dict], None] | None = None,
     ):
+        """
+        progress_callback(completed, total, snapshot) is called periodically
+        during plain (non walk-forward, non calendar) runs with the matches
+        processed so far, the match count (None when streaming) and the
+        engine's partial metrics.
+        """
         ds = self.get_owned_dataset(
             dataset_id=dataset_id,
             owner_user_id=owner_user_id,
         )
 
-        matches = load_matches_from_csv(
+        # A cached result skips loading the CSV altogether.
+        cache_key = self.result_cache_key(ds, mapping, request, "full")
+        cached = None if cache_key is None else result_cache.get(cache_key)
+        if cached is not None:
+            return self._finish_simulation(
+                dataset=ds,
+                owner_user_id=owner_user_id,
+                mapping=mapping,
+                request=request,
+                result=cached,
+                persist=persist,
+                runs_repo=runs_repo,
+            )
+
+        config = SimulationConfig.from_request(request)
+        if self._should_stream(ds, config):
+            result = self._simulate_streamed(
+                ds, mapping, request, config, progress_callback
+            )
+            if cache_key is not None:
+                result_cache.put(cache_key, result)
+            return self._finish_simulation(
+                dataset=ds,
+                owner_user_id=owner_user_id,
+                mapping=mapping,
+                request=request,
+                result=result,
+                persist=persist,
+                runs_repo=runs_repo,
+            )
+
+        matches = load_match_frame_from_csv(
             ds.stored_path,
             mapping=mapping,
             default_league=request.league,
@@ -258,8 +331,57 @@ class DatasetService:
             matches=matches,
             persist=persist,
             runs_repo=runs_repo,
+            progress_callback=progress_callback,
         )
 
+    def _should_stream(self, dataset, config: SimulationConfig) -> bool:
+        # Calendar periods need every match up front.
+        if config.period_mode != "none":
+            return False
+        try:
+            return os.path.getsize(dataset.stored_path) >= STREAMING_MIN_BYTES
+        except (OSError, TypeError, ValueError):
+            return False
+
+    def _simulate_streamed(
+        self,
+        dataset,
+        mapping,
+        request,
+        config: SimulationConfig,
+        progress_callback=None,
+    ):
+        """
+        Runs a plain or walk-forward simulation over scoped kickoff-ordered
+        batches from iter_match_frames_from_csv, so only a sort run and the
+        current batch (or walk-forward window) are held in memory.
+        """
+        self._validate_walk_forward_request(config)
+
+        batches = (
+            scoped
+            for batch in iter_match_frames_from_csv(
+                dataset.stored_path,
+                mapping=mapping,
+                default_league=request.league,
+                default_season=request.season,
+            )
+            if len(scoped := self._filter_frame_for_request(batch, request))
+        )
+
+        if config.walk_forward_enabled:
+            return WalkForwardService().run(batches, config, result_mode="full")
+
+        engine = SimulationEngine(
+            config,
+            build_strategy(config),
+            result_mode="full",
+            progress_callback=self._engine_progress(progress_callback, None),
+        )
+        # Settled bets keep their matches until the result is built; Match
+        # objects let each batch frame be freed once it has been processed.
+        return engine.run_batches(batch.to_matches() for batch in batches)
+
     def get_distinct_values(
         self,
         *,
@@ -301,6 +423,55 @@ class DatasetService:
 
         return sorted(values)
 
+    def run_simulation(
+        self,
+        *,
+        request,
+        matches,
+        result_mode: str = "full",
+        strategy=None,
+        progress_callback=None,
+    ):
+        """
+        Runs the simulation for already loaded matches; no database access.
+
+        request may also be a SimulationConfig (as sweeps pass).
+        progress_callback is as for simulate_dataset.
+        """
+        if isinstance(request, SimulationConfig):
+            config = request
+        else:
+            config = SimulationConfig.from_request(request)
+
+        self._validate_walk_forward_request(config)
+        self._validate_calendar_request(config)
+
+        if config.walk_forward_enabled:
+            return WalkForwardService().run(matches, config, result_mode=result_mode)
+
+        if config.period_mode != "none":
+            return CalendarPeriodService().run(matches, config)
+
+        if strategy is None:
+            strategy = build_strategy(config)
+        engine = SimulationEngine(
+            config,
+            strategy,
+            result_mode=result_mode,
+            progress_callback=self._engine_progress(
+                progress_callback, len(matches) if progress_callback else None
+            ),
+        )
+        return engine.run(matches)
+
+    @staticmethod
+    def _engine_progress(progress_callback, total: int | None):
+        if progress_callback is None:
+            return None
+        return lambda snapshot: progress_callback(
+            snapshot["matches_processed"], total, snapshot
+        )
+
     def simulate_loaded_matches(
         self,
         *,
@@ -311,21 +482,72 @@ class DatasetService:
         matches,
         persist: bool = True,
         runs_repo=None,
+        result_mode: str = "full",
+        strategy=None,
+        progress_callback=None,
     ):
-        self._validate_walk_forward_request(request)
-        self._validate_calendar_request(request)
+        """
+        strategy optionally overrides the rule strategy built from the request
+        for plain (non walk-forward, non calendar) runs, e.g. a ledger replay.
+
+        matches must be the dataset's rows loaded with ``mapping`` and scoped
+        to ``request``: results are cached by dataset content, mapping and
+        request (not by the matches themselves) unless a strategy is given.
+        """
+        cache_key = None
+        if strategy is None:
+            cache_key = self.result_cache_key(dataset, mapping, request, result_mode)
+
+        result = None if cache_key is None else result_cache.get(cache_key)
+        if result is None:
+            result = self.run_simulation(
+                request=request,
+                matches=matches,
+                result_mode=result_mode,
+                strategy=strategy,
+                progress_callback=progress_callback,
+            )
+            if cache_key is not None:
+                result_cache.put(cache_key, result)
 
-        config = SimulationConfig.from_request(request)
+        return self._finish_simulation(
+            dataset=dataset,
+            owner_user_id=owner_user_id,
+            mapping=mapping,
+            request=request,
+            result=result,
+            persist=persist,
+            runs_repo=runs_repo,
+        )
 
-        if config.walk_forward_enabled:
-            result = WalkForwardService().run(matches, config)
-        elif config.period_mode != "none":
-            result = CalendarPeriodService().run(matches, config)
-        else:
-            strategy = build_strategy(config)
-            engine = SimulationEngine(config, strategy)
-            result = engine.run(matches)
+    @staticmethod
+    def result_cache_key(dataset, mapping, request, result_mode: str):
+        """Result cache key for a run on this dataset, or None if uncacheable."""
+        try:
+            fingerprint = dataset_fingerprint(dataset.stored_path)
+        except (OSError, TypeError, ValueError):
+            return None
+        # Rows are loaded with the request's league/season as defaults.
+        return result_cache_key(
+            fingerprint,
+            mapping,
+            request,
+            result_mode,
+            default_league=request.league,
+            default_season=request.season,
+        )
 
+    def _finish_simulation(
+        self,
+        *,
+        dataset,
+        owner_user_id,
+        mapping,
+        request,
+        result,
+        persist: bool,
+        runs_repo,
+    ):
         if not persist:
             return {
                 "run_id": None,
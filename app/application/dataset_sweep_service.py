@@ -1,56 +1,199 @@
 import itertools
-from typing import Any
+import math
+import multiprocessing
+import os
+import uuid
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Iterable, Iterator, Sequence
 
 from app.application.dataset_service import DatasetService
-from app.application.in_memory_dataset_loader import load_matches_from_csv
+from app.application.in_memory_dataset_loader import load_match_frame_from_csv
+from app.application.parameter_sweep_service import (
+    ParameterSweepService,
+    SweepGrid,
+    SweepRowCollector,
+)
+from app.application.simulation_result_cache import (
+    dataset_fingerprint,
+    iter_cached_results,
+    result_cache_key,
+)
+from app.application.strategy_factory import build_strategy
+from app.domain.simulation.config import SimulationConfig
+from app.domain.simulation.ledger import DecisionLedger, ReplayStrategy
 from app.infrastructure.persistence_models.dataset import Dataset
 from app.infrastructure.persistence_models.simulation_run import SimulationRun
 from app.infrastructure.repositories.simulation_run_repository import (
     SimulationRunRepository,
 )
 
+SWEEP_EXECUTION_MODES = ("serial", "process")
+SWEEP_SEARCH_MODES = ("grid", "successive_halving")
+RUN_INSERT_BATCH_SIZE = 200
+MAX_TASK_CHUNKSIZE = 64
+
+
+def available_cores() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def chronological_prefix(matches, fraction: float):
+    """
+    First ``fraction`` of kickoff-ordered matches, extended to the end of the
+    kickoff it stops in so no kickoff batch is split.
+    """
+    n = len(matches)
+    end = min(n, max(1, math.ceil(n * fraction)))
+    while end < n and matches[end].kickoff == matches[end - 1].kickoff:
+        end += 1
+    return matches[:end]
+
+
+class _VariantRunner:
+    """
+    Runs sweep variants against one loaded dataset without touching the
+    database, so it can live in a worker process.
+
+    Scoped matches and decision ledgers are cached per runner.
+    """
+
+    def __init__(self, all_matches, decision_key_counts: Counter, result_mode: str):
+        self.all_matches = all_matches
+        self.decision_key_counts = decision_key_counts
+        self.result_mode = result_mode
+        self.dataset_service = DatasetService(None)
+        self.scoped_matches: dict[tuple, Any] = {}
+        self.ledgers: dict[tuple, DecisionLedger] = {}
+        self.prefixes: dict[tuple, Any] = {}
+
+    def run(
+        self, config: SimulationConfig, prefix_fraction: float = 1.0
+    ) -> dict[str, Any]:
+        scope_key = DatasetSweepService._scope_key(config)
+        matches = self.scoped_matches.get(scope_key)
+        if matches is None:
+            matches = self.dataset_service._filter_matches_for_request(
+                self.all_matches, config
+            )
+            self.scoped_matches[scope_key] = matches
+
+        # Variants sharing a decision key (typically staking-only grids)
+        # evaluate the rule once and replay the recorded decisions.
+        strategy = None
+        decision_key = DatasetSweepService._decision_key(config)
+        if decision_key is not None and self.decision_key_counts[decision_key] > 1:
+            ledger = self.ledgers.get(decision_key)
+            if ledger is None:
+                ledger = DecisionLedger.record(build_strategy(config), matches)
+                self.ledgers[decision_key] = ledger
+            strategy = ReplayStrategy(ledger)
+
+        # Ledgers are keyed by match id, so one recorded on the whole scope
+        # replays unchanged on any chronological prefix of it.
+        if prefix_fraction < 1.0:
+            prefix_key = (scope_key, prefix_fraction)
+            prefix = self.prefixes.get(prefix_key)
+            if prefix is None:
+                prefix = chronological_prefix(matches, prefix_fraction)
+                self.prefixes[prefix_key] = prefix
+            matches = prefix
+
+        return self.dataset_service.run_simulation(
+            request=config,
+            matches=matches,
+            result_mode=self.result_mode,
+            strategy=strategy,
+        )
+
+
+# Per-process runner for "process" execution; the dataset is shipped once per
+# worker through the pool initializer rather than with every variant.
+_worker_runner: _VariantRunner | None = None
+
+
+def _init_sweep_worker(all_matches, decision_key_counts, result_mode):
+    global _worker_runner
+    _worker_runner = _VariantRunner(all_matches, decision_key_counts, result_mode)
+
+
+def _run_sweep_variant(task) -> dict[str, Any]:
+    config, prefix_fraction = task
+    return _worker_runner.run(config, prefix_fraction)
+
 
 class DatasetSweepService:
     def __init__(self, db):
         self.db = db
         self.dataset_service = DatasetService(db)
 
-    def _generate_param_combinations(self, grid: dict[str, list[Any]]):
-        if not grid:
-            yield {}
-            return
+    def _filter_matches_for_request(self, matches, request):
+        return self.dataset_service._filter_matches_for_request(matches, request)
 
-        keys = list(grid.keys())
-        values = [grid[k] for k in keys]
+    @staticmethod
+    def _scope_key(config: SimulationConfig) -> tuple:
+        return (
+            config.season,
+            config.league,
+            tuple(config.leagues) if config.leagues else None,
+        )
 
-        for combination in itertools.product(*values):
-            yield dict(zip(keys, combination))
+    @classmethod
+    def _decision_key(cls, config: SimulationConfig) -> tuple | None:
+        """
+        Key of everything that decides which matches a rule selects, or None
+        when the variant can't replay a ledger (walk-forward and calendar
+        runs build their own strategies per segment/period).
+        """
+        if config.walk_forward_enabled or config.period_mode != "none":
+            return None
 
-    def _filter_matches_for_request(self, matches, request):
-        filtered = matches
+        return (config.rule_expression, config.selection, cls._scope_key(config))
+
+    @staticmethod
+    def _iter_variant_results(
+        tasks: Iterable[tuple[Any, float]],
+        *,
+        task_count: int,
+        all_matches,
+        decision_key_counts: Counter,
+        result_mode: str,
+        execution: str,
+        max_workers: int | None,
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Yields one simulation result per (config, prefix_fraction) task, in
+        task order.
+        """
+        workers = min(max_workers or available_cores(), task_count)
 
-        if request.season:
-            season = request.season.strip()
-            filtered = [m for m in filtered if m.season and m.season.strip() == season]
+        # Daemonic processes (e.g. Celery prefork workers) can't start a pool.
+        if (
+            execution == "serial"
+            or workers <= 1
+            or multiprocessing.current_process().daemon
+        ):
+            runner = _VariantRunner(all_matches, decision_key_counts, result_mode)
+            for config, prefix_fraction in tasks:
+                yield runner.run(config, prefix_fraction)
+            return
 
-        if request.leagues:
-            requested_leagues = {
-                league.strip()
-                for league in request.leagues
-                if league and league.strip()
-            }
-            filtered = [
-                m
-                for m in filtered
-                if m.league and m.league.strip() in requested_leagues
-            ]
-        elif request.league:
-            requested_league = request.league.strip()
-            filtered = [
-                m for m in filtered if m.league and m.league.strip() == requested_league
-            ]
-
-        return filtered
+        # "spawn" keeps workers independent of the web server's threads/locks.
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_sweep_worker,
+            initargs=(all_matches, decision_key_counts, result_mode),
+        ) as executor:
+            chunksize = min(MAX_TASK_CHUNKSIZE, max(1, task_count // (workers * 4)))
+            # Submitted a window at a time so huge grids never have every
+            # pending result in memory at once.
+            window = workers * chunksize * 4
+            for batch in itertools.batched(tasks, window):
+                yield from executor.map(_run_sweep_variant, batch, chunksize=chunksize)
 
     @staticmethod
     def _build_sweep_row(
@@ -83,72 +226,231 @@ class DatasetSweepService:
         base_request,
         grid: dict[str, list[Any]],
         persist_runs: bool = True,
+        result_mode: str = "summary",
+        execution: str = "serial",
+        max_workers: int | None = None,
+        progress_callback: Callable[[int, int, list[dict[str, Any]]], None]
+        | None = None,
+        search_mode: str = "grid",
+        halving_stages: Sequence[float] = (0.25, 0.5, 1.0),
+        halving_keep_fraction: float = 0.5,
+        halving_metric: str = "roi_percent",
+        halving_metric_order: str = "desc",
+        top_k: int | None = None,
     ):
+        """
+        Runs every grid variant. Rows only need summary metrics, so variants
+        run in result_mode="summary" unless full results are requested; runs
+        that are persisted are always simulated in "full" mode so they keep
+        their bets and equity curves.
+
+        execution="process" fans variants out to a process pool (max_workers,
+        default: available cores); runs are persisted in grid order either way.
+
+        progress_callback(completed, total, rows) is called after each variant
+        with the (unsorted) rows so far; with successive halving it is called
+        after each stage instead, with the stage number, the stage count and
+        that stage's rows.
+
+        With top_k only the best K rows by ROI are kept and returned, plus
+        ``other_variants`` aggregate stats for the rest; variants are generated
+        lazily and each result is dropped once its row and run are built.
+
+        search_mode="successive_halving" runs all variants on a chronological
+        prefix of the matches (halving_stages fractions), keeps the best
+        halving_keep_fraction by halving_metric for each longer prefix, and
+        only persists the variants that reach the full data.
+        """
+        if search_mode not in SWEEP_SEARCH_MODES:
+            raise ValueError(f"search_mode must be one of {list(SWEEP_SEARCH_MODES)}")
+        if execution not in SWEEP_EXECUTION_MODES:
+            raise ValueError(f"execution must be one of {list(SWEEP_EXECUTION_MODES)}")
+        if max_workers is not None and max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        collector = SweepRowCollector(top_k)
+        sweep_grid = SweepGrid(base_request, grid)
+
         ds: Dataset = self.dataset_service.get_owned_dataset(
             dataset_id=dataset_id,
             owner_user_id=owner_user_id,
         )
 
-        all_matches = load_matches_from_csv(
-            ds.stored_path,
-            mapping=mapping,
-            default_league=base_request.league,
-            default_season=base_request.season,
-        )
+        loaded_matches = None
+
+        def load_matches():
+            # Deferred so a sweep answered entirely from the result cache
+            # never parses the CSV.
+            nonlocal loaded_matches
+            if loaded_matches is None:
+                loaded_matches = load_match_frame_from_csv(
+                    ds.stored_path,
+                    mapping=mapping,
+                    default_league=base_request.league,
+                    default_season=base_request.season,
+                )
+            return loaded_matches
+
+        try:
+            fingerprint = dataset_fingerprint(ds.stored_path)
+        except (OSError, TypeError, ValueError):
+            fingerprint = None
 
         runs_repo = SimulationRunRepository(self.db)
-        rows: list[dict[str, Any]] = []
+        # Runs are buffered and inserted in batches with client-side ids.
+        pending_runs: list[SimulationRun] = []
+        mapping_json = mapping.model_dump()
+
+        def iter_variants(variants):
+            for variant in variants:
+                yield variant, sweep_grid.config_for(variant)
 
-        for params in self._generate_param_combinations(grid):
-            variant_request = base_request.model_copy(update=params)
-            matches = self._filter_matches_for_request(all_matches, variant_request)
+        # Also checks every combination before any variant runs.
+        total_variants = len(sweep_grid)
+        decision_key_counts = Counter(
+            self._decision_key(config)
+            for _, config in iter_variants(sweep_grid.variants())
+        )
+
+        # Persisted runs are ordinary runs (viewable, exportable), so they
+        # always carry bets and equity curves.
+        persisted_mode = "full" if persist_runs else result_mode
+
+        def iter_results(configs, task_count, mode, prefix_fraction=1.0):
+            configs = iter(configs)
+            first = next(configs, None)
+            if first is None:
+                return
+
+            yield from self._iter_variant_results(
+                (
+                    (config, prefix_fraction)
+                    for config in itertools.chain([first], configs)
+                ),
+                task_count=task_count,
+                all_matches=load_matches(),
+                decision_key_counts=decision_key_counts,
+                result_mode=mode,
+                execution=execution,
+                max_workers=max_workers,
+            )
 
-            simulation_result = self.dataset_service.simulate_loaded_matches(
-                dataset=ds,
+        def cached_results(variants, task_count, mode, prefix_fraction=1.0):
+            """(variant, result) pairs; only full-data runs are cached."""
+            return iter_cached_results(
+                variants,
+                key_for=lambda item: (
+                    result_cache_key(
+                        fingerprint,
+                        mapping,
+                        sweep_grid.request_json_for(item[0]),
+                        mode,
+                        default_league=base_request.league,
+                        default_season=base_request.season,
+                    )
+                    if fingerprint is not None and prefix_fraction == 1.0
+                    else None
+                ),
+                run=lambda misses: iter_results(
+                    (config for _, config in misses),
+                    task_count,
+                    mode,
+                    prefix_fraction,
+                ),
+            )
+
+        def new_run(variant, simulation_result) -> SimulationRun:
+            return SimulationRun(
+                id=uuid.uuid4(),
                 owner_user_id=owner_user_id,
-                mapping=mapping,
-                request=variant_request,
-                matches=matches,
-                persist=False,
-                runs_repo=None,
+                dataset_id=ds.id,
+                mapping_json=mapping_json,
+                request_json=sweep_grid.request_json_for(variant),
+                result_json=self.dataset_service._sanitize_result_for_storage(
+                    simulation_result
+                ),
             )
 
+        if search_mode == "successive_halving":
+            stages = list(halving_stages)
+
+            def run_stage(variants, prefix_fraction):
+                results = []
+                stage_rows = []
+                mode = persisted_mode if prefix_fraction == stages[-1] else result_mode
+                for (variant, _), result in cached_results(
+                    iter_variants(variants), len(variants), mode, prefix_fraction
+                ):
+                    result = {"run_id": None, "dataset_id": str(ds.id), **result}
+                    if persist_runs and prefix_fraction == stages[-1]:
+                        run = new_run(variant, result)
+                        pending_runs.append(run)
+                        result["run_id"] = str(run.id)
+                    results.append(result)
+                    stage_rows.append(
+                        self._build_sweep_row(
+                            params=variant.params,
+                            run_id=result["run_id"],
+                            simulation_result=result,
+                        )
+                    )
+
+                if pending_runs:
+                    runs_repo.create_many(
+                        pending_runs, batch_size=RUN_INSERT_BATCH_SIZE
+                    )
+                    pending_runs.clear()
+
+                if progress_callback is not None:
+                    stage = stages.index(prefix_fraction) + 1
+                    progress_callback(stage, len(stages), stage_rows)
+
+                return results
+
+            return ParameterSweepService().run_successive_halving(
+                sweep_grid=sweep_grid,
+                run_stage=run_stage,
+                stages=stages,
+                keep_fraction=halving_keep_fraction,
+                metric=halving_metric,
+                metric_order=halving_metric_order,
+                top_k=top_k,
+            )
+
+        for (variant, _), result in cached_results(
+            iter_variants(sweep_grid.variants()), total_variants, persisted_mode
+        ):
+            simulation_result = {
+                "run_id": None,
+                "dataset_id": str(ds.id),
+                **result,
+            }
+
             run_id = None
             if persist_runs:
-                sanitized_result = self.dataset_service._sanitize_result_for_storage(
-                    simulation_result
-                )
-
-                run = SimulationRun(
-                    owner_user_id=owner_user_id,
-                    dataset_id=ds.id,
-                    mapping_json=mapping.model_dump(),
-                    request_json=variant_request.model_dump(),
-                    result_json=sanitized_result,
-                )
-                run = runs_repo.create(run)
+                run = new_run(variant, simulation_result)
+                pending_runs.append(run)
                 run_id = str(run.id)
 
-            rows.append(
+                if len(pending_runs) >= RUN_INSERT_BATCH_SIZE:
+                    runs_repo.create_many(
+                        pending_runs, batch_size=RUN_INSERT_BATCH_SIZE
+                    )
+                    pending_runs.clear()
+
+            collector.add(
                 self._build_sweep_row(
-                    params=params,
+                    params=variant.params,
                     run_id=run_id,
                     simulation_result=simulation_result,
                 )
             )
 
-        rows.sort(
-            key=lambda row: (row.get("roi_percent") is None, row.get("roi_percent", 0)),
-            reverse=True,
-        )
+            if progress_callback is not None:
+                progress_callback(
+                    collector.count, total_variants, collector.kept_rows()
+                )
 
-        parameter_names = list(grid.keys())
+        if pending_runs:
+            runs_repo.create_many(pending_runs, batch_size=RUN_INSERT_BATCH_SIZE)
 
-        return {
-            "parameter_names": parameter_names,
-            "row_count": len(rows),
-            "rows": rows,
-            # Backward-compatible aliases for current frontend/tests.
-            "total_variants": len(rows),
-            "results": rows,
-        }
+        return collector.response(sweep_grid.parameter_names)
@@ -1,12 +1,25 @@
 import csv
-import uuid
-from dataclasses import asdict
+import heapq
+import math
+import tempfile
+from array import array
 from datetime import datetime
+from functools import partial
+from itertools import chain, islice, repeat
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator, Sequence
 
 from app.application.dataset_mapping import DatasetMapping
+from app.application.match_frame_sidecar import (
+    SIDECAR_SUFFIX,
+    read_sidecar,
+    sidecar_key,
+    sidecar_path,
+    write_sidecar,
+)
+from app.application.simulation_result_cache import dataset_fingerprint
 from app.domain.simulation.entities import Match
+from app.domain.simulation.match_frame import MatchFrame, MatchFrameBuilder
 
 
 def _parse_float(x: Any) -> float | None:
@@ -33,23 +46,101 @@ def _parse_int(x: Any) -> int | None:
         return None
 
 
-from datetime import datetime
+_MISSING_MARKERS = frozenset({"na", "nan", "null", "none"})
+
+# Rows converted per batch by the column-wise parser.
+PARSE_CHUNK_ROWS = 8192
+# Rows per in-memory sorted run of the streaming loader.
+SORT_RUN_ROWS = 200_000
+
+# Match ids are (fingerprint bits << MATCH_ID_ROW_BITS) | row offset.
+MATCH_ID_ROW_BITS = 32
+MATCH_ID_FINGERPRINT_BITS = 31
+
+
+def _float_or_none(value: str | None) -> float | None:
+    """_parse_float for a raw CSV field, trying float() first."""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    if number != number and value.strip().lower() in _MISSING_MARKERS:
+        return None
+    return number
+
+
+def _int_or_none(value: str | None) -> int | None:
+    """_parse_int for a raw CSV field, trying int() first."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return _parse_int(value)
+
+
+def _float_column(raw: Sequence[str | None]) -> list[float | None]:
+    """
+    _parse_float over a whole column.
+
+    map(float) runs at C speed for clean numeric columns; any blank, marker or
+    NaN cell (a NaN poisons the sum) falls back to the exact per-cell path.
+    """
+    try:
+        values = list(map(float, raw))
+    except (TypeError, ValueError):
+        return list(map(_float_or_none, raw))
+
+    total = sum(values)
+    if total != total:
+        return list(map(_float_or_none, raw))
+    return values
 
 
-def _parse_kickoff(row: dict[str, str], mapping: DatasetMapping) -> datetime:
+def _feature_column(raw: Sequence[str | None]) -> array:
+    # Missing features are stored as NaN, so float("nan") needs no special case.
+    try:
+        return array("d", map(float, raw))
+    except (TypeError, ValueError):
+        return array(
+            "d", (math.nan if v is None else v for v in map(_float_or_none, raw))
+        )
+
+
+def _int_column(raw: Sequence[str | None]) -> list[int | None]:
+    try:
+        return list(map(int, raw))
+    except (TypeError, ValueError):
+        return list(map(_int_or_none, raw))
+
+
+def _with_default(values: list, default) -> list:
+    """``value or default`` per cell, as the row loader applied it."""
+    return [value or default for value in values]
+
+
+def match_id_base(fingerprint: str) -> int:
+    """
+    High bits of the match ids for a dataset file: the top 31 bits of its
+    content fingerprint, so every id fits a signed int64 and the same row of
+    the same file gets the same id on every load.
+    """
+    bits = int(fingerprint, 16) >> (len(fingerprint) * 4 - MATCH_ID_FINGERPRINT_BITS)
+    return bits << MATCH_ID_ROW_BITS
+
+
+def _parse_kickoff_values(
+    date_value: str | None, time_value: str | None, mapping: DatasetMapping
+) -> datetime:
     if not mapping.result_col:
         raise ValueError(
             "result_col is required for backtesting (needed to settle bets)"
         )
 
-    date_str = (row.get(mapping.date_col) or "").strip()
+    date_str = (date_value or "").strip()
     if not date_str:
         raise ValueError(f"Missing date value in column '{mapping.date_col}'")
 
-    time_str = "00:00"
-    if mapping.time_col:
-        # If mapping specifies a time column but this file doesn't have it, default safely
-        time_str = (row.get(mapping.time_col) or "").strip() or "00:00"
+    # If mapping specifies a time column but this file doesn't have it, default safely
+    time_str = (time_value or "").strip() or "00:00"
 
     # If formats provided, use them
     if mapping.date_format and mapping.time_format:
@@ -66,111 +157,442 @@ def _parse_kickoff(row: dict[str, str], mapping: DatasetMapping) -> datetime:
         return datetime.fromisoformat(date_str)
 
 
-def load_matches_from_csv(
+def _iso_date(value: str) -> tuple[int, int, int] | None:
+    """YYYY-MM-DD"""
+    if len(value) == 10 and value[4] == "-" and value[7] == "-":
+        digits = value[:4] + value[5:7] + value[8:]
+        if digits.isascii() and digits.isdigit():
+            return int(value[:4]), int(value[5:7]), int(value[8:])
+    return None
+
+
+def _dmy_date(value: str) -> tuple[int, int, int] | None:
+    """DD/MM/YYYY"""
+    if len(value) == 10 and value[2] == "/" and value[5] == "/":
+        digits = value[:2] + value[3:5] + value[6:]
+        if digits.isascii() and digits.isdigit():
+            return int(value[6:]), int(value[3:5]), int(value[:2])
+    return None
+
+
+def _hm_time(value: str) -> tuple[int, int, int] | None:
+    """HH:MM"""
+    if len(value) == 5 and value[2] == ":":
+        digits = value[:2] + value[3:]
+        if digits.isascii() and digits.isdigit():
+            return int(value[:2]), int(value[3:]), 0
+    return None
+
+
+def _hms_time(value: str) -> tuple[int, int, int] | None:
+    """HH:MM:SS"""
+    if len(value) == 8 and value[2] == ":" and value[5] == ":":
+        digits = value[:2] + value[3:5] + value[6:]
+        if digits.isascii() and digits.isdigit():
+            return int(value[:2]), int(value[3:5]), int(value[6:])
+    return None
+
+
+# strptime formats with an exact slicing equivalent.
+_FAST_DATE_FORMATS = {"%Y-%m-%d": _iso_date, "%d/%m/%Y": _dmy_date}
+_FAST_TIME_FORMATS = {"%H:%M": (_hm_time,), "%H:%M:%S": (_hms_time,)}
+
+KICKOFF_SAMPLE_ROWS = 64
+# Distinct (date, time) pairs kept before the memo is reset, so streaming a
+# huge file with unique timestamps doesn't grow it without bound.
+KICKOFF_MEMO_SIZE = 1 << 16
+
+
+def _fast_kickoff_layout(mapping: DatasetMapping):
+    """
+    (date parser, time parsers) equivalent to _parse_kickoff_values for the
+    values they accept, or None when the mapping's formats have no fast path.
+    """
+    if not mapping.result_col:
+        return None
+
+    if mapping.date_format and mapping.time_format:
+        date_parser = _FAST_DATE_FORMATS.get(mapping.date_format)
+        time_parsers = _FAST_TIME_FORMATS.get(mapping.time_format)
+        if date_parser is None or time_parsers is None:
+            return None
+        return date_parser, time_parsers
+
+    # fromisoformat default
+    return _iso_date, (_hm_time, _hms_time)
+
+
+class _KickoffParser(dict):
+    """
+    Kickoff parsing for one load, memoized by the raw (date, time) strings.
+
+    Fixture files repeat a few thousand dates across many rows, so each
+    distinct pair is parsed once. Misses go through a slicing parser for the
+    layout implied by the mapping (ISO or dd/mm/yyyy dates, HH:MM[:SS]
+    times), kept only if it recognises at least half of a sample of the
+    first values; anything it doesn't recognise falls back to
+    _parse_kickoff_values, which defines the semantics and errors.
+    """
+
+    def __init__(self, mapping: DatasetMapping):
+        super().__init__()
+        self.mapping = mapping
+        self._layout = _fast_kickoff_layout(mapping)
+        self._sampled = False
+
+    def parse(self, dates: Sequence[str | None], times: Sequence[str | None]):
+        pairs = list(zip(dates, times))
+        if not self._sampled:
+            self._sampled = True
+            self._detect_layout(pairs[:KICKOFF_SAMPLE_ROWS])
+        if len(self) > KICKOFF_MEMO_SIZE:
+            self.clear()
+        return list(map(self.__getitem__, pairs))
+
+    def _detect_layout(self, sample: list[tuple[str | None, str | None]]) -> None:
+        if self._layout is None or not sample:
+            return
+        matched = sum(self._parse_fast(date, time) is not None for date, time in sample)
+        if matched * 2 < len(sample):
+            self._layout = None
+
+    def __missing__(self, key: tuple[str | None, str | None]) -> datetime:
+        date_value, time_value = key
+        kickoff = None
+        if self._layout is not None:
+            kickoff = self._parse_fast(date_value, time_value)
+        if kickoff is None:
+            kickoff = _parse_kickoff_values(date_value, time_value, self.mapping)
+        self[key] = kickoff
+        return kickoff
+
+    def _parse_fast(
+        self, date_value: str | None, time_value: str | None
+    ) -> datetime | None:
+        if not date_value:
+            return None
+        date_parser, time_parsers = self._layout
+        day = date_parser(date_value.strip())
+        if day is None:
+            return None
+
+        time_str = (time_value or "").strip() or "00:00"
+        for time_parser in time_parsers:
+            clock = time_parser(time_str)
+            if clock is not None:
+                break
+        else:
+            return None
+
+        try:
+            return datetime(*day, *clock)
+        except ValueError:
+            # Out-of-range fields: let the exact parser raise its own error.
+            return None
+
+
+def _missing_column(col: str, columns, n: int):
+    raise ValueError(f"Column '{col}' not found in dataset")
+
+
+class _ColumnPlan:
+    """
+    Mapping resolved against a CSV header once.
+
+    Each field gets a converter, chosen here, that turns a chunk of raw
+    columns (one tuple per CSV column) into that field's values, so nothing
+    re-checks the mapping per row. Required columns (teams, result, mapped
+    league/season) missing from the header raise ValueError once there are
+    rows to convert, so an empty file still loads as an empty frame;
+    optional ones behave as unmapped.
+    """
+
+    def __init__(
+        self,
+        header: list[str],
+        mapping: DatasetMapping,
+        default_league: str,
+        default_season: str,
+    ):
+        # Last occurrence wins for duplicate names, as with DictReader.
+        self.index = {name: i for i, name in enumerate(header)}
+
+        self.league = self._strings(mapping.league_col, default_league)
+        self.season = self._strings(mapping.season_col, default_season)
+        self.home_team = self._strings(mapping.home_team_col)
+        self.away_team = self._strings(mapping.away_team_col)
+        # result/goals optional (but engine needs result for settlement)
+        self.result = self._strings(mapping.result_col, "H")
+        self.home_goals = self._numbers(mapping.home_goals_col, _int_column, 0)
+        self.away_goals = self._numbers(mapping.away_goals_col, _int_column, 0)
+        # odds optional; if missing we set harmless defaults
+        self.home_odds = self._numbers(mapping.odds_home_col, _float_column, 2.0)
+        self.draw_odds = self._numbers(mapping.odds_draw_col, _float_column, 3.5)
+        self.away_odds = self._numbers(mapping.odds_away_col, _float_column, 4.0)
+        # model probs optional
+        self.model_home_prob = self._numbers(
+            mapping.model_home_prob_col, _float_column, None
+        )
+        self.model_draw_prob = self._numbers(
+            mapping.model_draw_prob_col, _float_column, None
+        )
+        self.model_away_prob = self._numbers(
+            mapping.model_away_prob_col, _float_column, None
+        )
+        self.kickoff = self._kickoffs(mapping)
+
+        self.feature_cols = [col for col in mapping.feature_cols if col in self.index]
+        self.feature_indices = [self.index[col] for col in self.feature_cols]
+
+    def _strings(self, col: str | None, default: str | None = None):
+        if not col:
+            return lambda columns, n: [default] * n
+
+        i = self.index.get(col)
+        if i is None:
+            return partial(_missing_column, col)
+        return lambda columns, n: [value.strip() for value in columns[i]]
+
+    def _numbers(self, col: str | None, convert, default):
+        i = self.index.get(col) if col else None
+        if i is None:
+            # Unmapped -> default; mapped but absent -> None -> default.
+            return lambda columns, n: [default] * n
+
+        if default is None:
+            return lambda columns, n: convert(columns[i])
+        return lambda columns, n: _with_default(convert(columns[i]), default)
+
+    def _kickoffs(self, mapping: DatasetMapping):
+        date_i = self.index.get(mapping.date_col)
+        time_i = self.index.get(mapping.time_col) if mapping.time_col else None
+
+        parser = _KickoffParser(mapping)
+
+        def kickoffs(columns, n):
+            dates = columns[date_i] if date_i is not None else [None] * n
+            times = columns[time_i] if time_i is not None else [None] * n
+            return parser.parse(dates, times)
+
+        return kickoffs
+
+
+def load_match_frame_from_csv(
     csv_path: str | Path,
     mapping: DatasetMapping,
     default_league: str = "Unknown",
     default_season: str = "Unknown",
-) -> list[Match]:
+    use_sidecar: bool = True,
+) -> MatchFrame:
+    """
+    Parses the CSV into a kickoff-sorted MatchFrame.
+
+    With use_sidecar the parsed frame is cached in a binary sidecar next to
+    the CSV (keyed by file content, mapping and defaults) and later loads
+    memory-map it instead of parsing. Match ids are ints derived from the
+    file's fingerprint and each row's offset (see match_id_base), so reloads
+    of the same file agree on them.
+    """
     csv_path = Path(csv_path)
+    try:
+        fingerprint = dataset_fingerprint(csv_path)
+    except OSError:
+        # Let the parser raise its usual error for a missing file.
+        fingerprint = None
 
-    matches: list[Match] = []
-    with csv_path.open("r", newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
+    if not use_sidecar or fingerprint is None:
+        return _parse_match_frame_from_csv(
+            csv_path, mapping, default_league, default_season, fingerprint
+        )
 
-        for row in reader:
-            kickoff = _parse_kickoff(row, mapping)
+    path = sidecar_path(
+        csv_path, sidecar_key(fingerprint, mapping, default_league, default_season)
+    )
+    frame = read_sidecar(path)
+    if frame is None:
+        frame = _parse_match_frame_from_csv(
+            csv_path, mapping, default_league, default_season, fingerprint
+        )
+        write_sidecar(path, frame)
 
-            league = (
-                row[mapping.league_col].strip()
-                if mapping.league_col
-                else default_league
-            )
-            season = (
-                row[mapping.season_col].strip()
-                if mapping.season_col
-                else default_season
-            )
+    return frame
 
-            home_team = row[mapping.home_team_col].strip()
-            away_team = row[mapping.away_team_col].strip()
 
-            # result/goals optional (but engine needs result for settlement)
-            result = row[mapping.result_col].strip() if mapping.result_col else "H"
-            home_goals = (
-                _parse_int(row.get(mapping.home_goals_col))
-                if mapping.home_goals_col
-                else 0
-            )
-            away_goals = (
-                _parse_int(row.get(mapping.away_goals_col))
-                if mapping.away_goals_col
-                else 0
-            )
+def iter_match_frames_from_csv(
+    csv_path: str | Path,
+    mapping: DatasetMapping,
+    default_league: str = "Unknown",
+    default_season: str = "Unknown",
+    *,
+    run_rows: int = SORT_RUN_ROWS,
+    batch_rows: int = PARSE_CHUNK_ROWS,
+    spill_dir: str | Path | None = None,
+) -> Iterator[MatchFrame]:
+    """
+    Streams the CSV as kickoff-ordered MatchFrame batches of up to
+    ``batch_rows`` rows, for files too large to load at once.
 
-            # odds optional; if missing we set harmless defaults
-            home_odds = (
-                _parse_float(row.get(mapping.odds_home_col))
-                if mapping.odds_home_col
-                else 2.0
-            )
-            draw_odds = (
-                _parse_float(row.get(mapping.odds_draw_col))
-                if mapping.odds_draw_col
-                else 3.5
-            )
-            away_odds = (
-                _parse_float(row.get(mapping.odds_away_col))
-                if mapping.odds_away_col
-                else 4.0
-            )
+    The file is parsed in runs of ``run_rows`` rows. A single run is sorted
+    in memory. Otherwise each sorted run is spilled to a binary sidecar in a
+    temporary directory (under ``spill_dir``) and memory-mapped back; runs
+    that are already in order are concatenated, anything else is k-way
+    merged. Rows come out in the same order and with the same ids as
+    load_match_frame_from_csv. A kickoff may span two batches, which
+    SimulationEngine.run_batches handles.
+    """
+    if run_rows < 1 or batch_rows < 1:
+        raise ValueError("run_rows and batch_rows must be >= 1")
 
-            # model probs optional
-            mhp = (
-                _parse_float(row.get(mapping.model_home_prob_col))
-                if mapping.model_home_prob_col
-                else None
-            )
-            mdp = (
-                _parse_float(row.get(mapping.model_draw_prob_col))
-                if mapping.model_draw_prob_col
-                else None
-            )
-            map_ = (
-                _parse_float(row.get(mapping.model_away_prob_col))
-                if mapping.model_away_prob_col
+    csv_path = Path(csv_path)
+    try:
+        fingerprint = dataset_fingerprint(csv_path)
+    except OSError:
+        fingerprint = None
+
+    chunks = _iter_csv_frames(
+        csv_path, mapping, default_league, default_season, fingerprint, run_rows
+    )
+    first = next(chunks, None)
+    second = next(chunks, None)
+    if second is None:
+        if first is not None and len(first):
+            frame = first.sorted_by_kickoff()
+            for start in range(0, len(frame), batch_rows):
+                yield frame[start : start + batch_rows]
+        return
+
+    with tempfile.TemporaryDirectory(
+        prefix="matches-sort-", dir=spill_dir, ignore_cleanup_errors=True
+    ) as tmp_dir:
+        runs: list[MatchFrame] = []
+        in_order = True
+
+        for chunk in chain((first, second), chunks):
+            chunk = chunk.sorted_by_kickoff()
+            if runs and chunk.kickoffs[0] < runs[-1].kickoffs[-1]:
+                in_order = False
+
+            path = Path(tmp_dir) / f"run-{len(runs)}{SIDECAR_SUFFIX}"
+            spilled = (
+                read_sidecar(path, lazy_strings=True)
+                if write_sidecar(path, chunk)
                 else None
             )
+            # Frames the sidecar format can't hold stay in memory.
+            runs.append(chunk if spilled is None else spilled)
 
-            # features
-            features: dict[str, Any] = {}
-            for col in mapping.feature_cols:
-                if col in row:
-                    v = _parse_float(row[col])
-                    # keep numeric only for MVP; later we can preserve strings too
-                    features[col] = v
-
-            matches.append(
-                Match(
-                    id=uuid.uuid4(),
-                    league=league,
-                    season=season,
-                    kickoff=kickoff,
-                    home_team=home_team,
-                    away_team=away_team,
-                    home_goals=home_goals or 0,
-                    away_goals=away_goals or 0,
-                    result=result,
-                    home_win_odds=home_odds or 2.0,
-                    draw_odds=draw_odds or 3.5,
-                    away_win_odds=away_odds or 4.0,
-                    model_home_prob=mhp,
-                    model_draw_prob=mdp,
-                    model_away_prob=map_,
-                    features=features,
+        if in_order:
+            picks = ((r, i) for r, run in enumerate(runs) for i in range(len(run)))
+        else:
+            # (kickoff, run, row): ties keep file order, as a stable sort.
+            picks = (
+                (r, i)
+                for _, r, i in heapq.merge(
+                    *(
+                        zip(run.kickoffs, repeat(r), range(len(run)))
+                        for r, run in enumerate(runs)
+                    )
                 )
             )
 
+        while batch := list(islice(picks, batch_rows)):
+            yield MatchFrame.gather(runs, batch)
+
+
+def _parse_match_frame_from_csv(
+    csv_path: Path,
+    mapping: DatasetMapping,
+    default_league: str,
+    default_season: str,
+    fingerprint: str | None,
+) -> MatchFrame:
+    (frame,) = _iter_csv_frames(
+        csv_path, mapping, default_league, default_season, fingerprint
+    )
     # Ensure chronological order for engine
-    matches.sort(key=lambda m: m.kickoff)
-    return matches
+    return frame.sorted_by_kickoff()
+
+
+def _iter_csv_frames(
+    csv_path: Path,
+    mapping: DatasetMapping,
+    default_league: str,
+    default_season: str,
+    fingerprint: str | None,
+    max_rows: int | None = None,
+) -> Iterator[MatchFrame]:
+    """
+    Parses the CSV into unsorted frames of up to ``max_rows`` rows, in file
+    order, sharing one string table and timezone. Without max_rows it yields
+    exactly one frame (possibly empty).
+    """
+    with csv_path.open("r", newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader, None) or []
+        plan = _ColumnPlan(header, mapping, default_league, default_season)
+        builder = MatchFrameBuilder(plan.feature_cols)
+        width = len(header)
+        id_base = match_id_base(fingerprint) if fingerprint else 0
+        offset = 0
+        while True:
+            chunk_rows = PARSE_CHUNK_ROWS
+            if max_rows is not None:
+                chunk_rows = min(chunk_rows, max_rows - len(builder))
+            rows = list(islice(reader, chunk_rows))
+            if not rows:
+                break
+
+            # DictReader semantics: skip blank lines, missing trailing
+            # fields read as None.
+            rows = [row for row in rows if row]
+            for row in rows:
+                if len(row) < width:
+                    row.extend([None] * (width - len(row)))
+            if not rows:
+                continue
+
+            n = len(rows)
+            if offset + n > 1 << MATCH_ID_ROW_BITS:
+                raise ValueError("Dataset has too many rows")
+            columns = list(zip(*rows))
+            builder.extend(
+                ids=range(id_base + offset, id_base + offset + n),
+                leagues=plan.league(columns, n),
+                seasons=plan.season(columns, n),
+                kickoffs=plan.kickoff(columns, n),
+                home_teams=plan.home_team(columns, n),
+                away_teams=plan.away_team(columns, n),
+                home_goals=plan.home_goals(columns, n),
+                away_goals=plan.away_goals(columns, n),
+                results=plan.result(columns, n),
+                home_win_odds=plan.home_odds(columns, n),
+                draw_odds=plan.draw_odds(columns, n),
+                away_win_odds=plan.away_odds(columns, n),
+                model_home_prob=plan.model_home_prob(columns, n),
+                model_draw_prob=plan.model_draw_prob(columns, n),
+                model_away_prob=plan.model_away_prob(columns, n),
+                # keep numeric only for MVP; later we can preserve strings too
+                features=[_feature_column(columns[i]) for i in plan.feature_indices],
+            )
+            offset += n
+
+            if max_rows is not None and len(builder) >= max_rows:
+                yield builder.build()
+                builder = builder.new_chunk()
+
+        if max_rows is None or len(builder):
+            yield builder.build()
+
+
+def load_matches_from_csv(
+    csv_path: str | Path,
+    mapping: DatasetMapping,
+    default_league: str = "Unknown",
+    default_season: str = "Unknown",
+) -> list[Match]:
+    return load_match_frame_from_csv(
+        csv_path,
+        mapping=mapping,
+        default_league=default_league,
+        default_season=default_season,
+    ).to_matches()
@@ -0,0 +1,188 @@
+from typing import Any, Callable
+
+from app.application.dataset_service import DatasetService
+from app.application.dataset_simulation_models import DatasetSimulateRequest
+from app.application.dataset_sweep_service import DatasetSweepService
+from app.infrastructure.persistence_models.job import Job
+from app.infrastructure.repositories.job_repository import JobRepository
+from app.schemas.sweep import DatasetSweepRequest
+
+JOB_KINDS = ("sweep", "simulation")
+
+# Partial sweep rows are written at most once per this many percent (and at
+# the end); progress_percent alone is written once per whole percent.
+PROGRESS_ROWS_EVERY_PERCENT = 10
+
+
+class JobService:
+    """
+    Background sweep/simulation jobs.
+
+    The API submits a job row and hands its id to ``enqueue`` (the Celery
+    task in production); the worker then calls run_job, which records
+    progress, partial sweep rows or simulation metrics and the final result
+    on the row.
+    """
+
+    def __init__(self, db, enqueue: Callable[[str], None] | None = None):
+        self.db = db
+        self.enqueue = enqueue
+        self.jobs_repo = JobRepository(db)
+        self.dataset_service = DatasetService(db)
+
+    # -----------------------------------------------------
+    # Submission / lookup (API side)
+    # -----------------------------------------------------
+
+    def submit_sweep(
+        self, *, dataset_id, owner_user_id, body: DatasetSweepRequest
+    ) -> Job:
+        return self._submit("sweep", dataset_id, owner_user_id, body)
+
+    def submit_simulation(
+        self, *, dataset_id, owner_user_id, payload: DatasetSimulateRequest
+    ) -> Job:
+        return self._submit("simulation", dataset_id, owner_user_id, payload)
+
+    def get_job(self, *, job_id, owner_user_id) -> Job:
+        job = self.jobs_repo.get_for_user(job_id, owner_user_id)
+        if not job:
+            raise ValueError("Job not found")
+        return job
+
+    def _submit(self, kind: str, dataset_id, owner_user_id, body) -> Job:
+        # Fail fast on unknown/foreign datasets instead of inside the worker.
+        self.dataset_service.get_owned_dataset(
+            dataset_id=dataset_id,
+            owner_user_id=owner_user_id,
+        )
+
+        job = self.jobs_repo.create(
+            Job(
+                owner_user_id=owner_user_id,
+                dataset_id=dataset_id,
+                kind=kind,
+                status="queued",
+                progress_percent=0.0,
+                request_json=body.model_dump(mode="json"),
+            )
+        )
+
+        if self.enqueue is not None:
+            try:
+                self.enqueue(str(job.id))
+            except Exception as e:
+                # Broker unavailable: nothing will ever pick the row up.
+                return self.jobs_repo.update(
+                    job, status="failed", error=f"Failed to enqueue job: {e}"
+                )
+
+        return job
+
+    # -----------------------------------------------------
+    # Execution (worker side)
+    # -----------------------------------------------------
+
+    def run_job(self, job_id) -> Job:
+        job = self.jobs_repo.get(job_id)
+        if not job:
+            raise ValueError("Job not found")
+
+        if job.kind not in JOB_KINDS:
+            return self.jobs_repo.update(
+                job, status="failed", error=f"Unknown job kind: {job.kind}"
+            )
+
+        self.jobs_repo.update(job, status="running", progress_percent=0.0, error=None)
+
+        try:
+            if job.kind == "sweep":
+                result = self._run_sweep(job)
+            else:
+                result = self._run_simulation(job)
+        except Exception as e:
+            self.db.rollback()
+            return self.jobs_repo.update(job, status="failed", error=str(e))
+
+        return self.jobs_repo.update(
+            job,
+            status="succeeded",
+            progress_percent=100.0,
+            result_json=self.dataset_service._sanitize_result_for_storage(result),
+        )
+
+    def _run_sweep(self, job: Job) -> dict[str, Any]:
+        body = DatasetSweepRequest.model_validate(job.request_json)
+        last_percent = -1
+        last_rows_percent = 0
+
+        def on_progress(completed: int, total: int, rows: list[dict[str, Any]]):
+            nonlocal last_percent, last_rows_percent
+
+            # At most one write per whole percent.
+            percent = int(completed * 100 / total) if total else 100
+            if percent == last_percent:
+                return
+            last_percent = percent
+
+            if (
+                percent < 100
+                and percent - last_rows_percent < PROGRESS_ROWS_EVERY_PERCENT
+            ):
+                self.jobs_repo.update(job, progress_percent=float(percent))
+                return
+            last_rows_percent = percent
+
+            self.jobs_repo.update(
+                job,
+                progress_percent=float(percent),
+                result_json=self.dataset_service._sanitize_result_for_storage(
+                    {"completed": completed, "total": total, "rows": rows}
+                ),
+            )
+
+        return DatasetSweepService(self.db).run_sweep(
+            dataset_id=job.dataset_id,
+            owner_user_id=job.owner_user_id,
+            mapping=body.mapping,
+            base_request=body.base_request,
+            grid=body.grid,
+            persist_runs=body.persist_runs,
+            result_mode=body.result_mode,
+            execution=body.execution,
+            max_workers=body.max_workers,
+            search_mode=body.search_mode,
+            halving_stages=body.halving_stages,
+            halving_keep_fraction=body.halving_keep_fraction,
+            halving_metric=body.halving_metric,
+            halving_metric_order=body.halving_metric_order,
+            top_k=body.top_k,
+            progress_callback=on_progress,
+        )
+
+    def _run_simulation(self, job: Job) -> dict[str, Any]:
+        payload = DatasetSimulateRequest.model_validate(job.request_json)
+
+        def on_progress(completed: int, total: int | None, snapshot: dict[str, Any]):
+            # The engine reports every few thousand matches; with an unknown
+            # total (streamed runs) only the partial metrics move.
+            fields = {}
+            if total:
+                fields["progress_percent"] = float(int(completed * 100 / total))
+
+            self.jobs_repo.update(
+                job,
+                **fields,
+                result_json=self.dataset_service._sanitize_result_for_storage(
+                    {"completed": completed, "total": total, "partial": snapshot}
+                ),
+            )
+
+        return self.dataset_service.simulate_dataset(
+            dataset_id=job.dataset_id,
+            owner_user_id=job.owner_user_id,
+            mapping=payload.mapping,
+            request=payload.request,
+            persist=payload.persist,
+            progress_callback=on_progress,
+        )
@@ -0,0 +1,304 @@
+"""
+Binary columnar cache of parsed datasets.
+
+The first load of a CSV with a given mapping writes the sorted MatchFrame to a
+sidecar file next to it; later loads memory-map the sidecar and expose its
+numeric columns as memoryviews instead of parsing the CSV again.
+
+Layout: magic, little-endian uint64 header length, JSON header, then each
+column's raw native-endian bytes, 8-byte aligned at the offsets the header
+lists. String columns are uint32 codes into the header's string table.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import mmap
+import os
+import sys
+import uuid
+from array import array
+from datetime import timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+from app.application.dataset_mapping import DatasetMapping
+from app.domain.simulation.match_frame import MatchFrame
+
+SIDECAR_MAGIC = b"BTFRAME\x00"
+# Bump whenever parsing or the layout changes so old sidecars are ignored.
+SIDECAR_VERSION = 2
+SIDECAR_SUFFIX = ".frame"
+
+_STRING_COLUMNS = ("leagues", "seasons", "home_teams", "away_teams", "results")
+_NUMERIC_COLUMNS = (
+    ("kickoffs", "q"),
+    ("home_goals", "q"),
+    ("away_goals", "q"),
+    ("home_win_odds", "d"),
+    ("draw_odds", "d"),
+    ("away_win_odds", "d"),
+    ("model_home_prob", "d"),
+    ("model_draw_prob", "d"),
+    ("model_away_prob", "d"),
+)
+_FEATURE_PREFIX = "feature:"
+
+
+class _UuidColumn:
+    """Read-only sequence of UUIDs over packed 16-byte values."""
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data):
+        self._data = memoryview(data)
+
+    def __reduce__(self):
+        return (_UuidColumn, (self._data.tobytes(),))
+
+    def __len__(self) -> int:
+        return len(self._data) // 16
+
+    def __getitem__(self, index: int) -> uuid.UUID:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("UUID column index out of range")
+        start = index * 16
+        return uuid.UUID(bytes=bytes(self._data[start : start + 16]))
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+class _StringColumn:
+    """Read-only sequence of strings over uint32 codes into a string table."""
+
+    __slots__ = ("_codes", "_strings")
+
+    def __init__(self, codes, strings: list[str]):
+        self._codes = codes
+        self._strings = strings
+
+    def __reduce__(self):
+        return (list, ([self._strings[code] for code in self._codes],))
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    def __getitem__(self, index: int) -> str:
+        return self._strings[self._codes[index]]
+
+    def __iter__(self):
+        return map(self._strings.__getitem__, self._codes)
+
+
+def sidecar_key(
+    fingerprint: str,
+    mapping: DatasetMapping,
+    default_league: str,
+    default_season: str,
+) -> str:
+    payload = {
+        "version": SIDECAR_VERSION,
+        "fingerprint": fingerprint,
+        "mapping": mapping.model_dump(mode="json"),
+    }
+    # Defaults only reach the frame for unmapped columns.
+    if not mapping.league_col:
+        payload["default_league"] = default_league
+    if not mapping.season_col:
+        payload["default_season"] = default_season
+
+    payload = json.dumps(payload, sort_keys=True)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+def sidecar_path(csv_path: str | Path, key: str) -> Path:
+    return Path(f"{csv_path}.{key}{SIDECAR_SUFFIX}")
+
+
+def delete_sidecars(csv_path: str | Path) -> None:
+    csv_path = Path(csv_path)
+    for path in csv_path.parent.glob(f"{csv_path.name}.*{SIDECAR_SUFFIX}"):
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+
+def _encode_tz(tz) -> tuple[bool, float | None]:
+    """(supported, UTC offset in seconds or None for naive)."""
+    if tz is None:
+        return True, None
+    if isinstance(tz, timezone):
+        return True, tz.utcoffset(None).total_seconds()
+    return False, None
+
+
+def _encode_ids(ids) -> tuple[str, bytes] | None:
+    if all(isinstance(value, uuid.UUID) for value in ids):
+        return "uuid", b"".join(value.bytes for value in ids)
+    if all(type(value) is int for value in ids):
+        return "int", array("q", ids).tobytes()
+    return None
+
+
+def write_sidecar(path: str | Path, frame: MatchFrame) -> bool:
+    """
+    Writes ``frame`` (atomically) to ``path``. Returns False when the frame
+    can't be represented (unusual ids/timezone) or the file can't be written.
+    """
+    tz_supported, tz_offset = _encode_tz(frame.tz)
+    encoded_ids = _encode_ids(frame.ids)
+    if not tz_supported or encoded_ids is None:
+        return False
+    id_kind, id_bytes = encoded_ids
+
+    strings: dict[str, int] = {}
+    blobs: list[tuple[str, str, bytes]] = [
+        ("ids", "B" if id_kind == "uuid" else "q", id_bytes)
+    ]
+
+    for name in _STRING_COLUMNS:
+        codes = array(
+            "I", (strings.setdefault(v, len(strings)) for v in getattr(frame, name))
+        )
+        blobs.append((name, "I", codes.tobytes()))
+
+    for name, typecode in _NUMERIC_COLUMNS:
+        blobs.append((name, typecode, array(typecode, getattr(frame, name)).tobytes()))
+
+    for name, column in frame.features.items():
+        blobs.append((_FEATURE_PREFIX + name, "d", array("d", column).tobytes()))
+
+    columns = []
+    offset = 0
+    for name, typecode, data in blobs:
+        columns.append([name, typecode, offset, len(data)])
+        offset += _aligned(len(data))
+
+    header = json.dumps(
+        {
+            "version": SIDECAR_VERSION,
+            "byteorder": sys.byteorder,
+            "rows": len(frame),
+            "tz_offset": tz_offset,
+            "id_kind": id_kind,
+            "strings": list(strings),
+            "features": list(frame.features),
+            "columns": columns,
+        }
+    ).encode()
+
+    path = Path(path)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    data_start = _aligned(len(SIDECAR_MAGIC) + 8 + len(header))
+
+    try:
+        with tmp_path.open("wb") as f:
+            f.write(SIDECAR_MAGIC)
+            f.write(len(header).to_bytes(8, "little"))
+            f.write(header)
+            f.write(b"\x00" * (data_start - f.tell()))
+            for _, _, data in blobs:
+                f.write(data)
+                f.write(b"\x00" * (_aligned(len(data)) - len(data)))
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+        return False
+
+    return True
+
+
+def read_sidecar(path: str | Path, lazy_strings: bool = False) -> MatchFrame | None:
+    """
+    Memory-maps a sidecar as a MatchFrame, or None if missing/unusable.
+
+    With lazy_strings the string columns are decoded on access instead of
+    into lists, so opening the frame costs no memory per row.
+    """
+    try:
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    frame = None
+    try:
+        frame = _frame_from_buffer(memoryview(mapped), lazy_strings)
+    except (ValueError, KeyError, TypeError, IndexError):
+        pass
+
+    if frame is None:
+        _close_mapping(mapped)
+    return frame
+
+
+def _close_mapping(mapped: mmap.mmap) -> None:
+    try:
+        mapped.close()
+    except BufferError:
+        # A memoryview cast made before the mismatch was found is still
+        # alive; the mapping is released once it is collected.
+        pass
+
+
+def _frame_from_buffer(
+    buffer: memoryview, lazy_strings: bool = False
+) -> MatchFrame | None:
+    magic_end = len(SIDECAR_MAGIC)
+    if bytes(buffer[:magic_end]) != SIDECAR_MAGIC:
+        return None
+
+    header_len = int.from_bytes(buffer[magic_end : magic_end + 8], "little")
+    header_end = magic_end + 8 + header_len
+    header: dict[str, Any] = json.loads(bytes(buffer[magic_end + 8 : header_end]))
+
+    if header["version"] != SIDECAR_VERSION or header["byteorder"] != sys.byteorder:
+        return None
+
+    data = buffer[_aligned(header_end) :]
+    rows = header["rows"]
+    columns = {}
+    for name, typecode, offset, nbytes in header["columns"]:
+        column = data[offset : offset + nbytes].cast(typecode)
+        expected = rows * 16 if name == "ids" and header["id_kind"] == "uuid" else rows
+        if len(column) != expected:
+            return None
+        columns[name] = column
+
+    strings = header["strings"]
+    if lazy_strings:
+        string_columns = {
+            name: _StringColumn(columns[name], strings) for name in _STRING_COLUMNS
+        }
+    else:
+        string_columns = {
+            name: [strings[code] for code in columns[name]] for name in _STRING_COLUMNS
+        }
+
+    ids = columns["ids"]
+    if header["id_kind"] == "uuid":
+        ids = _UuidColumn(ids)
+
+    tz_offset = header["tz_offset"]
+    tz = None if tz_offset is None else timezone(timedelta(seconds=tz_offset))
+
+    return MatchFrame(
+        ids=ids,
+        **string_columns,
+        **{name: columns[name] for name, _ in _NUMERIC_COLUMNS},
+        features={name: columns[_FEATURE_PREFIX + name] for name in header["features"]},
+        tz=tz,
+    )
+
+
+def _aligned(size: int) -> int:
+    return (size + 7) & ~7
@@ -1,9 +1,16 @@
+import heapq
 import itertools
+import math
 from copy import deepcopy
-from typing import Any, Callable
+from functools import lru_cache
+from types import SimpleNamespace
+from typing import Any, Callable, Iterator, NamedTuple, Sequence
 
+from pydantic import TypeAdapter, ValidationError
+
+from app.domain.simulation.config import REQUEST_FIELD_PATHS, SimulationConfig
 from app.domain.simulation.engine import SimulationEngine
-from app.domain.simulation.models import SimulationRequest
+from app.domain.simulation.models import SimulationRequest, check_request_rules
 
 
 class ParameterSweep:
@@ -41,7 +48,7 @@ class ParameterSweep:
             request_copy = self.base_request.model_copy(update=params)
             strategy = self.strategy_factory(**params)
 
-            engine = SimulationEngine(request_copy, strategy)
+            engine = SimulationEngine(request_copy, strategy, result_mode="summary")
             simulation_result = engine.run(self.matches)
 
             rows.append(self._build_sweep_row(params=params, result=simulation_result))
@@ -83,6 +90,230 @@ class ParameterSweep:
         }
 
 
+class SweepVariant(NamedTuple):
+    # As given in the grid (what sweep rows report).
+    params: dict[str, Any]
+    # Validated SimulationRequest values.
+    fields: dict[str, Any]
+    # fields as JSON-mode values.
+    json_fields: dict[str, Any]
+
+
+@lru_cache(maxsize=None)
+def _request_field_adapter(name: str) -> TypeAdapter:
+    return TypeAdapter(SimulationRequest.model_fields[name].annotation)
+
+
+class SweepGrid:
+    """
+    A parameter grid over a base SimulationRequest.
+
+    Every grid value is validated (and coerced) once, by field type, when the
+    grid is built. Variants then only re-check SimulationRequest's cross-field
+    rules and are derived from the base config/request without re-running
+    pydantic validation or deep-copying the request per grid point.
+    """
+
+    def __init__(self, base_request: SimulationRequest, grid: dict[str, list[Any]]):
+        self.base_request = base_request
+        self.parameter_names = list(grid.keys())
+        self.raw_values = [list(grid[name]) for name in self.parameter_names]
+
+        self.values: list[list[Any]] = []
+        self.json_values: list[list[Any]] = []
+        for name, raw_values in zip(self.parameter_names, self.raw_values):
+            if name not in REQUEST_FIELD_PATHS:
+                # Not a request field: reported in the rows but otherwise
+                # ignored, as before grids were validated up front.
+                self.values.append(list(raw_values))
+                self.json_values.append(list(raw_values))
+                continue
+
+            adapter = _request_field_adapter(name)
+            values = []
+            for value in raw_values:
+                try:
+                    values.append(adapter.validate_python(value))
+                except ValidationError as e:
+                    raise ValueError(
+                        f"Invalid value for sweep parameter {name}: {value!r}"
+                    ) from e
+            self.values.append(values)
+            self.json_values.append(
+                [adapter.dump_python(value, mode="json") for value in values]
+            )
+
+        self.base_config = SimulationConfig.from_request(base_request)
+        self._base_fields = dict(base_request)
+        self._base_json = base_request.model_dump(mode="json")
+
+    def __len__(self) -> int:
+        return math.prod(len(values) for values in self.values)
+
+    def variants(self) -> Iterator[SweepVariant]:
+        """
+        Yields the grid points in grid order.
+
+        Raises ValueError for a combination SimulationRequest would reject.
+        """
+        names = self.parameter_names
+        columns = [
+            list(zip(raw, values, json_values))
+            for raw, values, json_values in zip(
+                self.raw_values, self.values, self.json_values
+            )
+        ]
+
+        for combination in itertools.product(*columns):
+            params = {}
+            fields = {}
+            json_fields = {}
+            for name, (raw, value, json_value) in zip(names, combination):
+                params[name] = raw
+                if name not in REQUEST_FIELD_PATHS:
+                    continue
+                fields[name] = value
+                json_fields[name] = json_value
+
+            check_request_rules(SimpleNamespace(**{**self._base_fields, **fields}))
+            yield SweepVariant(params, fields, json_fields)
+
+    def config_for(self, variant: SweepVariant) -> SimulationConfig:
+        return self.base_config.with_request_fields(**variant.fields)
+
+    def request_for(self, variant: SweepVariant) -> SimulationRequest:
+        # Values and rules are already checked, so skip re-validation.
+        return self.base_request.model_copy(update=variant.fields)
+
+    def request_json_for(self, variant: SweepVariant) -> dict[str, Any]:
+        """Same as request_for(variant).model_dump(mode="json")."""
+        return {**self._base_json, **variant.json_fields}
+
+
+class SweepRowCollector:
+    """
+    Collects sweep rows in the services' ROI ranking order.
+
+    With ``top_k`` only the best K rows are kept (a min-heap keyed like the
+    final sort, ties going to the earlier variant); every row pushed out is
+    folded into running aggregate stats instead, so memory stays bounded by K
+    however large the grid.
+    """
+
+    def __init__(self, top_k: int | None = None):
+        if top_k is not None and top_k < 1:
+            raise ValueError("top_k must be at least 1")
+
+        self.top_k = top_k
+        self.count = 0
+        self._rows: list[dict[str, Any]] = []
+        self._heap: list[tuple] = []
+
+        self._other_count = 0
+        self._other_roi_count = 0
+        self._other_roi_sum = 0.0
+        self._other_roi_min: float | None = None
+        self._other_roi_max: float | None = None
+        self._other_total_profit = 0.0
+        self._other_total_bets = 0
+        self._other_profitable = 0
+
+    @staticmethod
+    def _rank_key(row: dict[str, Any]) -> tuple:
+        # Same ordering as the services' original reverse sort.
+        roi = row.get("roi_percent")
+        return (roi is None, roi if roi is not None else 0)
+
+    def add(self, row: dict[str, Any]) -> None:
+        self.count += 1
+
+        if self.top_k is None:
+            self._rows.append(row)
+            return
+
+        # -count: for equal ROI the earlier variant ranks higher.
+        entry = (self._rank_key(row), -self.count, row)
+        if len(self._heap) < self.top_k:
+            heapq.heappush(self._heap, entry)
+            return
+
+        dropped = heapq.heappushpop(self._heap, entry)[2]
+        self._add_to_other(dropped)
+
+    def _add_to_other(self, row: dict[str, Any]) -> None:
+        self._other_count += 1
+        self._other_total_bets += row.get("total_bets") or 0
+        self._other_total_profit += row.get("total_profit") or 0
+
+        roi = row.get("roi_percent")
+        if roi is None:
+            return
+
+        self._other_roi_count += 1
+        self._other_roi_sum += roi
+        if self._other_roi_min is None or roi < self._other_roi_min:
+            self._other_roi_min = roi
+        if self._other_roi_max is None or roi > self._other_roi_max:
+            self._other_roi_max = roi
+        if roi > 0:
+            self._other_profitable += 1
+
+    def kept_rows(self) -> list[dict[str, Any]]:
+        """Rows kept so far, unsorted."""
+        if self.top_k is None:
+            return self._rows
+        return [entry[2] for entry in self._heap]
+
+    def sorted_rows(self) -> list[dict[str, Any]]:
+        if self.top_k is None:
+            self._rows.sort(key=self._rank_key, reverse=True)
+            return self._rows
+        return [entry[2] for entry in sorted(self._heap, reverse=True)]
+
+    def other_variants(self) -> dict[str, Any] | None:
+        """Aggregate stats for the variants left out of the top K."""
+        if self.top_k is None:
+            return None
+
+        return {
+            "count": self._other_count,
+            "roi_percent_min": self._other_roi_min,
+            "roi_percent_max": self._other_roi_max,
+            "roi_percent_mean": (
+                round(self._other_roi_sum / self._other_roi_count, 2)
+                if self._other_roi_count
+                else None
+            ),
+            "profitable_count": self._other_profitable,
+            "total_bets": self._other_total_bets,
+            "total_profit": round(self._other_total_profit, 2),
+        }
+
+    def response(self, parameter_names: list[str]) -> dict[str, Any]:
+        rows = self.sorted_rows()
+        response = {
+            "parameter_names": parameter_names,
+            "row_count": len(rows),
+            "rows": rows,
+            # Backward-compatible aliases.
+            "total_variants": self.count,
+            "results": rows,
+        }
+        if self.top_k is not None:
+            response["other_variants"] = self.other_variants()
+        return response
+
+
+HALVING_METRICS = (
+    "roi_percent",
+    "total_profit",
+    "final_bankroll",
+    "strike_rate_percent",
+    "profit_factor",
+    "max_drawdown_percent",
+)
+
+
 class ParameterSweepService:
     """Generic parameter sweep runner for request-like simulation workflows."""
 
@@ -92,7 +323,13 @@ class ParameterSweepService:
         base_request: SimulationRequest,
         sweep_parameters: dict[str, list[Any]],
         run_variant: Callable[[SimulationRequest], dict[str, Any]],
+        top_k: int | None = None,
     ) -> dict[str, Any]:
+        """
+        Runs every grid variant through run_variant. With top_k only the best
+        K rows by ROI are returned, plus ``other_variants`` aggregate stats.
+        """
+        collector = SweepRowCollector(top_k)
         parameter_names = list(sweep_parameters.keys())
 
         if not parameter_names:
@@ -107,44 +344,144 @@ class ParameterSweepService:
                 "results": rows,
             }
 
-        value_lists = [sweep_parameters[name] for name in parameter_names]
-        rows: list[dict[str, Any]] = []
+        sweep_grid = SweepGrid(base_request, sweep_parameters)
+
+        for variant in sweep_grid.variants():
+            # Only the metrics are kept; the full result (bets, equity curve)
+            # is dropped straight away.
+            collector.add(
+                self._build_sweep_row(
+                    parameters=variant.params,
+                    result=run_variant(sweep_grid.request_for(variant)),
+                )
+            )
+
+        return collector.response(parameter_names)
+
+    def run_successive_halving(
+        self,
+        *,
+        sweep_grid: SweepGrid,
+        run_stage: Callable[[list[SweepVariant], float], list[dict[str, Any]]],
+        stages: Sequence[float] = (0.25, 0.5, 1.0),
+        keep_fraction: float = 0.5,
+        metric: str = "roi_percent",
+        metric_order: str = "desc",
+        top_k: int | None = None,
+    ) -> dict[str, Any]:
+        """
+        Successive halving over an already validated SweepGrid.
 
-        for combination in itertools.product(*value_lists):
-            variant_request = self._build_variant_request(
-                base_request=base_request,
-                parameter_names=parameter_names,
-                parameter_values=combination,
+        run_stage(variants, prefix_fraction) runs the given SweepVariants on
+        the first prefix_fraction of the (chronological) matches and returns
+        one result per variant. After every stage but the last only the best
+        keep_fraction of variants by ``metric`` go on to the next, longer
+        prefix; the last stage must cover all matches (1.0).
+
+        Every variant gets a row: survivors with their full-data metrics and
+        pruned_at_stage=None, pruned variants with the metrics of the stage
+        they were dropped at.
+
+        With top_k only the best K survivors by ROI are returned; the other
+        survivors are summarised in ``other_variants`` and pruned variants
+        only appear in the per-stage counts.
+        """
+        self._validate_halving(stages, keep_fraction, metric, metric_order)
+        collector = SweepRowCollector(top_k)
+
+        parameter_names = sweep_grid.parameter_names
+        variants = list(sweep_grid.variants())
+
+        survivors = list(range(len(variants)))
+        rows: list[dict[str, Any]] = [None] * len(variants)
+        stage_summaries = []
+
+        for stage_index, fraction in enumerate(stages):
+            results = run_stage([variants[i] for i in survivors], fraction)
+            for i, result in zip(survivors, results):
+                rows[i] = self._build_sweep_row(
+                    parameters=variants[i].params, result=result
+                )
+                rows[i]["pruned_at_stage"] = None
+
+            is_last = stage_index == len(stages) - 1
+            keep = (
+                len(survivors)
+                if is_last
+                else max(1, math.ceil(len(survivors) * keep_fraction))
+            )
+            stage_summaries.append(
+                {
+                    "stage": stage_index,
+                    "prefix_fraction": fraction,
+                    "variants_run": len(survivors),
+                    "variants_kept": keep,
+                }
             )
-            result = run_variant(variant_request)
-            parameters = dict(zip(parameter_names, combination))
-            rows.append(self._build_sweep_row(parameters=parameters, result=result))
+            if is_last:
+                break
 
+            ranked = sorted(
+                survivors,
+                key=lambda i: self._metric_sort_key(rows[i], metric, metric_order),
+            )
+            for i in ranked[keep:]:
+                rows[i]["pruned_at_stage"] = stage_index
+            survivors = sorted(ranked[:keep])
+
+        if top_k is not None:
+            for i in survivors:
+                collector.add(rows[i])
+            response = collector.response(parameter_names)
+            response["total_variants"] = len(rows)
+            response["stages"] = stage_summaries
+            return response
+
+        # Full-data survivors first by ROI, then variants pruned later before
+        # those pruned earlier.
         rows.sort(
             key=lambda row: (row.get("roi_percent") is None, row.get("roi_percent", 0)),
             reverse=True,
         )
+        rows.sort(
+            key=lambda row: (
+                row["pruned_at_stage"] is not None,
+                -(row["pruned_at_stage"] or 0),
+            )
+        )
 
         return {
             "parameter_names": parameter_names,
             "row_count": len(rows),
             "rows": rows,
+            "stages": stage_summaries,
             # Backward-compatible aliases.
             "total_variants": len(rows),
             "results": rows,
         }
 
     @staticmethod
-    def _build_variant_request(
-        *,
-        base_request: SimulationRequest,
-        parameter_names: list[str],
-        parameter_values: tuple[Any, ...],
-    ) -> SimulationRequest:
-        payload = deepcopy(base_request.model_dump())
-        for name, value in zip(parameter_names, parameter_values):
-            payload[name] = value
-        return SimulationRequest(**payload)
+    def _validate_halving(stages, keep_fraction, metric, metric_order) -> None:
+        stages = list(stages)
+        if not stages or stages[-1] != 1.0:
+            raise ValueError("halving stages must end with 1.0 (all matches)")
+        if any(not 0 < f <= 1 for f in stages) or any(
+            a >= b for a, b in zip(stages, stages[1:])
+        ):
+            raise ValueError("halving stages must be increasing fractions in (0, 1]")
+        if not 0 < keep_fraction < 1:
+            raise ValueError("halving keep_fraction must be between 0 and 1")
+        if metric not in HALVING_METRICS:
+            raise ValueError(f"halving metric must be one of {list(HALVING_METRICS)}")
+        if metric_order not in ("asc", "desc"):
+            raise ValueError("halving metric_order must be 'asc' or 'desc'")
+
+    @staticmethod
+    def _metric_sort_key(row: dict[str, Any], metric: str, metric_order: str):
+        value = row.get(metric)
+        if value is None:
+            return (1, 0)
+        return (0, -value if metric_order == "desc" else value)
 
     @staticmethod
     def _build_sweep_row(
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Callable, Iterable, Iterator
+
+RESULT_CACHE_SIZE = 256
+# Upper bound on the cached results' pickled size, in bytes.
+RESULT_CACHE_BYTES = int(os.getenv("RESULT_CACHE_BYTES", str(256 * 1024 * 1024)))
+
+_MISSING = object()
+
+_lock = threading.RLock()
+# path -> ((mtime_ns, size), fingerprint)
+_file_fingerprints: dict[str, tuple[tuple[int, int], str]] = {}
+
+
+def dataset_fingerprint(path) -> str:
+    """
+    Content hash of a dataset file.
+
+    Memoized per (path, mtime, size) so repeated runs against an unchanged
+    upload don't re-read the file.
+    """
+    path = os.fspath(path)
+    stat = os.stat(path)
+    memo_key = (stat.st_mtime_ns, stat.st_size)
+
+    with _lock:
+        memo = _file_fingerprints.get(path)
+        if memo is not None and memo[0] == memo_key:
+            return memo[1]
+
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    fingerprint = digest.hexdigest()
+
+    with _lock:
+        _file_fingerprints[path] = (memo_key, fingerprint)
+    return fingerprint
+
+
+def normalized_request_json(request) -> str:
+    """
+    Canonical JSON for a SimulationRequest (or its model_dump(mode="json")
+    payload): sorted keys, and league lists (which act as sets) sorted.
+    """
+    if isinstance(request, dict):
+        payload = dict(request)
+    else:
+        payload = request.model_dump(mode="json")
+    if payload.get("leagues"):
+        payload["leagues"] = sorted(payload["leagues"])
+    return json.dumps(payload, sort_keys=True, separators=(",", ":"))
+
+
+def result_cache_key(
+    fingerprint: str,
+    mapping,
+    request,
+    result_mode: str,
+    *,
+    default_league: str | None,
+    default_season: str | None,
+) -> tuple[str, str, str, str]:
+    """
+    Key for a run of ``request`` over the dataset rows loaded with
+    ``mapping`` and the given load defaults (which may differ from the
+    request's own league/season, e.g. for sweep variants).
+    """
+    load = {"mapping": mapping.model_dump(mode="json")}
+    # Defaults only reach the rows for unmapped columns.
+    if not mapping.league_col:
+        load["default_league"] = default_league
+    if not mapping.season_col:
+        load["default_season"] = default_season
+
+    load_json = json.dumps(load, sort_keys=True, separators=(",", ":"))
+    return (fingerprint, load_json, normalized_request_json(request), result_mode)
+
+
+class SimulationResultCache:
+    """
+    Process-wide LRU cache of simulation results, keyed by result_cache_key.
+
+    Results are stored pickled, so callers can't mutate cached entries and
+    the cache is bounded by the pickled size (max_bytes) as well as by entry
+    count; a result larger than max_bytes on its own is not cached.
+    run_id/dataset_id are added by callers and never cached.
+    """
+
+    def __init__(
+        self, max_size: int = RESULT_CACHE_SIZE, max_bytes: int = RESULT_CACHE_BYTES
+    ):
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[tuple, bytes] = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key) -> dict[str, Any] | None:
+        with _lock:
+            payload = self._entries.get(key)
+            if payload is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return pickle.loads(payload)
+
+    def put(self, key, result: dict[str, Any]) -> None:
+        payload = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(payload) > self.max_bytes:
+            return
+
+        with _lock:
+            self._pop(key)
+            self._entries[key] = payload
+            self.bytes += len(payload)
+            while len(self._entries) > self.max_size or self.bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.bytes -= len(evicted)
+
+    def invalidate_fingerprint(self, fingerprint: str) -> None:
+        with _lock:
+            for key in [k for k in self._entries if k[0] == fingerprint]:
+                self._pop(key)
+
+    def _pop(self, key) -> None:
+        payload = self._entries.pop(key, None)
+        if payload is not None:
+            self.bytes -= len(payload)
+
+    def clear(self) -> None:
+        with _lock:
+            self._entries.clear()
+            self.bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+result_cache = SimulationResultCache()
+
+
+def invalidate_dataset_file(path) -> None:
+    """Drops cached results for a dataset file that is about to be deleted."""
+    path = os.fspath(path)
+    try:
+        fingerprint = dataset_fingerprint(path)
+    except OSError:
+        fingerprint = None
+
+    with _lock:
+        memo = _file_fingerprints.pop(path, None)
+    if fingerprint is None and memo is not None:
+        fingerprint = memo[1]
+
+    if fingerprint is not None:
+        result_cache.invalidate_fingerprint(fingerprint)
+
+
+def iter_cached_results(
+    items: Iterable,
+    *,
+    key_for: Callable[[Any], tuple | None],
+    run: Callable[[Iterator], Iterator[dict[str, Any]]],
+) -> Iterator[tuple[Any, dict[str, Any]]]:
+    """
+    Yields (item, result) for every item, in order.
+
+    Hits come from result_cache; only the misses are handed, lazily and in
+    order, to run(), which must yield one result per item it consumes.
+    Fresh results are cached under their key (None = don't cache).
+    """
+    planned: deque = deque()
+
+    def misses():
+        for item in items:
+            key = key_for(item)
+            cached = None if key is None else result_cache.get(key)
+            planned.append((item, key, cached))
+            if cached is None:
+                yield item
+
+    results = iter(run(misses()))
+    pending = _MISSING
+    exhausted = False
+
+    while True:
+        while planned:
+            item, key, cached = planned[0]
+            if cached is not None:
+                planned.popleft()
+                yield item, cached
+                continue
+
+            if pending is _MISSING:
+                break
+
+            planned.popleft()
+            result, pending = pending, _MISSING
+            if key is not None:
+                result_cache.put(key, result)
+            yield item, result
+
+        if exhausted:
+            return
+
+        pending = next(results, _MISSING)
+        exhausted = pending is _MISSING
@@ -10,7 +10,7 @@ class SimulationService:
 
     def run(self, request):
         config = SimulationConfig.from_request(request)
-        matches = self.repo.get_matches(
+        matches = self.repo.get_match_frame(
             season=config.season,
             league=config.league,
             leagues=config.leagues,
@@ -1,14 +1,82 @@
+from collections import deque
+from collections.abc import Iterable, Iterator, Sequence
+
 from app.application.strategy_factory import build_strategy
 from app.domain.simulation.config import SimulationConfig
 from app.domain.simulation.engine import SimulationEngine
+from app.domain.simulation.match_frame import MatchFrame
 from app.domain.simulation.models import SimulationRequest
 
 
+def iter_windows(
+    matches, train_size: int, test_size: int, step: int
+) -> Iterator[tuple[Sequence, Sequence]]:
+    """
+    Yields (train matches, test matches) for each walk-forward window.
+
+    Lists and MatchFrames are sliced. Any other iterable (e.g. a generator
+    of matches or of MatchFrame batches) is consumed lazily, holding only
+    the current window.
+    """
+    size = train_size + test_size
+
+    if isinstance(matches, (MatchFrame, Sequence)):
+        start = 0
+        while start + size <= len(matches):
+            yield (
+                matches[start : start + train_size],
+                matches[start + train_size : start + size],
+            )
+            start += step
+        return
+
+    window: deque = deque()
+    skip = 0
+    for match in _iter_matches(matches):
+        if skip:
+            skip -= 1
+            continue
+
+        window.append(match)
+        if len(window) < size:
+            continue
+
+        rows = list(window)
+        yield rows[:train_size], rows[train_size:]
+
+        if step >= size:
+            window.clear()
+            skip = step - size
+        else:
+            for _ in range(step):
+                window.popleft()
+
+
+def _iter_matches(items: Iterable) -> Iterator:
+    for item in items:
+        if isinstance(item, MatchFrame):
+            yield from item
+        else:
+            yield item
+
+
 class WalkForwardService:
     def __init__(self):
         pass
 
-    def run(self, matches, config: SimulationConfig | SimulationRequest):
+    def run(
+        self,
+        matches,
+        config: SimulationConfig | SimulationRequest,
+        result_mode: str = "summary",
+    ):
+        """
+        Runs one engine per test window. Segments only need summary metrics,
+        so bets/equity points are only collected with result_mode="full".
+
+        ``matches`` may be a kickoff-ordered list or MatchFrame, or a
+        generator (see iter_windows).
+        """
         if isinstance(config, SimulationRequest):
             config = SimulationConfig.from_request(config)
 
@@ -23,27 +91,18 @@ class WalkForwardService:
         combined_bets = []
         combined_equity_curve = []
 
-        start = 0
         segment_index = 0
         running_bankroll = config.starting_bankroll
 
-        while True:
-            train_start = start
-            train_end = train_start + config.train_window_matches
-            test_end = train_end + config.test_window_matches
-
-            if test_end > len(matches):
-                break
-
-            train_matches = matches[train_start:train_end]
-            test_matches = matches[train_end:test_end]
-
+        for train_matches, test_matches in iter_windows(
+            matches, config.train_window_matches, config.test_window_matches, step
+        ):
             segment_config = config.with_starting_bankroll(
                 running_bankroll
             ).without_walk_forward()
 
             strategy = build_strategy(segment_config)
-            engine = SimulationEngine(segment_config, strategy)
+            engine = SimulationEngine(segment_config, strategy, result_mode=result_mode)
             result = engine.run(test_matches)
 
             segment_summary = {
@@ -84,7 +143,6 @@ class WalkForwardService:
 
             running_bankroll = result["final_bankroll"]
             segment_index += 1
-            start += step
 
         total_profit = running_bankroll - config.starting_bankroll
         aggregate_roi = (
@@ -26,6 +26,12 @@ class Settings(BaseSettings):
 
     cors_origins: str = Field(default="http://localhost:5173", alias="CORS_ORIGINS")
 
+    # Celery broker/result backend for background jobs
+    redis_url: str = Field(default="redis://localhost:6379/0", alias="REDIS_URL")
+    celery_task_always_eager: bool = Field(
+        default=False, alias="CELERY_TASK_ALWAYS_EAGER"
+    )
+
     @property
     def cors_origins_list(self) -> list[str]:
         return [
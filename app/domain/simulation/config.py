@@ -5,6 +5,45 @@ from typing import Literal
 
 from app.domain.simulation.models import CustomPeriodDefinition, SimulationRequest
 
+# SimulationRequest field -> (SimulationConfig field[, nested field]).
+REQUEST_FIELD_PATHS: dict[str, tuple[str, ...]] = {
+    "league": ("league",),
+    "leagues": ("leagues",),
+    "season": ("season",),
+    "selection": ("strategy", "selection"),
+    "rule_expression": ("strategy", "rule_expression"),
+    "staking_method": ("staking", "method"),
+    "fixed_stake": ("staking", "fixed_stake"),
+    "percent_stake": ("staking", "percent_stake"),
+    "kelly_fraction": ("staking", "kelly_fraction"),
+    "starting_bankroll": ("starting_bankroll",),
+    "multiple_legs": ("multiple_legs",),
+    "combo_mode": ("combo_mode",),
+    "min_odds": ("min_odds",),
+    "walk_forward": ("walk_forward", "enabled"),
+    "train_window_matches": ("walk_forward", "train_window_matches"),
+    "test_window_matches": ("walk_forward", "test_window_matches"),
+    "step_matches": ("walk_forward", "step_matches"),
+    "period_mode": ("calendar", "period_mode"),
+    "custom_periods": ("calendar", "custom_periods"),
+    "reset_bankroll_each_period": ("calendar", "reset_bankroll_each_period"),
+    "max_candidates_per_period": ("ranking", "max_candidates_per_period"),
+    "rank_by": ("ranking", "rank_by"),
+    "rank_order": ("ranking", "rank_order"),
+    "require_full_candidate_count": ("ranking", "require_full_candidate_count"),
+}
+
+# Same conversions as from_request.
+_REQUEST_FIELD_CONVERTERS = {
+    "leagues": lambda value: list(value) if value else None,
+    "starting_bankroll": float,
+    "multiple_legs": int,
+    "walk_forward": bool,
+    "custom_periods": lambda value: list(value or []),
+    "reset_bankroll_each_period": bool,
+    "require_full_candidate_count": bool,
+}
+
 
 @dataclass(frozen=True)
 class StrategyConfig:
@@ -56,6 +95,7 @@ class SimulationConfig:
     walk_forward: WalkForwardConfig
     calendar: CalendarConfig
     ranking: RankingConfig
+    combo_mode: Literal["first_valid", "greedy"] = "first_valid"
 
     @classmethod
     def from_request(cls, request: SimulationRequest) -> "SimulationConfig":
@@ -93,6 +133,7 @@ class SimulationConfig:
                 rank_order=request.rank_order,
                 require_full_candidate_count=bool(request.require_full_candidate_count),
             ),
+            combo_mode=request.combo_mode,
         )
 
     @property
@@ -166,6 +207,33 @@ class SimulationConfig:
     def with_updates(self, **changes) -> "SimulationConfig":
         return replace(self, **changes)
 
+    def with_request_fields(self, **fields) -> "SimulationConfig":
+        """
+        Copy with SimulationRequest fields (already validated) applied, as
+        from_request would map them; no pydantic validation involved.
+        """
+        changes = {}
+        nested: dict[str, dict] = {}
+
+        for name, value in fields.items():
+            path = REQUEST_FIELD_PATHS.get(name)
+            if path is None:
+                raise ValueError(f"Unknown request field: {name}")
+
+            convert = _REQUEST_FIELD_CONVERTERS.get(name)
+            if convert is not None:
+                value = convert(value)
+
+            if len(path) == 1:
+                changes[path[0]] = value
+            else:
+                nested.setdefault(path[0], {})[path[1]] = value
+
+        for group, group_changes in nested.items():
+            changes[group] = replace(getattr(self, group), **group_changes)
+
+        return self.with_updates(**changes)
+
     def with_starting_bankroll(self, bankroll: float) -> "SimulationConfig":
         return replace(self, starting_bankroll=float(bankroll))
 
@@ -1,87 +1,192 @@
-from collections import defaultdict, deque
+from collections import deque
+
+DEFAULT_WINDOW_SIZE = 5
+
+# Rolling feature name -> (team statistic, side); side "diff" is home - away.
+_FEATURE_SOURCES = {
+    "home_win_rate": ("win_rate", "home"),
+    "away_win_rate": ("win_rate", "away"),
+    "home_points": ("points", "home"),
+    "away_points": ("points", "away"),
+    "home_goal_diff": ("goal_diff", "home"),
+    "away_goal_diff": ("goal_diff", "away"),
+    "points_diff": ("points", "diff"),
+    "goal_diff_diff": ("goal_diff", "diff"),
+}
+
+ROLLING_FEATURE_NAMES = tuple(_FEATURE_SOURCES)
+
+
+def rolling_feature_name(name: str, window_size: int) -> str:
+    """Suffixed variable name, e.g. ("points_diff", 10) -> "points_diff_w10"."""
+    return f"{name}_w{window_size}"
+
+
+def split_rolling_name(name: str) -> tuple[str, int | None] | None:
+    """
+    Parses a rolling feature variable name.
+
+    Returns (base name, window) for suffixed names like "points_diff_w10",
+    (base name, None) for unsuffixed names (the context's own window) and None
+    for anything else.
+    """
+    if name in _FEATURE_SOURCES:
+        return name, None
+
+    base, sep, suffix = name.rpartition("_w")
+    if (
+        sep
+        and base in _FEATURE_SOURCES
+        and suffix.isascii()
+        and suffix.isdigit()
+        and int(suffix) >= 1
+    ):
+        return base, int(suffix)
+
+    return None
 
 
 class RollingContext:
-    def __init__(self, window_size=5):
+    """
+    Last results per team, kept as running sums for one or more windows.
+
+    ``window_size`` backs the unsuffixed feature names; ``extra_windows`` are
+    tracked in the same pass and exposed as "<name>_w<N>".
+
+    Teams are interned to integer ids and each team's history holds compact
+    (win, points, goal_diff) records instead of Match objects. Sums per window
+    are updated on append and on eviction, so every statistic is O(1).
+    """
+
+    def __init__(self, window_size=DEFAULT_WINDOW_SIZE, extra_windows=()):
         self.window_size = window_size
-        self.team_history = defaultdict(lambda: deque(maxlen=window_size))
+        self.windows = tuple(sorted({window_size, *extra_windows}))
+        if self.windows[0] < 1:
+            raise ValueError("window sizes must be at least 1")
+
+        self._window_index = {w: k for k, w in enumerate(self.windows)}
+        self._team_ids: dict[str, int] = {}
+        self._history: list[deque] = []
+        # team id -> [wins, points, goal_diff] per window
+        self._sums: list[list[list[int]]] = []
 
     def update(self, match):
-        self.team_history[match.home_team].append(match)
-        self.team_history[match.away_team].append(match)
+        result = match.result
+        margin = match.home_goals - match.away_goals
 
-    def get_recent(self, team):
-        return list(self.team_history[team])
+        if result == "H":
+            home, away = (1, 3), (0, 0)
+        elif result == "A":
+            home, away = (0, 0), (1, 3)
+        elif result == "D":
+            home, away = (0, 1), (0, 1)
+        else:
+            home, away = (0, 0), (0, 0)
 
-    def win_rate(self, team):
-        matches = self.get_recent(team)
-        if not matches:
+        self._push(match.home_team, (home[0], home[1], margin))
+        self._push(match.away_team, (away[0], away[1], -margin))
+
+    def _team_id(self, team) -> int:
+        team_id = self._team_ids.get(team)
+        if team_id is None:
+            team_id = len(self._history)
+            self._team_ids[team] = team_id
+            self._history.append(deque(maxlen=self.windows[-1]))
+            self._sums.append([[0, 0, 0] for _ in self.windows])
+        return team_id
+
+    def _push(self, team, record):
+        team_id = self._team_id(team)
+        history = self._history[team_id]
+        size = len(history)
+        win, points, goal_diff = record
+
+        for window, sums in zip(self.windows, self._sums[team_id]):
+            if size >= window:
+                old_win, old_points, old_goal_diff = history[-window]
+                sums[0] -= old_win
+                sums[1] -= old_points
+                sums[2] -= old_goal_diff
+
+            sums[0] += win
+            sums[1] += points
+            sums[2] += goal_diff
+
+        history.append(record)
+
+    def _window_sums(self, team, window):
+        """(sums, count) for a team's window, or None if it has no history."""
+        team_id = self._team_ids.get(team)
+        if team_id is None or not self._history[team_id]:
             return None
 
-        wins = 0
-        for m in matches:
-            if m.home_team == team and m.result == "H":
-                wins += 1
-            elif m.away_team == team and m.result == "A":
-                wins += 1
+        if window is None:
+            window = self.window_size
+        sums = self._sums[team_id][self._window_index[window]]
+        return sums, min(len(self._history[team_id]), window)
 
-        return wins / len(matches)
+    def win_rate(self, team, window=None):
+        state = self._window_sums(team, window)
+        if state is None:
+            return None
+        sums, count = state
+        return sums[0] / count
 
-    def points(self, team):
-        matches = self.get_recent(team)
-        if not matches:
+    def points(self, team, window=None):
+        state = self._window_sums(team, window)
+        if state is None:
             return None
+        return state[0][1]
 
-        pts = 0
-        for m in matches:
-            if m.home_team == team:
-                if m.result == "H":
-                    pts += 3
-                elif m.result == "D":
-                    pts += 1
-            else:  # away
-                if m.result == "A":
-                    pts += 3
-                elif m.result == "D":
-                    pts += 1
-        return pts
-
-    def goal_diff(self, team):
-        matches = self.get_recent(team)
-        if not matches:
+    def goal_diff(self, team, window=None):
+        state = self._window_sums(team, window)
+        if state is None:
             return None
+        return state[0][2]
 
-        gd = 0
-        for m in matches:
-            if m.home_team == team:
-                gd += m.home_goals - m.away_goals
+    def features_for_match(self, match, names=None):
+        """
+        Rolling features for a match, optionally limited to ``names``.
+
+        Each team statistic is computed at most once per call and only if a
+        requested feature needs it. Unknown names and windows this context
+        doesn't track are ignored.
+        """
+        if names is None:
+            names = ROLLING_FEATURE_NAMES
+
+        stats = {}
+
+        def stat(name, team, window):
+            key = (name, team, window)
+            if key not in stats:
+                stats[key] = getattr(self, name)(team, window)
+            return stats[key]
+
+        features = {}
+        for feature in names:
+            parsed = split_rolling_name(feature)
+            if parsed is None:
+                continue
+
+            base, window = parsed
+            if window is None:
+                window = self.window_size
+            elif window not in self._window_index:
+                continue
+
+            name, side = _FEATURE_SOURCES[base]
+            if side == "home":
+                features[feature] = stat(name, match.home_team, window)
+            elif side == "away":
+                features[feature] = stat(name, match.away_team, window)
             else:
-                gd += m.away_goals - m.home_goals
-        return gd
-
-    def features_for_match(self, match):
-        hw = self.win_rate(match.home_team)
-        aw = self.win_rate(match.away_team)
-        hp = self.points(match.home_team)
-        ap = self.points(match.away_team)
-        hgd = self.goal_diff(match.home_team)
-        agd = self.goal_diff(match.away_team)
-
-        # return None-safe diffs
-        def diff(a, b):
-            if a is None or b is None:
-                return None
-            return a - b
-
-        return {
-            # basic
-            "home_win_rate": hw,
-            "away_win_rate": aw,
-            "home_points": hp,
-            "away_points": ap,
-            "home_goal_diff": hgd,
-            "away_goal_diff": agd,
-            # diffs
-            "points_diff": diff(hp, ap),
-            "goal_diff_diff": diff(hgd, agd),
-        }
+                home = stat(name, match.home_team, window)
+                away = stat(name, match.away_team, window)
+                # None-safe diff
+                if home is None or away is None:
+                    features[feature] = None
+                else:
+                    features[feature] = home - away
+
+        return features
@@ -1,10 +1,14 @@
-from itertools import combinations, groupby
+import heapq
+from itertools import count, groupby
 from operator import attrgetter
+from typing import Callable, Iterable
 
 from app.domain.simulation.config import SimulationConfig
-from app.domain.simulation.context import RollingContext
+from app.domain.simulation.context import DEFAULT_WINDOW_SIZE, RollingContext
 from app.domain.simulation.entities import Match
+from app.domain.simulation.match_frame import MatchFrame
 from app.domain.simulation.models import SimulationRequest
+from app.domain.simulation.rolling_features import FrameRollingContext
 
 
 class SettledBet:
@@ -36,43 +40,96 @@ class Bet:
         self.combined_odds = combined_odds
         self.settles_at = settles_at
         self.selections = selections  # {match_id: "H"/"D"/"A"}
+        # Teams locked while this bet is open, released on settlement.
+        self.teams = tuple(
+            team for match in matches for team in (match.home_team, match.away_team)
+        )
 
 
-def settle_matured_bets(active_bets, kickoff, bankroll, team_locks, settle_all=False):
-    settled = []
+class ActiveBetBook:
+    """
+    Open bets kept in a heap ordered by settles_at.
 
-    for bet in active_bets[:]:
-        if settle_all or bet.settles_at <= kickoff:
-            is_win = all(
-                match.result == bet.selections[match.id] for match in bet.matches
-            )
+    Popping matured bets costs O(k log n) for the k bets that settle, instead
+    of scanning every open bet at each kickoff. Popped bets are returned in
+    placement order so settlement (and the equity curve) is unchanged.
+    """
+
+    def __init__(self):
+        self._heap: list[tuple] = []
+        self._sequence = count()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def __bool__(self) -> bool:
+        return bool(self._heap)
+
+    def add(self, bet: Bet) -> None:
+        heapq.heappush(self._heap, (bet.settles_at, next(self._sequence), bet))
+
+    def pop_matured(self, kickoff) -> list[Bet]:
+        heap = self._heap
+        matured = []
+
+        while heap and heap[0][0] <= kickoff:
+            _, seq, bet = heapq.heappop(heap)
+            matured.append((seq, bet))
+
+        matured.sort(key=lambda entry: entry[0])
+        return [bet for _, bet in matured]
+
+    @property
+    def open_stake(self) -> float:
+        return sum(entry[2].stake for entry in self._heap)
+
+    def pop_all(self) -> list[Bet]:
+        entries = sorted(self._heap, key=lambda entry: entry[1])
+        self._heap = []
+        return [bet for _, _, bet in entries]
 
-            if is_win:
-                return_amount = bet.stake * bet.combined_odds
-            else:
-                return_amount = 0
-
-            profit = return_amount - bet.stake
-            bankroll += return_amount
-
-            settled.append(
-                SettledBet(
-                    matches=bet.matches,
-                    stake=bet.stake,
-                    combined_odds=bet.combined_odds,
-                    selections=bet.selections,
-                    is_win=is_win,
-                    return_amount=return_amount,
-                    profit=profit,
-                    settled_at=bet.settles_at,
-                )
-            )
 
-            active_bets.remove(bet)
+def settle_bet(bet: Bet):
+    """Returns (is_win, return_amount, profit) for a bet whose matches are final."""
+    is_win = all(match.result == bet.selections[match.id] for match in bet.matches)
 
-            for match in bet.matches:
-                team_locks.pop(match.home_team, None)
-                team_locks.pop(match.away_team, None)
+    if is_win:
+        return_amount = bet.stake * bet.combined_odds
+    else:
+        return_amount = 0
+
+    return is_win, return_amount, return_amount - bet.stake
+
+
+def settle_matured_bets(
+    active_bets: ActiveBetBook, kickoff, bankroll, team_locks, settle_all=False
+):
+    settled = []
+
+    if settle_all:
+        matured = active_bets.pop_all()
+    else:
+        matured = active_bets.pop_matured(kickoff)
+
+    for bet in matured:
+        is_win, return_amount, profit = settle_bet(bet)
+        bankroll += return_amount
+
+        settled.append(
+            SettledBet(
+                matches=bet.matches,
+                stake=bet.stake,
+                combined_odds=bet.combined_odds,
+                selections=bet.selections,
+                is_win=is_win,
+                return_amount=return_amount,
+                profit=profit,
+                settled_at=bet.settles_at,
+            )
+        )
+
+        for team in bet.teams:
+            team_locks.pop(team, None)
 
     return bankroll, settled
 
@@ -102,123 +159,467 @@ def calculate_stake(config: SimulationConfig, bankroll, combined_odds, combined_
     return None
 
 
+COMBO_MODES = ("first_valid", "greedy")
+
+
+class ComboBuilder:
+    """
+    Pending multi-leg candidates with a team-conflict index.
+
+    mode="first_valid" returns exactly the combo the brute-force scan of
+    itertools.combinations(pending, legs) would pick (the lexicographically
+    first team-disjoint one) using a depth-first search that prunes a branch
+    as soon as a team repeats. When no pending team is shared by two
+    candidates the first ``legs`` candidates are returned directly.
+
+    mode="greedy" takes candidates in order and skips conflicting ones; it
+    is O(n) but may miss combos that only exist via backtracking.
+
+    Candidates are keyed by insertion sequence, so removing used legs is O(1)
+    per leg and insertion order is preserved.
+    """
+
+    def __init__(self, legs: int, mode: str = "first_valid"):
+        if mode not in COMBO_MODES:
+            raise ValueError(f"combo_mode must be one of {list(COMBO_MODES)}")
+
+        self.legs = legs
+        self.mode = mode
+        self._pending: dict[int, tuple[Match, str]] = {}
+        self._team_keys: dict[str, set[int]] = {}
+        self._shared_teams = 0
+        self._sequence = count()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def extend(self, candidates: list[tuple[Match, str]]) -> None:
+        for candidate in candidates:
+            key = next(self._sequence)
+            self._pending[key] = candidate
+
+            match = candidate[0]
+            for team in {match.home_team, match.away_team}:
+                keys = self._team_keys.setdefault(team, set())
+                keys.add(key)
+                if len(keys) == 2:
+                    self._shared_teams += 1
+
+    def remove(self, keys: list[int]) -> None:
+        for key in keys:
+            match = self._pending.pop(key)[0]
+
+            for team in {match.home_team, match.away_team}:
+                team_keys = self._team_keys[team]
+                team_keys.discard(key)
+                if len(team_keys) == 1:
+                    self._shared_teams -= 1
+                elif not team_keys:
+                    del self._team_keys[team]
+
+    def candidates(self, keys: list[int]) -> list[tuple[Match, str]]:
+        return [self._pending[key] for key in keys]
+
+    def find(self) -> list[int] | None:
+        """Keys of the next valid combo, or None when no combo can be built."""
+        if len(self._pending) < self.legs:
+            return None
+
+        if self._shared_teams == 0:
+            return list(self._pending)[: self.legs]
+
+        if self.mode == "greedy":
+            return self._find_greedy()
+
+        return self._find_first_valid()
+
+    def _find_greedy(self) -> list[int] | None:
+        chosen: list[int] = []
+        used: set[str] = set()
+
+        for key, (match, _) in self._pending.items():
+            if match.home_team in used or match.away_team in used:
+                continue
+
+            chosen.append(key)
+            used.add(match.home_team)
+            used.add(match.away_team)
+
+            if len(chosen) == self.legs:
+                return chosen
+
+        return None
+
+    def _find_first_valid(self) -> list[int] | None:
+        entries = [
+            (key, match.home_team, match.away_team)
+            for key, (match, _) in self._pending.items()
+        ]
+        total = len(entries)
+        legs = self.legs
+        chosen: list[int] = []
+        used: set[str] = set()
+
+        def search(start: int) -> bool:
+            if len(chosen) == legs:
+                return True
+
+            need = legs - len(chosen)
+            for pos in range(start, total - need + 1):
+                key, home_team, away_team = entries[pos]
+                if home_team in used or away_team in used:
+                    continue
+
+                chosen.append(key)
+                used.add(home_team)
+                used.add(away_team)
+
+                if search(pos + 1):
+                    return True
+
+                chosen.pop()
+                used.discard(home_team)
+                used.discard(away_team)
+
+            return False
+
+        return chosen if search(0) else None
+
+
 def build_valid_combo(
     eligible: list[tuple[Match, str]],
     multiple_legs: int,
 ) -> list[tuple[Match, str]] | None:
-    for candidate in combinations(eligible, multiple_legs):
-        teams = set()
-        valid = True
+    builder = ComboBuilder(multiple_legs)
+    builder.extend(eligible)
 
-        for match, _ in candidate:
-            if match.home_team in teams or match.away_team in teams:
-                valid = False
-                break
+    keys = builder.find()
+    if keys is None:
+        return None
 
-            teams.add(match.home_team)
-            teams.add(match.away_team)
+    return builder.candidates(keys)
 
-        if valid:
-            return list(candidate)
 
-    return None
+class MetricsAccumulator:
+    """Streaming totals behind calculate_metrics; no per-bet objects required."""
+
+    def __init__(self):
+        self.total_bets = 0
+        self.total_wins = 0
+        self.total_staked = 0
+        self.gross_profit = 0
+        self.gross_loss = 0
+
+    def add(self, stake, is_win, profit):
+        self.total_bets += 1
+        if is_win:
+            self.total_wins += 1
+
+        self.total_staked += stake
+
+        if profit > 0:
+            self.gross_profit += profit
+        elif profit < 0:
+            self.gross_loss += profit
+
+    def as_dict(self, starting_bankroll, final_bankroll):
+        total_bets = self.total_bets
+        total_wins = self.total_wins
+        total_losses = total_bets - total_wins
+
+        total_staked = self.total_staked
+        total_profit = final_bankroll - starting_bankroll
+
+        roi_percent = (total_profit / total_staked * 100) if total_staked > 0 else 0
+        strike_rate_percent = (total_wins / total_bets * 100) if total_bets > 0 else 0
+
+        gross_profit = self.gross_profit
+        gross_loss = abs(self.gross_loss)
+        profit_factor = (gross_profit / gross_loss) if gross_loss > 0 else None
+
+        return {
+            "total_bets": total_bets,
+            "total_wins": total_wins,
+            "total_losses": total_losses,
+            "roi_percent": round(roi_percent, 2),
+            "strike_rate_percent": round(strike_rate_percent, 2),
+            "profit_factor": (
+                round(profit_factor, 2) if profit_factor is not None else None
+            ),
+            "total_staked": round(total_staked, 2),
+            "total_profit": round(total_profit, 2),
+        }
 
 
 def calculate_metrics(settled_bets, starting_bankroll, final_bankroll):
-    total_bets = len(settled_bets)
-    total_wins = sum(1 for b in settled_bets if b.is_win)
-    total_losses = total_bets - total_wins
+    accumulator = MetricsAccumulator()
+    for b in settled_bets:
+        accumulator.add(b.stake, b.is_win, b.profit)
+
+    return accumulator.as_dict(starting_bankroll, final_bankroll)
 
-    total_staked = sum(b.stake for b in settled_bets)
-    total_profit = final_bankroll - starting_bankroll
 
-    roi_percent = (total_profit / total_staked * 100) if total_staked > 0 else 0
-    strike_rate_percent = (total_wins / total_bets * 100) if total_bets > 0 else 0
+RESULT_MODES = ("full", "summary")
 
-    gross_profit = sum(b.profit for b in settled_bets if b.profit > 0)
-    gross_loss = abs(sum(b.profit for b in settled_bets if b.profit < 0))
-    profit_factor = (gross_profit / gross_loss) if gross_loss > 0 else None
+# Matches between progress_callback calls.
+PROGRESS_EVERY_MATCHES = 5000
 
-    return {
-        "total_bets": total_bets,
-        "total_wins": total_wins,
-        "total_losses": total_losses,
-        "roi_percent": round(roi_percent, 2),
-        "strike_rate_percent": round(strike_rate_percent, 2),
-        "profit_factor": round(profit_factor, 2) if profit_factor is not None else None,
-        "total_staked": round(total_staked, 2),
-        "total_profit": round(total_profit, 2),
-    }
+
+def iter_kickoff_batches(matches: Iterable[Match] | MatchFrame):
+    """Yield (kickoff, matches) for runs of consecutive matches sharing a kickoff."""
+    if isinstance(matches, MatchFrame):
+        yield from matches.kickoff_batches()
+        return
+
+    for kickoff, group in groupby(matches, key=attrgetter("kickoff")):
+        yield kickoff, list(group)
 
 
 class SimulationEngine:
-    def __init__(self, config: SimulationConfig | SimulationRequest, strategy):
+    """
+    Runs a strategy over kickoff-ordered matches.
+
+    Either call run(matches) once, run_batches(chunks) over a generator of
+    chunks, or stream chunks with feed(batch), inspect progress with
+    snapshot() and finish with close(); all produce the same result.
+
+    result_mode="full" returns every settled bet and the equity curve.
+    result_mode="summary" only keeps streaming metric/drawdown accumulators
+    and returns empty "bets"/"equity_curve" lists (used by sweeps).
+
+    progress_callback, if given, is called with snapshot() each time another
+    PROGRESS_EVERY_MATCHES matches have been processed.
+    """
+
+    def __init__(
+        self,
+        config: SimulationConfig | SimulationRequest,
+        strategy,
+        result_mode: str = "full",
+        progress_callback: Callable[[dict], None] | None = None,
+    ):
         if isinstance(config, SimulationRequest):
             config = SimulationConfig.from_request(config)
 
+        if result_mode not in RESULT_MODES:
+            raise ValueError(f"result_mode must be one of {list(RESULT_MODES)}")
+
         self.config = config
         self.strategy = strategy
+        self.update_context = getattr(strategy, "uses_context", True)
+        self.result_mode = result_mode
+        self.keep_bets = result_mode == "full"
 
         # Simulation state
-        self.context = RollingContext(window_size=5)
+        self.rolling_windows = getattr(strategy, "rolling_windows", frozenset())
+        self.context = RollingContext(
+            window_size=DEFAULT_WINDOW_SIZE, extra_windows=self.rolling_windows
+        )
         self.bankroll = config.starting_bankroll
-        self.active_bets = []
+        self.active_bets = ActiveBetBook()
         self.settled_bets = []
         self.team_locks = {}
-        self.pending_candidates = []
+        self.combo_builder = ComboBuilder(config.multiple_legs, mode=config.combo_mode)
 
         # Metrics tracking
+        self.metrics = MetricsAccumulator()
         self.max_drawdown = 0
         self.peak_bankroll = self.bankroll
-        self.equity_curve = [{"t": None, "bankroll": round(self.bankroll, 2)}]
+        self.equity_curve = (
+            [{"t": None, "bankroll": round(self.bankroll, 2)}] if self.keep_bets else []
+        )
 
-    def run(self, matches: list[Match]):
-        available_features = sorted(
-            {k for m in matches for k in (getattr(m, "features", {}) or {}).keys()}
+        # Streaming state
+        self.feature_names = set()
+        self.matches_processed = 0
+        self.last_kickoff = None
+        self.closed = False
+        self._pending_kickoff = None
+        self._pending_batch = []
+        self._pending_candidates = None
+        self.progress_callback = progress_callback
+        self._next_progress = PROGRESS_EVERY_MATCHES
+
+    def run(self, matches: Iterable[Match] | MatchFrame):
+        # A whole frame in one pass can read cached rolling columns instead
+        # of driving the live context.
+        if (
+            isinstance(matches, MatchFrame)
+            and self.update_context
+            and self.matches_processed == 0
+            and self._pending_kickoff is None
+        ):
+            self.context = FrameRollingContext(
+                matches, DEFAULT_WINDOW_SIZE, extra_windows=self.rolling_windows
+            )
+            self.update_context = False
+
+        self.feed(matches)
+        return self.close()
+
+    def run_batches(self, batches: Iterable[Iterable[Match] | MatchFrame]):
+        """
+        run() over a stream of kickoff-ordered chunks, e.g. the frames from
+        iter_match_frames_from_csv, consuming them one at a time.
+        """
+        for batch in batches:
+            self.feed(batch)
+        return self.close()
+
+    def feed(self, batch: Iterable[Match] | MatchFrame):
+        """
+        Consumes the next chunk of kickoff-ordered matches.
+
+        The last kickoff group of every chunk is held back until a later
+        kickoff (or close()) arrives, so a kickoff split across two chunks is
+        still processed as a single batch.
+        """
+        if self.closed:
+            raise RuntimeError("SimulationEngine is closed")
+
+        mask = None
+        if isinstance(batch, MatchFrame):
+            self.feature_names.update(batch.features.keys())
+            mask = self._candidate_mask(batch)
+
+        for kickoff, rows in iter_kickoff_batches(batch):
+            if not isinstance(batch, MatchFrame):
+                for m in rows:
+                    self.feature_names.update((getattr(m, "features", {}) or {}).keys())
+
+            # Rows the strategy could bet on; None means "evaluate every row".
+            candidates = None
+            if mask is not None:
+                candidates = [row for row in rows if mask[row.index]]
+
+            if self._pending_kickoff is not None:
+                if kickoff == self._pending_kickoff:
+                    self._pending_batch.extend(rows)
+                    if self._pending_candidates is None or candidates is None:
+                        self._pending_candidates = None
+                    else:
+                        self._pending_candidates.extend(candidates)
+                    continue
+                self._process_pending()
+
+            self._pending_kickoff = kickoff
+            self._pending_batch = rows
+            self._pending_candidates = candidates
+
+    def snapshot(self) -> dict:
+        """
+        Cheap view of metrics for the matches processed so far.
+
+        Open bets are valued at their stake, i.e. excluded from profit until
+        they settle.
+        """
+        open_stake = self.active_bets.open_stake
+        metrics = self.metrics.as_dict(
+            self.config.starting_bankroll, self.bankroll + open_stake
         )
 
-        for kickoff, group in groupby(matches, key=attrgetter("kickoff")):
-            batch = list(group)
-            self._settle_matured(kickoff)
-            self._process_kickoff_batch(batch)
+        return {
+            "matches_processed": self.matches_processed,
+            "last_kickoff": (
+                self.last_kickoff.isoformat() if self.last_kickoff else None
+            ),
+            "bankroll": round(self.bankroll, 2),
+            "open_bets": len(self.active_bets),
+            "open_stake": round(open_stake, 2),
+            "max_drawdown_percent": round(self.max_drawdown * 100, 2),
+            **metrics,
+        }
+
+    def close(self):
+        """Processes any held-back kickoff, settles open bets and returns the result."""
+        if self.closed:
+            raise RuntimeError("SimulationEngine is closed")
 
-        self._final_settlement(matches)
+        if self._pending_kickoff is not None:
+            self._process_pending()
 
-        metrics = calculate_metrics(
-            self.settled_bets,
-            self.config.starting_bankroll,
-            self.bankroll,
-        )
+        self._final_settlement(self.last_kickoff)
+        self.closed = True
+
+        metrics = self.metrics.as_dict(self.config.starting_bankroll, self.bankroll)
 
         return {
             "bets": [self._serialize_bet(b) for b in self.settled_bets],
             "final_bankroll": round(self.bankroll, 2),
-            "available_features": available_features,
+            "available_features": sorted(self.feature_names),
             "max_drawdown_percent": round(self.max_drawdown * 100, 2),
             "equity_curve": self.equity_curve,
             "run_config": self.config.to_run_config(),
             **metrics,
         }
 
-    def _settle_matured(self, kickoff):
-        self.bankroll, newly_settled = settle_matured_bets(
-            self.active_bets,
-            kickoff,
-            self.bankroll,
-            self.team_locks,
-        )
+    def _process_pending(self):
+        kickoff, batch = self._pending_kickoff, self._pending_batch
+        candidates = self._pending_candidates
+        self._pending_kickoff = None
+        self._pending_batch = []
+        self._pending_candidates = None
 
-        self.settled_bets.extend(newly_settled)
-        for b in newly_settled:
-            self.equity_curve.append(
-                {"t": b.settled_at.isoformat(), "bankroll": round(self.bankroll, 2)}
-            )
+        self._settle_matured(kickoff)
+        self._process_kickoff_batch(batch, candidates)
+
+        self.matches_processed += len(batch)
+        self.last_kickoff = kickoff
+
+        if (
+            self.progress_callback is not None
+            and self.matches_processed >= self._next_progress
+        ):
+            self._next_progress = self.matches_processed + PROGRESS_EVERY_MATCHES
+            self.progress_callback(self.snapshot())
+
+    def _settle_matured(self, kickoff):
+        self._settle(self.active_bets.pop_matured(kickoff))
         self._update_drawdown()
 
-    def _process_kickoff_batch(self, batch):
+    def _settle(self, bets: list[Bet]):
+        for bet in bets:
+            is_win, return_amount, profit = settle_bet(bet)
+            self.bankroll += return_amount
+            self.metrics.add(bet.stake, is_win, profit)
+
+            for team in bet.teams:
+                self.team_locks.pop(team, None)
+
+            if self.keep_bets:
+                self.settled_bets.append(
+                    SettledBet(
+                        matches=bet.matches,
+                        stake=bet.stake,
+                        combined_odds=bet.combined_odds,
+                        selections=bet.selections,
+                        is_win=is_win,
+                        return_amount=return_amount,
+                        profit=profit,
+                        settled_at=bet.settles_at,
+                    )
+                )
+
+        if self.keep_bets:
+            # Points for one settlement batch share the post-batch bankroll.
+            bankroll = round(self.bankroll, 2)
+            for bet in bets:
+                self.equity_curve.append(
+                    {"t": bet.settles_at.isoformat(), "bankroll": bankroll}
+                )
+
+    def _candidate_mask(self, frame: MatchFrame):
+        candidate_mask = getattr(self.strategy, "candidate_mask", None)
+        if candidate_mask is None:
+            return None
+        return candidate_mask(frame)
+
+    def _process_kickoff_batch(self, batch, candidates=None):
         eligible = []
 
-        for match in batch:
+        # Rows outside the candidate mask can never be bet on, so only the
+        # candidates need evaluating; the context still sees the whole batch.
+        for match in batch if candidates is None else candidates:
             if match.home_team in self.team_locks or match.away_team in self.team_locks:
                 continue
 
@@ -232,30 +633,22 @@ class SimulationEngine:
             for candidate in eligible:
                 self._attempt_place_bet([candidate])
         else:
-            self.pending_candidates.extend(eligible)
+            self.combo_builder.extend(eligible)
 
-            while len(self.pending_candidates) >= self.config.multiple_legs:
-                combo = build_valid_combo(
-                    self.pending_candidates,
-                    self.config.multiple_legs,
-                )
-
-                if not combo:
+            while len(self.combo_builder) >= self.config.multiple_legs:
+                keys = self.combo_builder.find()
+                if keys is None:
                     break
 
-                placed = self._attempt_place_bet(combo)
+                placed = self._attempt_place_bet(self.combo_builder.candidates(keys))
                 if not placed:
                     break
 
-                used_match_ids = {match.id for match, _ in combo}
-                self.pending_candidates = [
-                    candidate
-                    for candidate in self.pending_candidates
-                    if candidate[0].id not in used_match_ids
-                ]
+                self.combo_builder.remove(keys)
 
-        for match in batch:
-            self.context.update(match)
+        if self.update_context:
+            for match in batch:
+                self.context.update(match)
 
     def _attempt_place_bet(self, combo: list[tuple[Match, str]]):
         combined_odds = 1
@@ -301,39 +694,25 @@ class SimulationEngine:
         settles_at = max(match.kickoff for match, _ in combo)
         matches = [match for match, _ in combo]
 
-        self.bankroll -= stake
-        self.active_bets.append(
-            Bet(
-                matches=matches,
-                stake=stake,
-                combined_odds=combined_odds,
-                settles_at=settles_at,
-                selections=selections,
-            )
+        bet = Bet(
+            matches=matches,
+            stake=stake,
+            combined_odds=combined_odds,
+            settles_at=settles_at,
+            selections=selections,
         )
 
-        for match in matches:
-            self.team_locks[match.home_team] = True
-            self.team_locks[match.away_team] = True
+        self.bankroll -= stake
+        self.active_bets.add(bet)
 
-        return True
+        for team in bet.teams:
+            self.team_locks[team] = True
 
-    def _final_settlement(self, matches):
-        if matches:
-            final_kickoff = max(match.kickoff for match in matches)
-            self.bankroll, newly_settled = settle_matured_bets(
-                self.active_bets,
-                final_kickoff,
-                self.bankroll,
-                self.team_locks,
-                settle_all=True,
-            )
-            self.settled_bets.extend(newly_settled)
+        return True
 
-            for b in newly_settled:
-                self.equity_curve.append(
-                    {"t": b.settled_at.isoformat(), "bankroll": round(self.bankroll, 2)}
-                )
+    def _final_settlement(self, final_kickoff):
+        if final_kickoff is not None:
+            self._settle(self.active_bets.pop_all())
             self._update_drawdown()
 
     def _update_drawdown(self):
@@ -5,7 +5,8 @@ from uuid import UUID
 
 @dataclass(frozen=True)
 class Match:
-    id: UUID
+    # int for dataset rows (see in_memory_dataset_loader.match_id_base)
+    id: UUID | int
     league: str
     season: str
     kickoff: datetime
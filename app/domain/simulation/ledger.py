@@ -0,0 +1,68 @@
+from app.domain.simulation.context import DEFAULT_WINDOW_SIZE, RollingContext
+from app.domain.simulation.engine import iter_kickoff_batches
+from app.domain.simulation.match_frame import MatchFrame
+from app.domain.simulation.rolling_features import FrameRollingContext
+from app.domain.simulation.strategy import BaseStrategy, StrategyDecision
+
+
+class DecisionLedger:
+    """
+    Strategy decisions recorded once for a fixed set of matches.
+
+    Rule decisions only depend on the match and the rolling context, and the
+    engine updates the context for every match regardless of bets placed. So
+    variants that differ only in staking, bankroll or min_odds can replay the
+    same ledger instead of re-evaluating the rule.
+    """
+
+    def __init__(self, selections: dict):
+        # match id -> selection, only for matches the strategy would bet on
+        self.selections = selections
+
+    def __len__(self) -> int:
+        return len(self.selections)
+
+    @classmethod
+    def record(cls, strategy, matches) -> "DecisionLedger":
+        update_context = getattr(strategy, "uses_context", True)
+        windows = getattr(strategy, "rolling_windows", frozenset())
+        if update_context and isinstance(matches, MatchFrame):
+            context = FrameRollingContext(
+                matches, DEFAULT_WINDOW_SIZE, extra_windows=windows
+            )
+            update_context = False
+        else:
+            context = RollingContext(
+                window_size=DEFAULT_WINDOW_SIZE, extra_windows=windows
+            )
+        selections = {}
+
+        # Mirrors SimulationEngine: every match of a kickoff batch is
+        # evaluated before the context sees any of them.
+        for _, batch in iter_kickoff_batches(matches):
+            for match in batch:
+                decision = strategy.evaluate(match, context=context)
+                if decision.place_bet:
+                    selections[match.id] = decision.selection
+
+            if update_context:
+                for match in batch:
+                    context.update(match)
+
+        return cls(selections)
+
+
+class ReplayStrategy(BaseStrategy):
+    """Replays a DecisionLedger; never touches the rolling context."""
+
+    uses_context = False
+
+    def __init__(self, ledger: DecisionLedger):
+        self.ledger = ledger
+
+    def evaluate(self, match, context=None):
+        selection = self.ledger.selections.get(match.id)
+        if selection is None:
+            return StrategyDecision(False)
+
+        return StrategyDecision(True, selection)
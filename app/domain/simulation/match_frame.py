@@ -0,0 +1,639 @@
+from __future__ import annotations
+
+import hashlib
+import math
+from array import array
+from datetime import datetime, timedelta, tzinfo
+from typing import Any, Iterable, Iterator, Sequence
+
+from app.domain.simulation.entities import Match
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _optional(value: float) -> float | None:
+    # NaN marks a missing value in float columns.
+    return None if value != value else value
+
+
+# Match fields addressable by name via MatchFrame.values(), mapped to
+# (column attribute, whether NaN means missing).
+_VALUE_COLUMNS = {
+    "home_team": ("home_teams", False),
+    "away_team": ("away_teams", False),
+    "home_goals": ("home_goals", False),
+    "away_goals": ("away_goals", False),
+    "home_win_odds": ("home_win_odds", False),
+    "draw_odds": ("draw_odds", False),
+    "away_win_odds": ("away_win_odds", False),
+    "model_home_prob": ("model_home_prob", True),
+    "model_draw_prob": ("model_draw_prob", True),
+    "model_away_prob": ("model_away_prob", True),
+}
+
+
+def _to_column_float(value: Any) -> float:
+    if value is None:
+        return math.nan
+    return float(value)
+
+
+class MatchRow:
+    """
+    Lightweight, read-only view of one row of a MatchFrame.
+
+    Exposes the same attributes as the Match entity so strategies, the engine
+    and serializers can use it interchangeably.
+    """
+
+    __slots__ = ("frame", "index")
+
+    def __init__(self, frame: "MatchFrame", index: int):
+        self.frame = frame
+        self.index = index
+
+    @property
+    def id(self):
+        return self.frame.ids[self.index]
+
+    @property
+    def league(self) -> str:
+        return self.frame.leagues[self.index]
+
+    @property
+    def season(self) -> str:
+        return self.frame.seasons[self.index]
+
+    @property
+    def kickoff(self) -> datetime:
+        return self.frame.kickoff_at(self.index)
+
+    @property
+    def home_team(self) -> str:
+        return self.frame.home_teams[self.index]
+
+    @property
+    def away_team(self) -> str:
+        return self.frame.away_teams[self.index]
+
+    @property
+    def home_goals(self) -> int:
+        return self.frame.home_goals[self.index]
+
+    @property
+    def away_goals(self) -> int:
+        return self.frame.away_goals[self.index]
+
+    @property
+    def result(self) -> str:
+        return self.frame.results[self.index]
+
+    @property
+    def home_win_odds(self) -> float:
+        return self.frame.home_win_odds[self.index]
+
+    @property
+    def draw_odds(self) -> float:
+        return self.frame.draw_odds[self.index]
+
+    @property
+    def away_win_odds(self) -> float:
+        return self.frame.away_win_odds[self.index]
+
+    @property
+    def model_home_prob(self) -> float | None:
+        return _optional(self.frame.model_home_prob[self.index])
+
+    @property
+    def model_draw_prob(self) -> float | None:
+        return _optional(self.frame.model_draw_prob[self.index])
+
+    @property
+    def model_away_prob(self) -> float | None:
+        return _optional(self.frame.model_away_prob[self.index])
+
+    @property
+    def features(self) -> dict[str, float | None]:
+        i = self.index
+        return {
+            name: _optional(column[i]) for name, column in self.frame.features.items()
+        }
+
+    def to_match(self) -> Match:
+        return Match(
+            id=self.id,
+            league=self.league,
+            season=self.season,
+            kickoff=self.kickoff,
+            home_team=self.home_team,
+            away_team=self.away_team,
+            home_goals=self.home_goals,
+            away_goals=self.away_goals,
+            result=self.result,
+            home_win_odds=self.home_win_odds,
+            draw_odds=self.draw_odds,
+            away_win_odds=self.away_win_odds,
+            model_home_prob=self.model_home_prob,
+            model_draw_prob=self.model_draw_prob,
+            model_away_prob=self.model_away_prob,
+            features=self.features,
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"MatchRow(index={self.index}, kickoff={self.kickoff.isoformat()}, "
+            f"{self.home_team} vs {self.away_team})"
+        )
+
+
+class MatchFrame:
+    """
+    Column-oriented collection of matches.
+
+    Kickoffs are stored as int64 microseconds since the epoch, goals as int64,
+    odds/probabilities/features as float64 arrays (NaN meaning "missing").
+    Teams, leagues, seasons and results are interned strings.
+
+    Iterating or indexing yields MatchRow views; Match objects are only built
+    on demand via ``to_match`` / ``to_matches``.
+    """
+
+    def __init__(
+        self,
+        *,
+        ids: Sequence,
+        leagues: Sequence[str],
+        seasons: Sequence[str],
+        kickoffs: Sequence[int],
+        home_teams: Sequence[str],
+        away_teams: Sequence[str],
+        home_goals: Sequence[int],
+        away_goals: Sequence[int],
+        results: Sequence[str],
+        home_win_odds: Sequence[float],
+        draw_odds: Sequence[float],
+        away_win_odds: Sequence[float],
+        model_home_prob: Sequence[float],
+        model_draw_prob: Sequence[float],
+        model_away_prob: Sequence[float],
+        features: dict[str, Sequence[float]] | None = None,
+        tz: tzinfo | None = None,
+    ):
+        self.ids = ids
+        self.leagues = leagues
+        self.seasons = seasons
+        self.kickoffs = kickoffs
+        self.home_teams = home_teams
+        self.away_teams = away_teams
+        self.home_goals = home_goals
+        self.away_goals = away_goals
+        self.results = results
+        self.home_win_odds = home_win_odds
+        self.draw_odds = draw_odds
+        self.away_win_odds = away_win_odds
+        self.model_home_prob = model_home_prob
+        self.model_draw_prob = model_draw_prob
+        self.model_away_prob = model_away_prob
+        self.features = features or {}
+        self.tz = tz
+        # float64 columns computed from this frame's own rows (e.g. rolling
+        # form), NaN for missing; read-only once attached and not carried
+        # over by take().
+        self.derived_columns: dict[str, Sequence] = {}
+        self._results_fingerprint: str | None = None
+
+    def __getstate__(self):
+        # Columns may be memoryviews over a memory-mapped file, which can't be
+        # pickled (e.g. to sweep worker processes); send them as arrays.
+        state = dict(self.__dict__)
+        for name, value in state.items():
+            if isinstance(value, memoryview):
+                state[name] = array(value.format, value)
+        state["features"] = {
+            name: array(column.format, column)
+            if isinstance(column, memoryview)
+            else column
+            for name, column in self.features.items()
+        }
+        return state
+
+    # -----------------------------------------------------
+    # Construction
+    # -----------------------------------------------------
+
+    @classmethod
+    def from_matches(cls, matches: Iterable[Any]) -> "MatchFrame":
+        matches = list(matches)
+        feature_names = sorted(
+            {k for m in matches for k in (getattr(m, "features", {}) or {}).keys()}
+        )
+
+        builder = MatchFrameBuilder(feature_names)
+        for match in matches:
+            builder.append_match(match)
+        return builder.build()
+
+    @classmethod
+    def gather(
+        cls, frames: Sequence["MatchFrame"], picks: Iterable[tuple[int, int]]
+    ) -> "MatchFrame":
+        """
+        Rows picked from several frames as (frame index, row index) pairs, in
+        order. The frames must share features and timezone, e.g. chunks of
+        one dataset built by MatchFrameBuilder.new_chunk().
+        """
+        picks = list(picks)
+
+        def pick(column_of, typecode=None):
+            columns = [column_of(frame) for frame in frames]
+            values = [columns[f][i] for f, i in picks]
+            if typecode is None:
+                return values
+            return array(typecode, values)
+
+        def column(name, typecode=None):
+            return pick(lambda frame: getattr(frame, name), typecode)
+
+        return cls(
+            ids=column("ids"),
+            leagues=column("leagues"),
+            seasons=column("seasons"),
+            kickoffs=column("kickoffs", "q"),
+            home_teams=column("home_teams"),
+            away_teams=column("away_teams"),
+            home_goals=column("home_goals", "q"),
+            away_goals=column("away_goals", "q"),
+            results=column("results"),
+            home_win_odds=column("home_win_odds", "d"),
+            draw_odds=column("draw_odds", "d"),
+            away_win_odds=column("away_win_odds", "d"),
+            model_home_prob=column("model_home_prob", "d"),
+            model_draw_prob=column("model_draw_prob", "d"),
+            model_away_prob=column("model_away_prob", "d"),
+            features={
+                name: pick(lambda frame, name=name: frame.features[name], "d")
+                for name in frames[0].features
+            },
+            tz=frames[0].tz,
+        )
+
+    # -----------------------------------------------------
+    # Sequence protocol
+    # -----------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self.kickoffs)
+
+    def __iter__(self) -> Iterator[MatchRow]:
+        for i in range(len(self.kickoffs)):
+            yield MatchRow(self, i)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return self.take(range(*key.indices(len(self))))
+
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError("MatchFrame index out of range")
+        return MatchRow(self, key)
+
+    # -----------------------------------------------------
+    # Accessors
+    # -----------------------------------------------------
+
+    @property
+    def feature_names(self) -> list[str]:
+        return sorted(self.features.keys())
+
+    def kickoff_at(self, index: int) -> datetime:
+        kickoff = _EPOCH + timedelta(microseconds=self.kickoffs[index])
+        if self.tz is not None:
+            kickoff = kickoff.replace(tzinfo=self.tz)
+        return kickoff
+
+    def kickoff_batches(self) -> Iterator[tuple[datetime, list[MatchRow]]]:
+        """Yield (kickoff, rows) groups of consecutive rows sharing a kickoff."""
+        kickoffs = self.kickoffs
+        n = len(kickoffs)
+        start = 0
+
+        while start < n:
+            value = kickoffs[start]
+            end = start + 1
+            while end < n and kickoffs[end] == value:
+                end += 1
+
+            yield self.kickoff_at(start), [MatchRow(self, i) for i in range(start, end)]
+            start = end
+
+    def has_values(self, name: str) -> bool:
+        return (
+            name in self.features
+            or name in self.derived_columns
+            or name in _VALUE_COLUMNS
+        )
+
+    def values(self, name: str) -> list:
+        """
+        Column ``name`` as plain Python values, missing floats as None.
+
+        Dataset features shadow derived columns, which shadow match fields of
+        the same name, as they do in rule evaluation.
+        """
+        column, optional = self.raw_column(name)
+        if optional:
+            return [_optional(v) for v in column]
+        return list(column)
+
+    def raw_column(self, name: str) -> tuple[Sequence, bool]:
+        """
+        Column ``name`` as stored, with the same precedence as values(), and
+        whether NaN in it means "missing".
+        """
+        if name in self.features:
+            return self.features[name], True
+
+        if name in self.derived_columns:
+            return self.derived_columns[name], True
+
+        attr, optional = _VALUE_COLUMNS[name]
+        return getattr(self, attr), optional
+
+    def results_fingerprint(self) -> str:
+        """
+        Digest of the kickoff, team, goal and result columns.
+
+        These fully determine rolling form features, so equal fingerprints
+        mean derived rolling columns can be shared between frames.
+        """
+        if self._results_fingerprint is None:
+            digest = hashlib.blake2b(digest_size=16)
+            for column in (self.kickoffs, self.home_goals, self.away_goals):
+                digest.update(array("q", column).tobytes())
+            for column in (self.home_teams, self.away_teams, self.results):
+                digest.update("\x1f".join(map(str, column)).encode())
+                digest.update(b"\x1e")
+            self._results_fingerprint = digest.hexdigest()
+
+        return self._results_fingerprint
+
+    def to_match(self, index: int) -> Match:
+        return MatchRow(self, index).to_match()
+
+    def to_matches(self) -> list[Match]:
+        return [row.to_match() for row in self]
+
+    # -----------------------------------------------------
+    # Derived frames
+    # -----------------------------------------------------
+
+    def take(self, indices: Iterable[int]) -> "MatchFrame":
+        indices = list(indices)
+
+        def pick(column, typecode=None):
+            if typecode is None:
+                return [column[i] for i in indices]
+            return array(typecode, [column[i] for i in indices])
+
+        return MatchFrame(
+            ids=pick(self.ids),
+            leagues=pick(self.leagues),
+            seasons=pick(self.seasons),
+            kickoffs=pick(self.kickoffs, "q"),
+            home_teams=pick(self.home_teams),
+            away_teams=pick(self.away_teams),
+            home_goals=pick(self.home_goals, "q"),
+            away_goals=pick(self.away_goals, "q"),
+            results=pick(self.results),
+            home_win_odds=pick(self.home_win_odds, "d"),
+            draw_odds=pick(self.draw_odds, "d"),
+            away_win_odds=pick(self.away_win_odds, "d"),
+            model_home_prob=pick(self.model_home_prob, "d"),
+            model_draw_prob=pick(self.model_draw_prob, "d"),
+            model_away_prob=pick(self.model_away_prob, "d"),
+            features={
+                name: pick(column, "d") for name, column in self.features.items()
+            },
+            tz=self.tz,
+        )
+
+    def sorted_by_kickoff(self) -> "MatchFrame":
+        kickoffs = self.kickoffs
+        order = sorted(range(len(kickoffs)), key=kickoffs.__getitem__)
+        if all(i == pos for pos, i in enumerate(order)):
+            return self
+        return self.take(order)
+
+    def filter_scope(
+        self, *, season: str | None = None, leagues: set[str] | None = None
+    ) -> "MatchFrame":
+        """Keep rows whose stripped season/league match the requested scope."""
+        if not season and leagues is None:
+            return self
+
+        seasons = self.seasons
+        row_leagues = self.leagues
+        keep = []
+
+        for i in range(len(self)):
+            if season:
+                value = seasons[i]
+                if not value or value.strip() != season:
+                    continue
+
+            if leagues is not None:
+                value = row_leagues[i]
+                if not value or value.strip() not in leagues:
+                    continue
+
+            keep.append(i)
+
+        if len(keep) == len(self):
+            return self
+        return self.take(keep)
+
+
+class MatchFrameBuilder:
+    """Appends rows column by column and produces a MatchFrame."""
+
+    def __init__(self, feature_names: Iterable[str] = ()):
+        self._strings: dict[str, str] = {}
+        self._tz: tzinfo | None = None
+        self._tz_known = False
+
+        self.ids: list = []
+        self.leagues: list[str] = []
+        self.seasons: list[str] = []
+        self.kickoffs = array("q")
+        self.home_teams: list[str] = []
+        self.away_teams: list[str] = []
+        self.home_goals = array("q")
+        self.away_goals = array("q")
+        self.results: list[str] = []
+        self.home_win_odds = array("d")
+        self.draw_odds = array("d")
+        self.away_win_odds = array("d")
+        self.model_home_prob = array("d")
+        self.model_draw_prob = array("d")
+        self.model_away_prob = array("d")
+        self.features = {name: array("d") for name in feature_names}
+        self._feature_columns = list(self.features.values())
+
+    def __len__(self) -> int:
+        return len(self.kickoffs)
+
+    def new_chunk(self) -> "MatchFrameBuilder":
+        """
+        An empty builder with the same features, interned strings and
+        timezone, for building consecutive chunks of one dataset whose
+        kickoff columns stay comparable.
+        """
+        builder = MatchFrameBuilder(self.features)
+        builder._strings = self._strings
+        builder._tz = self._tz
+        builder._tz_known = self._tz_known
+        return builder
+
+    def _intern(self, value: str) -> str:
+        return self._strings.setdefault(value, value)
+
+    def _encode_kickoff(self, kickoff: datetime) -> int:
+        if not self._tz_known:
+            self._tz = kickoff.tzinfo
+            self._tz_known = True
+
+        if (kickoff.tzinfo is None) != (self._tz is None):
+            raise ValueError("Cannot mix naive and timezone-aware kickoffs")
+
+        if self._tz is not None:
+            kickoff = kickoff.astimezone(self._tz).replace(tzinfo=None)
+
+        return (kickoff - _EPOCH) // _MICROSECOND
+
+    def append(
+        self,
+        *,
+        id,
+        league: str,
+        season: str,
+        kickoff: datetime,
+        home_team: str,
+        away_team: str,
+        home_goals: int,
+        away_goals: int,
+        result: str,
+        home_win_odds: float,
+        draw_odds: float,
+        away_win_odds: float,
+        model_home_prob: float | None = None,
+        model_draw_prob: float | None = None,
+        model_away_prob: float | None = None,
+        features: dict[str, Any] | None = None,
+    ) -> None:
+        self.ids.append(id)
+        self.leagues.append(self._intern(league))
+        self.seasons.append(self._intern(season))
+        self.kickoffs.append(self._encode_kickoff(kickoff))
+        self.home_teams.append(self._intern(home_team))
+        self.away_teams.append(self._intern(away_team))
+        self.home_goals.append(home_goals)
+        self.away_goals.append(away_goals)
+        self.results.append(self._intern(result))
+        self.home_win_odds.append(home_win_odds)
+        self.draw_odds.append(draw_odds)
+        self.away_win_odds.append(away_win_odds)
+        self.model_home_prob.append(_to_column_float(model_home_prob))
+        self.model_draw_prob.append(_to_column_float(model_draw_prob))
+        self.model_away_prob.append(_to_column_float(model_away_prob))
+
+        features = features or {}
+        for name, column in self.features.items():
+            column.append(_to_column_float(features.get(name)))
+
+    def extend(
+        self,
+        *,
+        ids: Sequence,
+        leagues: Sequence[str],
+        seasons: Sequence[str],
+        kickoffs: Sequence[datetime],
+        home_teams: Sequence[str],
+        away_teams: Sequence[str],
+        home_goals: Sequence[int],
+        away_goals: Sequence[int],
+        results: Sequence[str],
+        home_win_odds: Sequence[float],
+        draw_odds: Sequence[float],
+        away_win_odds: Sequence[float],
+        model_home_prob: Sequence[float | None],
+        model_draw_prob: Sequence[float | None],
+        model_away_prob: Sequence[float | None],
+        features: Sequence[Sequence[float]] = (),
+    ) -> None:
+        """
+        Appends a batch of rows given column by column; features follow the
+        builder's feature order and are already float64 (NaN for missing).
+        """
+        intern = self._intern
+
+        self.ids.extend(ids)
+        self.leagues.extend(map(intern, leagues))
+        self.seasons.extend(map(intern, seasons))
+        self.kickoffs.extend(map(self._encode_kickoff, kickoffs))
+        self.home_teams.extend(map(intern, home_teams))
+        self.away_teams.extend(map(intern, away_teams))
+        self.home_goals.extend(home_goals)
+        self.away_goals.extend(away_goals)
+        self.results.extend(map(intern, results))
+        self.home_win_odds.extend(home_win_odds)
+        self.draw_odds.extend(draw_odds)
+        self.away_win_odds.extend(away_win_odds)
+        self.model_home_prob.extend(map(_to_column_float, model_home_prob))
+        self.model_draw_prob.extend(map(_to_column_float, model_draw_prob))
+        self.model_away_prob.extend(map(_to_column_float, model_away_prob))
+
+        for column, values in zip(self._feature_columns, features):
+            column.extend(values)
+
+    def append_match(self, match) -> None:
+        self.append(
+            id=match.id,
+            league=match.league,
+            season=match.season,
+            kickoff=match.kickoff,
+            home_team=match.home_team,
+            away_team=match.away_team,
+            home_goals=match.home_goals,
+            away_goals=match.away_goals,
+            result=match.result,
+            home_win_odds=match.home_win_odds,
+            draw_odds=match.draw_odds,
+            away_win_odds=match.away_win_odds,
+            model_home_prob=match.model_home_prob,
+            model_draw_prob=match.model_draw_prob,
+            model_away_prob=match.model_away_prob,
+            features=getattr(match, "features", None),
+        )
+
+    def build(self) -> MatchFrame:
+        return MatchFrame(
+            ids=self.ids,
+            leagues=self.leagues,
+            seasons=self.seasons,
+            kickoffs=self.kickoffs,
+            home_teams=self.home_teams,
+            away_teams=self.away_teams,
+            home_goals=self.home_goals,
+            away_goals=self.away_goals,
+            results=self.results,
+            home_win_odds=self.home_win_odds,
+            draw_odds=self.draw_odds,
+            away_win_odds=self.away_win_odds,
+            model_home_prob=self.model_home_prob,
+            model_draw_prob=self.model_draw_prob,
+            model_away_prob=self.model_away_prob,
+            features=self.features,
+            tz=self._tz,
+        )
@@ -54,6 +54,10 @@ class SimulationRequest(BaseModel):
     # Bankroll / bet construction
     starting_bankroll: float
     multiple_legs: int = 1
+    # How multi-leg combos are picked from pending candidates:
+    # "first_valid" = first team-disjoint combination in candidate order,
+    # "greedy" = single pass skipping conflicting candidates.
+    combo_mode: Literal["first_valid", "greedy"] = "first_valid"
 
     # Optional filters
     min_odds: float | None = None
@@ -77,82 +81,89 @@ class SimulationRequest(BaseModel):
 
     @model_validator(mode="after")
     def validate_request(self):
-        if not self.season or not self.season.strip():
-            raise ValueError("season is required")
-
-        if self.selection is None:
-            raise ValueError("selection is required")
-
-        if self.starting_bankroll <= 0:
-            raise ValueError("starting_bankroll must be positive")
-
-        if self.multiple_legs <= 0:
-            raise ValueError("multiple_legs must be positive")
-
-        if self.staking_method == "fixed":
-            if self.fixed_stake is None or self.fixed_stake <= 0:
-                raise ValueError(
-                    "fixed_stake must be provided and > 0 for fixed staking"
-                )
-
-        elif self.staking_method == "percent":
-            if self.percent_stake is None or self.percent_stake <= 0:
-                raise ValueError(
-                    "percent_stake must be provided and > 0 for percent staking"
-                )
-
-        elif self.staking_method == "kelly":
-            if self.kelly_fraction is None or self.kelly_fraction <= 0:
-                raise ValueError(
-                    "kelly_fraction must be provided and > 0 for kelly staking"
-                )
-
-        if self.min_odds is not None and self.min_odds <= 0:
-            raise ValueError("min_odds must be > 0")
-
-        if self.walk_forward:
-            if self.train_window_matches is None or self.train_window_matches <= 0:
-                raise ValueError(
-                    "train_window_matches must be provided and > 0 when walk_forward=True"
-                )
-            if self.test_window_matches is None or self.test_window_matches <= 0:
-                raise ValueError(
-                    "test_window_matches must be provided and > 0 when walk_forward=True"
-                )
-            if self.step_matches is None or self.step_matches <= 0:
-                raise ValueError(
-                    "step_matches must be provided and > 0 when walk_forward=True"
-                )
-
-        if self.period_mode == "custom":
-            if not self.custom_periods:
-                raise ValueError("custom_periods is required when period_mode='custom'")
-
-            names = [period.name.strip().lower() for period in self.custom_periods]
-            if len(names) != len(set(names)):
-                raise ValueError("custom period names must be unique")
-
-            covered_by_period: list[tuple[str, set[int]]] = []
-            for period in self.custom_periods:
-                covered_by_period.append(
-                    (period.name, _covered_days(period.start_day, period.end_day))
-                )
-
-            for i in range(len(covered_by_period)):
-                name_a, days_a = covered_by_period[i]
-                for j in range(i + 1, len(covered_by_period)):
-                    name_b, days_b = covered_by_period[j]
-                    if days_a & days_b:
-                        raise ValueError(
-                            f"overlapping custom periods are not allowed: {name_a} and {name_b}"
-                        )
-
-        if self.max_candidates_per_period is not None:
-            if self.max_candidates_per_period <= 0:
-                raise ValueError("max_candidates_per_period must be positive")
-            if not self.rank_by:
-                raise ValueError(
-                    "rank_by is required when max_candidates_per_period is set"
-                )
-
+        check_request_rules(self)
         return self
+
+
+def check_request_rules(request) -> None:
+    """
+    Cross-field rules of SimulationRequest, on anything with its attributes.
+
+    Raises ValueError. Sweeps use this to check grid variants without
+    building a model per variant.
+    """
+    if not request.season or not request.season.strip():
+        raise ValueError("season is required")
+
+    if request.selection is None:
+        raise ValueError("selection is required")
+
+    if request.starting_bankroll <= 0:
+        raise ValueError("starting_bankroll must be positive")
+
+    if request.multiple_legs <= 0:
+        raise ValueError("multiple_legs must be positive")
+
+    if request.staking_method == "fixed":
+        if request.fixed_stake is None or request.fixed_stake <= 0:
+            raise ValueError("fixed_stake must be provided and > 0 for fixed staking")
+
+    elif request.staking_method == "percent":
+        if request.percent_stake is None or request.percent_stake <= 0:
+            raise ValueError(
+                "percent_stake must be provided and > 0 for percent staking"
+            )
+
+    elif request.staking_method == "kelly":
+        if request.kelly_fraction is None or request.kelly_fraction <= 0:
+            raise ValueError(
+                "kelly_fraction must be provided and > 0 for kelly staking"
+            )
+
+    if request.min_odds is not None and request.min_odds <= 0:
+        raise ValueError("min_odds must be > 0")
+
+    if request.walk_forward:
+        if request.train_window_matches is None or request.train_window_matches <= 0:
+            raise ValueError(
+                "train_window_matches must be provided and > 0 when walk_forward=True"
+            )
+        if request.test_window_matches is None or request.test_window_matches <= 0:
+            raise ValueError(
+                "test_window_matches must be provided and > 0 when walk_forward=True"
+            )
+        if request.step_matches is None or request.step_matches <= 0:
+            raise ValueError(
+                "step_matches must be provided and > 0 when walk_forward=True"
+            )
+
+    if request.period_mode == "custom":
+        if not request.custom_periods:
+            raise ValueError("custom_periods is required when period_mode='custom'")
+
+        names = [period.name.strip().lower() for period in request.custom_periods]
+        if len(names) != len(set(names)):
+            raise ValueError("custom period names must be unique")
+
+        covered_by_period: list[tuple[str, set[int]]] = []
+        for period in request.custom_periods:
+            covered_by_period.append(
+                (period.name, _covered_days(period.start_day, period.end_day))
+            )
+
+        for i in range(len(covered_by_period)):
+            name_a, days_a = covered_by_period[i]
+            for j in range(i + 1, len(covered_by_period)):
+                name_b, days_b = covered_by_period[j]
+                if days_a & days_b:
+                    raise ValueError(
+                        f"overlapping custom periods are not allowed: {name_a} and {name_b}"
+                    )
+
+    if request.max_candidates_per_period is not None:
+        if request.max_candidates_per_period <= 0:
+            raise ValueError("max_candidates_per_period must be positive")
+        if not request.rank_by:
+            raise ValueError(
+                "rank_by is required when max_candidates_per_period is set"
+            )
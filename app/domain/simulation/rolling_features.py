@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import math
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Iterable
+
+from app.domain.simulation.context import (
+    DEFAULT_WINDOW_SIZE,
+    ROLLING_FEATURE_NAMES,
+    RollingContext,
+    rolling_feature_name,
+)
+from app.domain.simulation.match_frame import MatchFrame
+
+# Upper bound on the cached columns' payload, in bytes (8 per value).
+ROLLING_CACHE_BYTES = 256 * 1024 * 1024
+
+# (results fingerprint, window size) -> {feature name: column}
+_rolling_cache: OrderedDict[tuple[str, int], dict[str, array]] = OrderedDict()
+_rolling_cache_bytes = 0
+_rolling_cache_lock = threading.Lock()
+
+
+def compute_rolling_columns(
+    frame: MatchFrame, window_sizes: Iterable[int] = (DEFAULT_WINDOW_SIZE,)
+) -> dict[int, dict[str, array]]:
+    """
+    One pass over a kickoff-sorted frame producing every rolling feature for
+    each window size, keyed by window then unsuffixed feature name. Columns
+    are float64 arrays with NaN where a feature is None.
+
+    Mirrors SimulationEngine: each row sees the context as it was before its
+    kickoff batch, and the whole batch is added afterwards.
+    """
+    windows = sorted(set(window_sizes))
+    n = len(frame)
+    context = RollingContext(window_size=windows[0], extra_windows=windows)
+
+    names = {
+        window: [rolling_feature_name(name, window) for name in ROLLING_FEATURE_NAMES]
+        for window in windows
+    }
+    columns = {
+        window: {name: array("d", [math.nan]) * n for name in ROLLING_FEATURE_NAMES}
+        for window in windows
+    }
+
+    for _, rows in frame.kickoff_batches():
+        for row in rows:
+            i = row.index
+            for window in windows:
+                features = context.features_for_match(row, names[window])
+                window_columns = columns[window]
+                for name, suffixed in zip(ROLLING_FEATURE_NAMES, names[window]):
+                    value = features[suffixed]
+                    if value is not None:
+                        window_columns[name][i] = value
+
+        for row in rows:
+            context.update(row)
+
+    return columns
+
+
+def rolling_columns(
+    frame: MatchFrame, window_sizes: Iterable[int] = (DEFAULT_WINDOW_SIZE,)
+) -> dict[int, dict[str, array]]:
+    """
+    compute_rolling_columns, cached process-wide (LRU) per frame content and
+    window. Windows missing from the cache are computed together in one pass.
+
+    The cache is bounded by ROLLING_CACHE_BYTES of column data; entries
+    larger than that on their own are returned but not cached. Lookups and
+    updates hold a lock; the computation itself runs outside it.
+    """
+    global _rolling_cache_bytes
+
+    fingerprint = frame.results_fingerprint()
+    result = {}
+    missing = []
+
+    with _rolling_cache_lock:
+        for window in sorted(set(window_sizes)):
+            key = (fingerprint, window)
+            columns = _rolling_cache.get(key)
+            if columns is None:
+                missing.append(window)
+            else:
+                _rolling_cache.move_to_end(key)
+                result[window] = columns
+
+    if not missing:
+        return result
+
+    computed = compute_rolling_columns(frame, missing)
+    with _rolling_cache_lock:
+        for window, columns in computed.items():
+            result[window] = columns
+            size = _columns_bytes(columns)
+            if size > ROLLING_CACHE_BYTES:
+                continue
+
+            # Another thread may have cached the same window meanwhile.
+            replaced = _rolling_cache.pop((fingerprint, window), None)
+            if replaced is not None:
+                _rolling_cache_bytes -= _columns_bytes(replaced)
+            _rolling_cache[(fingerprint, window)] = columns
+            _rolling_cache_bytes += size
+
+        while _rolling_cache_bytes > ROLLING_CACHE_BYTES:
+            _, evicted = _rolling_cache.popitem(last=False)
+            _rolling_cache_bytes -= _columns_bytes(evicted)
+
+    return result
+
+
+def _columns_bytes(columns: dict[str, array]) -> int:
+    return sum(len(column) * column.itemsize for column in columns.values())
+
+
+def clear_rolling_cache() -> None:
+    global _rolling_cache_bytes
+    with _rolling_cache_lock:
+        _rolling_cache.clear()
+        _rolling_cache_bytes = 0
+
+
+class FrameRollingContext:
+    """
+    Read-only stand-in for RollingContext over a single MatchFrame.
+
+    Rolling features are attached to the frame as derived columns, unsuffixed
+    for ``window_size`` and as "<name>_w<N>" for every tracked window, and
+    read by row index, so update() is a no-op. Only valid for rows of that
+    frame processed in one kickoff-ordered pass.
+    """
+
+    def __init__(
+        self,
+        frame: MatchFrame,
+        window_size: int = DEFAULT_WINDOW_SIZE,
+        extra_windows: Iterable[int] = (),
+    ):
+        self.frame = frame
+        self.window_size = window_size
+        self.windows = tuple(sorted({window_size, *extra_windows}))
+
+        derived = frame.derived_columns
+        for window, columns in rolling_columns(frame, self.windows).items():
+            for name, column in columns.items():
+                derived[rolling_feature_name(name, window)] = column
+                if window == window_size:
+                    derived[name] = column
+
+    def update(self, match):
+        pass
+
+    def features_for_match(self, match, names=None):
+        if names is None:
+            names = ROLLING_FEATURE_NAMES
+
+        columns = self.frame.derived_columns
+        i = match.index
+        features = {}
+        for name in names:
+            if name in columns:
+                value = columns[name][i]
+                # NaN marks "no history yet", None in RollingContext.
+                features[name] = None if value != value else value
+        return features
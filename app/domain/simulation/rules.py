@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import ast
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Any, Callable
 
 
@@ -9,7 +10,11 @@ from typing import Any, Callable
 class CompiledRule:
     expr: str
     func: Callable[[dict[str, Any]], bool]
-    used_names: set[str]
+    used_names: frozenset[str]
+    # Specialized function taking one positional argument per name in
+    # arg_names (sorted used_names); returns the raw expression value.
+    arg_names: tuple[str, ...] = ()
+    positional: Callable[..., Any] | None = None
 
 
 class RuleCompileError(ValueError):
@@ -101,10 +106,35 @@ class _RuleValidator(ast.NodeVisitor):
         super().generic_visit(node)
 
 
+RULE_CACHE_SIZE = 512
+
+
 def compile_rule(expr: str) -> CompiledRule:
+    """
+    Parses, validates and compiles a rule expression.
+
+    Results are cached process-wide (LRU, RULE_CACHE_SIZE entries) by the
+    expression text without trailing whitespace, so repeated simulations,
+    sweeps and calendar periods share one CompiledRule. Leading whitespace is
+    kept in the key because it changes how the expression parses.
+    """
     if not expr or not expr.strip():
         raise RuleCompileError("rule_expression is empty.")
 
+    return _compile_rule_cached(expr.rstrip())
+
+
+def rule_cache_info():
+    """Hit/miss counters and size of the compiled-rule cache."""
+    return _compile_rule_cached.cache_info()
+
+
+def clear_rule_cache() -> None:
+    _compile_rule_cached.cache_clear()
+
+
+@lru_cache(maxsize=RULE_CACHE_SIZE)
+def _compile_rule_cached(expr: str) -> CompiledRule:
     try:
         tree = ast.parse(expr, mode="eval")
     except SyntaxError as e:
@@ -113,15 +143,58 @@ def compile_rule(expr: str) -> CompiledRule:
     v = _RuleValidator()
     v.visit(tree)
 
-    used = {n for n in v.names if n not in _ALLOWED_FUNCS and n not in _ALLOWED_CONSTS}
+    used = frozenset(
+        n for n in v.names if n not in _ALLOWED_FUNCS and n not in _ALLOWED_CONSTS
+    )
+    arg_names = tuple(sorted(used))
 
     code = compile(tree, filename="<rule>", mode="eval")
+    positional = _compile_positional(tree, arg_names)
 
     def _fn(vars_dict: dict[str, Any]) -> bool:
-        # Provide only allowed functions, and variables by name
+        if all(name in vars_dict for name in arg_names):
+            return bool(positional(*[vars_dict[name] for name in arg_names]))
+
+        # A missing name must only fail if evaluation actually reaches it
+        # (e.g. the right side of a short-circuited "or"), so fall back to
+        # name lookup at eval time.
         env = dict(_ALLOWED_FUNCS)
         env.update(vars_dict)
         # No builtins
         return bool(eval(code, {"__builtins__": {}}, env))
 
-    return CompiledRule(expr=expr, func=_fn, used_names=used)
+    return CompiledRule(
+        expr=expr,
+        func=_fn,
+        used_names=used,
+        arg_names=arg_names,
+        positional=positional,
+    )
+
+
+def _compile_positional(
+    tree: ast.Expression, arg_names: tuple[str, ...]
+) -> Callable[..., Any]:
+    """
+    Wraps an already validated expression in ``lambda <arg_names>: <expr>``.
+
+    Variables become fast local lookups, so evaluating a row needs neither an
+    env dict nor eval(); the allowed functions are the only globals and there
+    are no builtins.
+    """
+    func_tree = ast.Expression(
+        body=ast.Lambda(
+            args=ast.arguments(
+                posonlyargs=[],
+                args=[ast.arg(arg=name) for name in arg_names],
+                kwonlyargs=[],
+                kw_defaults=[],
+                defaults=[],
+            ),
+            body=tree.body,
+        )
+    )
+    ast.fix_missing_locations(func_tree)
+
+    code = compile(func_tree, filename="<rule>", mode="eval")
+    return eval(code, {"__builtins__": {}, **_ALLOWED_FUNCS})
@@ -1,5 +1,23 @@
+from app.domain.simulation.context import split_rolling_name
+from app.domain.simulation.match_frame import MatchRow
 from app.domain.simulation.rules import RuleCompileError, compile_rule
 
+# Match attributes exposed to rule expressions.
+RULE_MATCH_FIELDS = frozenset(
+    {
+        "home_team",
+        "away_team",
+        "home_goals",
+        "away_goals",
+        "home_win_odds",
+        "draw_odds",
+        "away_win_odds",
+        "model_home_prob",
+        "model_draw_prob",
+        "model_away_prob",
+    }
+)
+
 
 class StrategyDecision:
     def __init__(self, place_bet: bool, selection: str | None = None):
@@ -8,9 +26,22 @@ class StrategyDecision:
 
 
 class BaseStrategy:
+    # Whether evaluate() reads the RollingContext; the engine skips context
+    # updates for strategies that don't.
+    uses_context = True
+
     def evaluate(self, match, context=None):
         raise NotImplementedError
 
+    def candidate_mask(self, frame):
+        """
+        Optional whole-frame prefilter.
+
+        Returns a bytearray with 0 for rows evaluate() would reject no matter
+        the rolling context, or None if the strategy can't tell up front.
+        """
+        return None
+
 
 # ---------------------------------------------------------
 # Deprecated legacy strategies (kept temporarily)
@@ -24,6 +55,8 @@ class BaseStrategy:
 class AlwaysHomeStrategy(BaseStrategy):
     """Deprecated: replaced by RuleStrategy(selection='H')."""
 
+    uses_context = False
+
     def evaluate(self, match, context=None):
         return StrategyDecision(place_bet=True, selection="H")
 
@@ -31,6 +64,8 @@ class AlwaysHomeStrategy(BaseStrategy):
 class EdgeStrategy(BaseStrategy):
     """Deprecated: replaced by rule expressions."""
 
+    uses_context = False
+
     def __init__(self, selection: str, min_edge: float = 0.0):
         self.selection = selection
         self.min_edge = min_edge
@@ -89,13 +124,42 @@ class RuleStrategy(BaseStrategy):
         # No rule means "all matches eligible"
         if rule_expression and rule_expression.strip():
             self._compiled = compile_rule(rule_expression)
+            # (name, is_match_field) in the compiled function's argument order
+            self._arg_plan = tuple(
+                (name, name in RULE_MATCH_FIELDS) for name in self._compiled.arg_names
+            )
+            # Only these rolling features are ever computed for this rule.
+            self._rolling_names = tuple(
+                name
+                for name in self._compiled.arg_names
+                if split_rolling_name(name) is not None
+            )
         else:
             self._compiled = None
+            self._arg_plan = ()
+            self._rolling_names = ()
+
+        # Argument columns of the last MatchFrame seen (see _frame_columns).
+        self._columns_frame = None
+        self._columns = ()
+
+    @property
+    def uses_context(self) -> bool:
+        return bool(self._rolling_names)
+
+    @property
+    def rolling_windows(self) -> frozenset[int]:
+        """Extra window sizes referenced via suffixed names like points_diff_w10."""
+        return frozenset(
+            window
+            for _, window in map(split_rolling_name, self._rolling_names)
+            if window is not None
+        )
 
     @property
-    def used_names(self) -> set[str]:
+    def used_names(self) -> frozenset[str]:
         if self._compiled is None:
-            return set()
+            return frozenset()
         return self._compiled.used_names
 
     def evaluate(self, match, context=None):
@@ -106,28 +170,13 @@ class RuleStrategy(BaseStrategy):
         if self._compiled is None:
             return StrategyDecision(True, self.selection)
 
-        vars_dict = {
-            "home_team": match.home_team,
-            "away_team": match.away_team,
-            "home_goals": match.home_goals,
-            "away_goals": match.away_goals,
-            "home_win_odds": match.home_win_odds,
-            "draw_odds": match.draw_odds,
-            "away_win_odds": match.away_win_odds,
-            "model_home_prob": match.model_home_prob,
-            "model_draw_prob": match.model_draw_prob,
-            "model_away_prob": match.model_away_prob,
-        }
-
-        # Optional rolling context features
-        if context is not None and hasattr(context, "features_for_match"):
-            vars_dict.update(context.features_for_match(match))
-
-        # Uploaded dataset features
-        vars_dict.update(getattr(match, "features", {}) or {})
+        args = self._rule_args(match, context)
 
         try:
-            ok = self._compiled.func(vars_dict)
+            if args is None:
+                ok = self._compiled.func(self._vars_dict(match, context))
+            else:
+                ok = bool(self._compiled.positional(*args))
         except (NameError, TypeError):
             return StrategyDecision(False)
         except Exception:
@@ -137,3 +186,133 @@ class RuleStrategy(BaseStrategy):
             return StrategyDecision(True, self.selection)
 
         return StrategyDecision(False)
+
+    def candidate_mask(self, frame) -> bytearray | None:
+        """
+        Evaluates the rule once per row straight from the frame's columns.
+
+        This is a row loop over the compiled positional function, not an
+        array-level evaluation: without numpy, applying the rule's operators
+        column by column measured slower than one call per row.
+
+        Only possible when every name the rule uses is a frame column; rules
+        reading rolling features return None unless the frame carries them as
+        derived columns. Rows where the rule is falsy or raises (e.g. a None
+        operand) are 0, as in evaluate().
+        """
+        n = len(frame)
+
+        if self.selection not in ("H", "D", "A"):
+            return bytearray(n)
+
+        if self._compiled is None:
+            return bytearray(b"\x01") * n
+
+        if not all(frame.has_values(name) for name, _ in self._arg_plan):
+            return None
+
+        positional = self._compiled.positional
+        columns = [frame.values(name) for name, _ in self._arg_plan]
+
+        if not columns:
+            try:
+                ok = bool(positional())
+            except Exception:
+                ok = False
+            return bytearray(b"\x01" if ok else b"\x00") * n
+
+        mask = bytearray(n)
+        for i, args in enumerate(zip(*columns)):
+            try:
+                if positional(*args):
+                    mask[i] = 1
+            except Exception:
+                pass
+
+        return mask
+
+    def _rule_args(self, match, context) -> list | None:
+        """
+        Resolves only the names the rule uses, in argument order.
+
+        Precedence matches _vars_dict: dataset features, then rolling context
+        features, then match attributes. Returns None if a name is missing,
+        so the caller can fall back to the name-lookup path.
+
+        Frame rows are read straight from their frame's columns, so the
+        row's features dict is never built.
+        """
+        if type(match) is MatchRow:
+            columns = self._frame_columns(match.frame)
+            row = match.index
+            features = None
+        else:
+            columns = None
+            features = getattr(match, "features", {}) or {}
+        rolling = None
+        args = []
+
+        for k, (name, is_match_field) in enumerate(self._arg_plan):
+            if columns is not None:
+                entry = columns[k]
+                if entry is not None:
+                    column, optional = entry
+                    value = column[row]
+                    # NaN marks a missing value, as in MatchRow.
+                    if optional and value != value:
+                        value = None
+                    args.append(value)
+                    continue
+            elif name in features:
+                args.append(features[name])
+                continue
+            elif is_match_field:
+                args.append(getattr(match, name))
+                continue
+
+            if rolling is None:
+                if (
+                    not self._rolling_names
+                    or context is None
+                    or not hasattr(context, "features_for_match")
+                ):
+                    return None
+                rolling = context.features_for_match(match, self._rolling_names)
+
+            if name not in rolling:
+                return None
+            args.append(rolling[name])
+
+        return args
+
+    def _frame_columns(self, frame) -> list:
+        """
+        Per-argument (stored column, NaN-means-missing) of ``frame``, or None
+        for names resolved through the rolling context. Looked up once per
+        frame; the engine evaluates a frame's rows consecutively.
+        """
+        if self._columns_frame is not frame:
+            self._columns = [
+                frame.raw_column(name)
+                if name in frame.features or is_match_field
+                else None
+                for name, is_match_field in self._arg_plan
+            ]
+            self._columns_frame = frame
+        return self._columns
+
+    def _vars_dict(self, match, context) -> dict:
+        vars_dict = {name: getattr(match, name) for name in RULE_MATCH_FIELDS}
+
+        # Optional rolling context features
+        if (
+            self._rolling_names
+            and context is not None
+            and hasattr(context, "features_for_match")
+        ):
+            vars_dict.update(context.features_for_match(match, self._rolling_names))
+
+        # Uploaded dataset features
+        vars_dict.update(getattr(match, "features", {}) or {})
+
+        return vars_dict
@@ -0,0 +1,42 @@
+import uuid
+
+from sqlalchemy import Column, DateTime, Float, ForeignKey, String
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+
+from app.infrastructure.db.base import Base
+from app.infrastructure.db.types import JsonType
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+
+    owner_user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    dataset_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("datasets.id", ondelete="SET NULL"),
+        nullable=True,
+    )
+
+    # "sweep" | "simulation"
+    kind = Column(String, nullable=False)
+    # "queued" | "running" | "succeeded" | "failed"
+    status = Column(String, nullable=False, default="queued")
+    progress_percent = Column(Float, nullable=False, default=0.0)
+
+    request_json = Column(JsonType, nullable=False)
+    # Partial rows while a sweep runs, the full result once it succeeds.
+    result_json = Column(JsonType, nullable=True)
+    error = Column(String, nullable=True)
+
+    created_at = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    updated_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
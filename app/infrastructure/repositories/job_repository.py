@@ -0,0 +1,31 @@
+from sqlalchemy.orm import Session
+
+from app.infrastructure.persistence_models.job import Job
+
+
+class JobRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create(self, job: Job) -> Job:
+        self.db.add(job)
+        self.db.commit()
+        self.db.refresh(job)
+        return job
+
+    def get(self, job_id):
+        return self.db.query(Job).filter(Job.id == job_id).first()
+
+    def get_for_user(self, job_id, owner_user_id):
+        return (
+            self.db.query(Job)
+            .filter(Job.id == job_id)
+            .filter(Job.owner_user_id == owner_user_id)
+            .first()
+        )
+
+    def update(self, job: Job, **fields) -> Job:
+        for name, value in fields.items():
+            setattr(job, name, value)
+        self.db.commit()
+        return job
@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session
 
 from app.domain.simulation.entities import Match
+from app.domain.simulation.match_frame import MatchFrame, MatchFrameBuilder
 from app.infrastructure.persistence_models.match import Match as ORMMatch
 
 
@@ -15,6 +16,48 @@ class MatchRepository:
         league: str | None = None,
         leagues: list[str] | None = None,
     ) -> list[Match]:
+        orm_matches = self._query(season=season, league=league, leagues=leagues).all()
+        return [self._to_domain(m) for m in orm_matches]
+
+    def get_match_frame(
+        self,
+        *,
+        season: str,
+        league: str | None = None,
+        leagues: list[str] | None = None,
+    ) -> MatchFrame:
+        builder = MatchFrameBuilder()
+        query = self._query(season=season, league=league, leagues=leagues)
+
+        for orm in query.yield_per(1000):
+            odds = orm.odds
+            builder.append(
+                id=orm.id,
+                league=orm.league,
+                season=orm.season,
+                kickoff=orm.kickoff,
+                home_team=orm.home_team,
+                away_team=orm.away_team,
+                home_goals=orm.home_goals,
+                away_goals=orm.away_goals,
+                result=orm.result,
+                home_win_odds=odds.home_win,
+                draw_odds=odds.draw,
+                away_win_odds=odds.away_win,
+                model_home_prob=odds.model_home_prob,
+                model_draw_prob=odds.model_draw_prob,
+                model_away_prob=odds.model_away_prob,
+            )
+
+        return builder.build()
+
+    def _query(
+        self,
+        *,
+        season: str,
+        league: str | None = None,
+        leagues: list[str] | None = None,
+    ):
         query = (
             self.db.query(ORMMatch)
             .filter(ORMMatch.season == season)
@@ -30,8 +73,7 @@ class MatchRepository:
         elif league:
             query = query.filter(ORMMatch.league == league.strip())
 
-        orm_matches = query.all()
-        return [self._to_domain(m) for m in orm_matches]
+        return query
 
     def _to_domain(self, orm: ORMMatch) -> Match:
         odds = orm.odds
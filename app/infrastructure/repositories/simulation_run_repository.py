@@ -1,3 +1,5 @@
+import uuid
+
 from sqlalchemy.orm import Session
 
 from app.infrastructure.persistence_models.simulation_run import SimulationRun
@@ -13,6 +15,25 @@ class SimulationRunRepository:
         self.db.refresh(run)
         return run
 
+    def create_many(self, runs: list[SimulationRun], batch_size: int = 200) -> list:
+        """
+        Inserts runs in batched transactions without refreshing them.
+
+        Ids are generated client-side and returned in input order; the ORM
+        objects are expired after commit, so read ids from the return value.
+        """
+        ids = []
+        for run in runs:
+            if run.id is None:
+                run.id = uuid.uuid4()
+            ids.append(run.id)
+
+        for start in range(0, len(runs), batch_size):
+            self.db.add_all(runs[start : start + batch_size])
+            self.db.commit()
+
+        return ids
+
     def list_for_user(self, owner_user_id):
         return (
             self.db.query(SimulationRun)
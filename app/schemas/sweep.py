@@ -1,4 +1,4 @@
-from typing import Any
+from typing import Any, Literal
 
 from pydantic import BaseModel
 
@@ -11,6 +11,20 @@ class DatasetSweepRequest(BaseModel):
     base_request: SimulationRequest
     grid: dict[str, list[Any]]
     persist_runs: bool = True
+    # "summary" skips per-bet results for unpersisted variants; persisted runs
+    # are always simulated in "full" mode.
+    result_mode: Literal["full", "summary"] = "summary"
+    # "process" runs variants on a process pool of max_workers (default: cores).
+    execution: Literal["serial", "process"] = "serial"
+    max_workers: int | None = None
+    # "successive_halving" prunes variants on growing chronological prefixes.
+    search_mode: Literal["grid", "successive_halving"] = "grid"
+    halving_stages: list[float] = [0.25, 0.5, 1.0]
+    halving_keep_fraction: float = 0.5
+    halving_metric: str = "roi_percent"
+    halving_metric_order: Literal["asc", "desc"] = "desc"
+    # Keep only the best top_k rows by ROI; the rest are summarised.
+    top_k: int | None = None
 
 
 class SweepVariantResult(BaseModel):
@@ -29,6 +43,8 @@ class SweepVariantResult(BaseModel):
     profit_factor: float | None = None
     average_odds: float | None = None
     total_profit: float | None = None
+    # Successive halving only: stage the variant was dropped at (None = survived).
+    pruned_at_stage: int | None = None
 
 
 class DatasetSweepResponse(BaseModel):
@@ -39,3 +55,7 @@ class DatasetSweepResponse(BaseModel):
     # Backward-compatible aliases.
     total_variants: int
     results: list[SweepVariantResult]
+    # Successive halving only: per-stage variant counts.
+    stages: list[dict[str, Any]] | None = None
+    # top_k only: aggregate stats for the variants not in rows.
+    other_variants: dict[str, Any] | None = None
@@ -8,6 +8,7 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 import app.infrastructure.db.models  # noqa: F401
+from app.application.simulation_result_cache import result_cache
 from app.infrastructure.db.base import Base
 
 
@@ -32,3 +33,11 @@ def db_session():
         yield db
     finally:
         db.close()
+
+
+@pytest.fixture(autouse=True)
+def clear_result_cache():
+    # Identical sample CSVs share cache entries across tests otherwise.
+    result_cache.clear()
+    yield
+    result_cache.clear()
@@ -1,10 +1,22 @@
+import pickle
 import uuid
 from pathlib import Path
 
+import pytest
+
 from app.application.dataset_mapping import DatasetMapping
 from app.application.dataset_sweep_service import DatasetSweepService
+from app.application.parameter_sweep_service import SweepGrid
+from app.application.simulation_result_cache import (
+    SimulationResultCache,
+    result_cache,
+)
+from app.domain.simulation.config import SimulationConfig
 from app.domain.simulation.models import SimulationRequest
 from app.infrastructure.persistence_models.dataset import Dataset
+from app.infrastructure.repositories.simulation_run_repository import (
+    SimulationRunRepository,
+)
 
 
 def _make_dataset(db_session, tmp_path: Path):
@@ -136,11 +148,18 @@ def test_dataset_sweep_persists_runs(db_session, tmp_path):
         base_request=_base_request(),
         grid={"multiple_legs": [1, 2]},
         persist_runs=True,
+        result_mode="summary",
     )
 
     assert result["row_count"] == 2
     assert all(r["run_id"] is not None for r in result["rows"])
 
+    # Persisted runs keep their bets even when the sweep asks for summaries.
+    stored = SimulationRunRepository(db_session).list_for_user(owner_id)
+    for run in stored:
+        assert len(run.result_json["bets"]) == run.result_json["total_bets"] > 0
+        assert run.result_json["equity_curve"]
+
 
 def test_dataset_sweep_rows_include_flat_metrics(db_session, tmp_path):
     owner_id, ds = _make_dataset(db_session, tmp_path)
@@ -167,3 +186,339 @@ def test_dataset_sweep_rows_include_flat_metrics(db_session, tmp_path):
     assert "max_drawdown_percent" in row
     assert "profit_factor" in row
     assert "final_bankroll" in row
+
+
+def test_dataset_sweep_staking_variants_match_individual_runs(db_session, tmp_path):
+    owner_id, ds = _make_dataset(db_session, tmp_path)
+    service = DatasetSweepService(db_session)
+    base_request = _base_request().model_copy(
+        update={"rule_expression": "PPIDiff < 0.08"}
+    )
+
+    result = service.run_sweep(
+        dataset_id=ds.id,
+        owner_user_id=owner_id,
+        mapping=_mapping(),
+        base_request=base_request,
+        grid={"fixed_stake": [50, 100, 400], "min_odds": [None, 2.5]},
+        persist_runs=False,
+    )
+
+    for row in result["rows"]:
+        expected = service.dataset_service.simulate_dataset(
+            dataset_id=ds.id,
+            owner_user_id=owner_id,
+            mapping=_mapping(),
+            request=base_request.model_copy(update=row["parameters"]),
+            persist=False,
+        )
+        assert row["total_bets"] == expected["total_bets"]
+        assert row["final_bankroll"] == expected["final_bankroll"]
+        assert row["roi_percent"] == expected["roi_percent"]
+
+
+def test_dataset_sweep_process_execution_matches_serial(db_session, tmp_path):
+    owner_id, ds = _make_dataset(db_session, tmp_path)
+    service = DatasetSweepService(db_session)
+    grid = {
+        "rule_expression": [None, "PPIDiff < 0.08"],
+        "fixed_stake": [50, 100],
+        "multiple_legs": [1, 2],
+    }
+
+    serial = service.run_sweep(
+        dataset_id=ds.id,
+        owner_user_id=owner_id,
+        mapping=_mapping(),
+        base_request=_base_request(),
+        grid=grid,
+        persist_runs=False,
+    )
+    result_cache.clear()
+    parallel = service.run_sweep(
+        dataset_id=ds.id,
+        owner_user_id=owner_id,
+        mapping=_mapping(),
+        base_request=_base_request(),
+        grid=grid,
+        persist_runs=True,
+        execution="process",
+        max_workers=2,
+    )
+
+    assert [r["parameters"] for r in parallel["rows"]] == [
+        r["parameters"] for r in serial["rows"]
+    ]
+    for parallel_row, serial_row in zip(parallel["rows"], serial["rows"]):
+        assert parallel_row["run_id"] is not None
+        assert {**parallel_row, "run_id": None} == serial_row
+
+
+def test_dataset_sweep_persists_runs_in_one_batch(db_session, tmp_path):
+    owner_id, ds = _make_dataset(db_session, tmp_path)
+    service = DatasetSweepService(db_session)
+
+    commits = []
+    original_commit = db_session.commit
+    db_session.commit = lambda: commits.append(1) or original_commit()
+
+    result = service.run_sweep(
+        dataset_id=ds.id,
+        owner_user_id=owner_id,
+        mapping=_mapping(),
+        base_request=_base_request(),
+        grid={"fixed_stake": [10, 20, 30, 40, 50]},
+        persist_runs=True,
+    )
+
+    assert len(commits) == 1
+    stored = {
+        str(run.id): run
+        for run in SimulationRunRepository(db_session).list_for_user(owner_id)
+    }
+    assert set(stored) == {row["run_id"] for row in result["rows"]}
+    for row in result["rows"]:
+        run = stored[row["run_id"]]
+        assert run.request_json["fixed_stake"] == row["parameters"]["fixed_stake"]
+        assert run.result_json["final_bankroll"] == row["final_bankroll"]
+
+
+def test_dataset_sweep_successive_halving_prunes_on_prefix(db_session, tmp_path):
+    owner_id, ds = _make_dataset(db_session, tmp_path)
+    service = DatasetSweepService(db_session)
+    grid = {
+        "rule_expression": [None, "PPIDiff < 0.08", "PPIDiff > 0.5"],
+        "fixed_stake": [50, 100],
+    }
+
+    full = service.run_sweep(
+        dataset_id=ds.id,
+        owner_user_id=owner_id,
+        mapping=_mapping(),
+        base_request=_base_request(),
+        grid=grid,
+        persist_runs=False,
+    )
+    progress = []
+    halving = service.run_sweep(
+        dataset_id=ds.id,
+        owner_user_id=owner_id,
+        mapping=_mapping(),
+        base_request=_base_request(),
+        grid=grid,
+        persist_runs=True,
+        search_mode="successive_halving",
+        halving_stages=[0.5, 1.0],
+        halving_keep_fraction=0.5,
+        progress_callback=lambda *args: progress.append(args),
+    )
+
+    assert halving["row_count"] == 6
+    assert [(stage, total, len(rows)) for stage, total, rows in progress] == [
+        (1, 2, 6),
+        (2, 2, 3),
+    ]
+    assert [s["variants_run"] for s in halving["stages"]] == [6, 3]
+
+    survivors = [r for r in halving["rows"] if r["pruned_at_stage"] is None]
+    pruned = [r for r in halving["rows"] if r["pruned_at_stage"] is not None]
+    assert len(survivors) == 3
+    assert {r["pruned_at_stage"] for r in pruned} == {0}
+    assert all(r["run_id"] is None for r in pruned)
+
+    full_by_params = {str(r["parameters"]): r for r in full["rows"]}
+    final_rows = {str(r["parameters"]): r for r in progress[-1][2]}
+    for row in survivors:
+        assert final_rows[str(row["parameters"])]["run_id"] == row["run_id"]
+        assert row["run_id"] is not None
+        assert {**row, "run_id": None, "pruned_at_stage": None} == {
+            **full_by_params[str(row["parameters"])],
+            "pruned_at_stage": None,
+        }
+
+    stored = SimulationRunRepository(db_session).list_for_user(owner_id)
+    assert {str(run.id) for run in stored} == {r["run_id"] for r in survivors}
+
+    top = service.run_sweep(
+        dataset_id=ds.id,
+        owner_user_id=owner_id,
+        mapping=_mapping(),
+        base_request=_base_request(),
+        grid=grid,
+        persist_runs=False,
+        search_mode="successive_halving",
+        halving_stages=[0.5, 1.0],
+        halving_keep_fraction=0.5,
+        top_k=2,
+    )
+
+    assert top["total_variants"] == 6
+    assert top["row_count"] == 2
+    assert top["other_variants"]["count"] == 1
+    assert [r["parameters"] for r in top["rows"]] == [
+        r["parameters"] for r in halving["rows"][:2]
+    ]
+
+
+def test_dataset_sweep_top_k_keeps_best_rows(db_session, tmp_path):
+    owner_id, ds = _make_dataset(db_session, tmp_path)
+    service = DatasetSweepService(db_session)
+    grid = {
+        "rule_expression": [None, "PPIDiff < 0.08", "PPIDiff > 0.5"],
+        "fixed_stake": [50, 100],
+    }
+
+    full = service.run_sweep(
+        dataset_id=ds.id,
+        owner_user_id=owner_id,
+        mapping=_mapping(),
+        base_request=_base_request(),
+        grid=grid,
+        persist_runs=False,
+    )
+    top = service.run_sweep(
+        dataset_id=ds.id,
+        owner_user_id=owner_id,
+        mapping=_mapping(),
+        base_request=_base_request(),
+        grid=grid,
+        persist_runs=False,
+        top_k=2,
+    )
+
+    assert top["rows"] == full["rows"][:2]
+    assert top["row_count"] == 2
+    assert top["total_variants"] == 6
+
+    rest = full["rows"][2:]
+    other = top["other_variants"]
+    assert other["count"] == 4
+    assert other["roi_percent_min"] == min(r["roi_percent"] for r in rest)
+    assert other["roi_percent_max"] == max(r["roi_percent"] for r in rest)
+    assert other["total_bets"] == sum(r["total_bets"] for r in rest)
+
+
+def test_dataset_sweep_reuses_cached_results(db_session, tmp_path):
+    owner_id, ds = _make_dataset(db_session, tmp_path)
+    service = DatasetSweepService(db_session)
+    grid = {"fixed_stake": [50, 100], "min_odds": [None, 2.5]}
+
+    first = service.run_sweep(
+        dataset_id=ds.id,
+        owner_user_id=owner_id,
+        mapping=_mapping(),
+        base_request=_base_request(),
+        grid=grid,
+        persist_runs=False,
+    )
+    assert len(result_cache) == 4
+
+    # Only the new stake is simulated; the rest come from the cache.
+    result_cache.hits = result_cache.misses = 0
+    second = service.run_sweep(
+        dataset_id=ds.id,
+        owner_user_id=owner_id,
+        mapping=_mapping(),
+        base_request=_base_request(),
+        grid={"fixed_stake": [50, 100, 200], "min_odds": [None, 2.5]},
+        persist_runs=False,
+    )
+    assert (result_cache.hits, result_cache.misses) == (4, 2)
+
+    second_by_params = {str(r["parameters"]): r for r in second["rows"]}
+    for row in first["rows"]:
+        assert second_by_params[str(row["parameters"])] == row
+
+    service.dataset_service.delete_dataset(dataset_id=ds.id, owner_user_id=owner_id)
+    assert len(result_cache) == 0
+
+
+def test_dataset_sweep_cache_key_includes_load_defaults(db_session, tmp_path):
+    owner_id, ds = _make_dataset(db_session, tmp_path)
+    service = DatasetSweepService(db_session)
+    # League unmapped: every row takes the base request's league.
+    mapping = _mapping().model_copy(update={"league_col": None})
+
+    def sweep(base_league, grid_league):
+        result = service.run_sweep(
+            dataset_id=ds.id,
+            owner_user_id=owner_id,
+            mapping=mapping,
+            base_request=_base_request().model_copy(update={"league": base_league}),
+            grid={"league": [grid_league]},
+            persist_runs=False,
+        )
+        return result["rows"][0]["total_bets"]
+
+    assert sweep("TestLeague", "TestLeague") == 3
+    # Same variant request, but the rows now load as "Other".
+    assert sweep("Other", "TestLeague") == 0
+    assert len(result_cache) == 2
+
+
+def test_result_cache_is_bounded_by_pickled_size():
+    result = {"bets": [{"stake": 10.0, "profit": float(i)} for i in range(10)]}
+    entry_bytes = len(pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL))
+    cache = SimulationResultCache(max_size=10, max_bytes=2 * entry_bytes + 1)
+
+    # Only the two most recent results fit.
+    for key in ("a", "b", "c"):
+        cache.put((key,), result)
+    assert len(cache) == 2
+    assert cache.bytes == 2 * entry_bytes
+    assert cache.get(("a",)) is None
+    assert cache.get(("c",)) == result
+
+    # Cached entries can't be mutated through a returned result.
+    cache.get(("c",))["bets"].clear()
+    assert cache.get(("c",)) == result
+
+    cache.put(("big",), {"bets": list(range(1000))})
+    assert cache.get(("big",)) is None
+
+
+def test_sweep_grid_variants_match_validated_requests():
+    base_request = _base_request()
+    grid = {
+        "staking_method": ["fixed", "percent"],
+        "percent_stake": [1, "2.5"],
+        "min_odds": [None, 2],
+        "leagues": [None, ["B", "A"]],
+    }
+    sweep_grid = SweepGrid(base_request, grid)
+
+    variants = list(sweep_grid.variants())
+    assert len(variants) == len(sweep_grid) == 16
+
+    for variant in variants:
+        expected = SimulationRequest(**{**base_request.model_dump(), **variant.params})
+        assert sweep_grid.request_for(variant) == expected
+        assert sweep_grid.request_json_for(variant) == expected.model_dump(mode="json")
+        assert sweep_grid.config_for(variant) == SimulationConfig.from_request(expected)
+
+
+def test_sweep_grid_rejects_invalid_values_up_front():
+    with pytest.raises(ValueError, match="fixed_stake"):
+        SweepGrid(_base_request(), {"fixed_stake": [10, "lots"]})
+
+    # Each value is fine alone; the combination breaks a cross-field rule.
+    sweep_grid = SweepGrid(_base_request(), {"staking_method": ["fixed", "kelly"]})
+    with pytest.raises(ValueError, match="kelly_fraction"):
+        list(sweep_grid.variants())
+
+
+def test_sweep_grid_ignores_unknown_parameters():
+    base_request = _base_request()
+    sweep_grid = SweepGrid(base_request, {"not_a_field": [1, 2], "min_odds": [2]})
+
+    variants = list(sweep_grid.variants())
+    assert [variant.params for variant in variants] == [
+        {"not_a_field": 1, "min_odds": 2},
+        {"not_a_field": 2, "min_odds": 2},
+    ]
+
+    expected = base_request.model_copy(update={"min_odds": 2.0})
+    for variant in variants:
+        assert sweep_grid.request_for(variant) == expected
+        assert sweep_grid.request_json_for(variant) == expected.model_dump(mode="json")
+        assert sweep_grid.config_for(variant) == SimulationConfig.from_request(expected)
@@ -1,7 +1,11 @@
 import uuid
 from pathlib import Path
 
+from app.application import dataset_service
+from app.application.dataset_mapping import DatasetMapping
 from app.application.dataset_service import DatasetService
+from app.application.simulation_result_cache import result_cache
+from app.domain.simulation.models import SimulationRequest
 from app.infrastructure.persistence_models.dataset import Dataset
 
 
@@ -93,3 +97,90 @@ def test_get_distinct_values_returns_sorted_unique_values(tmp_path, db_session):
     )
 
     assert values == ["Championship", "Premier-League"]
+
+
+def test_simulate_dataset_streams_large_files(tmp_path, db_session, monkeypatch):
+    lines = ["League,Season,Date,HomeTeam,AwayTeam,FTR,B365CH,B365CD,B365CA,PPIDiff"]
+    for i in range(40):
+        day = 1 + (i * 7) % 20
+        lines.append(
+            f"L{i % 2},2425,2025-01-{day:02d},T{i % 6},U{i % 5},{'HDA'[i % 3]},"
+            f"{1.6 + (i % 4) / 5},3.4,4.1,{(i % 7 - 3) / 10}"
+        )
+    csv_path = tmp_path / "large.csv"
+    csv_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    user_id = uuid.uuid4()
+    ds = Dataset(
+        owner_user_id=user_id,
+        original_filename="large.csv",
+        stored_path=str(csv_path),
+    )
+    db_session.add(ds)
+    db_session.commit()
+
+    mapping = DatasetMapping(
+        home_team_col="HomeTeam",
+        away_team_col="AwayTeam",
+        date_col="Date",
+        league_col="League",
+        season_col="Season",
+        result_col="FTR",
+        odds_home_col="B365CH",
+        odds_draw_col="B365CD",
+        odds_away_col="B365CA",
+        feature_cols=["PPIDiff"],
+    )
+    requests = [
+        SimulationRequest(
+            league="L0",
+            season="2425",
+            selection="H",
+            rule_expression="PPIDiff > 0 or points_diff > 0",
+            staking_method="fixed",
+            fixed_stake=100,
+            starting_bankroll=1000,
+        ),
+        SimulationRequest(
+            season="2425",
+            selection="H",
+            staking_method="fixed",
+            fixed_stake=100,
+            starting_bankroll=1000,
+            walk_forward=True,
+            train_window_matches=8,
+            test_window_matches=6,
+            step_matches=6,
+        ),
+    ]
+
+    service = DatasetService(db_session)
+    streamed_loads = []
+    stream = dataset_service.iter_match_frames_from_csv
+
+    def counting_stream(*args, **kwargs):
+        streamed_loads.append(args[0])
+        return stream(*args, **kwargs)
+
+    monkeypatch.setattr(dataset_service, "iter_match_frames_from_csv", counting_stream)
+
+    for request in requests:
+        kwargs = dict(
+            dataset_id=ds.id,
+            owner_user_id=user_id,
+            mapping=mapping,
+            request=request,
+            persist=False,
+        )
+        in_memory = service.simulate_dataset(**kwargs)
+        result_cache.clear()
+
+        monkeypatch.setattr(dataset_service, "STREAMING_MIN_BYTES", 0)
+        streamed = service.simulate_dataset(**kwargs)
+        monkeypatch.setattr(dataset_service, "STREAMING_MIN_BYTES", 1 << 40)
+        result_cache.clear()
+
+        assert streamed["total_bets"] > 0
+        assert streamed == in_memory
+
+    assert len(streamed_loads) == 2
@@ -0,0 +1,260 @@
+import uuid
+from pathlib import Path
+
+import pytest
+
+from app.application import dataset_service
+from app.application.dataset_mapping import DatasetMapping
+from app.application.dataset_simulation_models import DatasetSimulateRequest
+from app.application.job_service import JobService
+from app.application.simulation_result_cache import result_cache
+from app.domain.simulation import engine
+from app.domain.simulation.models import SimulationRequest
+from app.infrastructure.persistence_models.dataset import Dataset
+from app.schemas.sweep import DatasetSweepRequest
+
+
+def _make_dataset(db_session, tmp_path: Path):
+    csv_path = tmp_path / "sample.csv"
+    csv_path.write_text(
+        "League,Season,Date,HomeTeam,AwayTeam,FTR,B365CH,B365CD,B365CA,PPIDiff\n"
+        "TestLeague,2425,2025-01-03,A,B,H,2.0,3.5,4.0,0.01\n"
+        "TestLeague,2425,2025-01-04,C,D,H,2.0,3.5,4.0,0.05\n"
+        "TestLeague,2425,2025-01-07,E,F,A,2.0,3.5,4.0,0.10\n",
+        encoding="utf-8",
+    )
+
+    owner_id = uuid.uuid4()
+    ds = Dataset(
+        owner_user_id=owner_id,
+        original_filename="sample.csv",
+        stored_path=str(csv_path),
+    )
+    db_session.add(ds)
+    db_session.commit()
+    db_session.refresh(ds)
+    return owner_id, ds
+
+
+def _mapping():
+    return DatasetMapping(
+        home_team_col="HomeTeam",
+        away_team_col="AwayTeam",
+        date_col="Date",
+        time_col=None,
+        league_col="League",
+        season_col="Season",
+        result_col="FTR",
+        odds_home_col="B365CH",
+        odds_draw_col="B365CD",
+        odds_away_col="B365CA",
+        feature_cols=["PPIDiff"],
+    )
+
+
+def _request(**overrides):
+    base = dict(
+        league="TestLeague",
+        season="2425",
+        selection="H",
+        staking_method="fixed",
+        fixed_stake=100,
+        starting_bankroll=1000,
+    )
+    base.update(overrides)
+    return SimulationRequest(**base)
+
+
+def test_sweep_job_runs_in_worker_and_reports_progress(db_session, tmp_path):
+    owner_id, ds = _make_dataset(db_session, tmp_path)
+    queued = []
+    service = JobService(db_session, enqueue=queued.append)
+
+    job = service.submit_sweep(
+        dataset_id=ds.id,
+        owner_user_id=owner_id,
+        body=DatasetSweepRequest(
+            mapping=_mapping(),
+            base_request=_request(),
+            grid={"fixed_stake": [50, 100, 200, 400]},
+            persist_runs=False,
+        ),
+    )
+
+    assert queued == [str(job.id)]
+    assert job.status == "queued"
+    assert job.progress_percent == 0.0
+
+    progress = []
+    original_update = service.jobs_repo.update
+
+    def record_update(job, **fields):
+        if "progress_percent" in fields and fields.get("status") is None:
+            progress.append(fields["progress_percent"])
+        return original_update(job, **fields)
+
+    service.jobs_repo.update = record_update
+    done = service.run_job(job.id)
+
+    assert done.status == "succeeded"
+    assert done.progress_percent == 100.0
+    assert done.result_json["row_count"] == 4
+    assert progress == [25.0, 50.0, 75.0, 100.0]
+
+    fetched = JobService(db_session).get_job(job_id=job.id, owner_user_id=owner_id)
+    assert [r["parameters"]["fixed_stake"] for r in fetched.result_json["rows"]] == [
+        50,
+        100,
+        200,
+        400,
+    ]
+
+
+def test_sweep_job_writes_partial_rows_every_few_percent(db_session, tmp_path):
+    owner_id, ds = _make_dataset(db_session, tmp_path)
+    service = JobService(db_session)
+    job = service.submit_sweep(
+        dataset_id=ds.id,
+        owner_user_id=owner_id,
+        body=DatasetSweepRequest(
+            mapping=_mapping(),
+            base_request=_request(),
+            grid={"fixed_stake": [10 * i for i in range(1, 21)]},
+            persist_runs=False,
+        ),
+    )
+
+    updates = []
+    original_update = service.jobs_repo.update
+
+    def record_update(job, **fields):
+        if "status" not in fields:
+            updates.append(
+                (
+                    fields["progress_percent"],
+                    len(fields.get("result_json", {}).get("rows", [])),
+                )
+            )
+        return original_update(job, **fields)
+
+    service.jobs_repo.update = record_update
+    assert service.run_job(job.id).status == "succeeded"
+
+    assert [percent for percent, _ in updates] == [5.0 * i for i in range(1, 21)]
+    assert [(percent, rows) for percent, rows in updates if rows] == [
+        (10.0 * i, 2 * i) for i in range(1, 11)
+    ]
+
+
+def test_simulation_job_reports_partial_metrics(db_session, tmp_path, monkeypatch):
+    owner_id, ds = _make_dataset(db_session, tmp_path)
+    service = JobService(db_session)
+    monkeypatch.setattr(engine, "PROGRESS_EVERY_MATCHES", 1)
+
+    updates = []
+    original_update = service.jobs_repo.update
+
+    def record_update(job, **fields):
+        if "status" not in fields:
+            updates.append(dict(fields))
+        return original_update(job, **fields)
+
+    service.jobs_repo.update = record_update
+
+    def run():
+        updates.clear()
+        result_cache.clear()
+        job = service.submit_simulation(
+            dataset_id=ds.id,
+            owner_user_id=owner_id,
+            payload=DatasetSimulateRequest(
+                mapping=_mapping(), request=_request(), persist=False
+            ),
+        )
+        done = service.run_job(job.id)
+        assert done.status == "succeeded"
+        assert done.result_json["total_bets"] == 3
+        return [
+            (
+                fields.get("progress_percent"),
+                fields["result_json"]["partial"]["matches_processed"],
+                fields["result_json"]["partial"]["bankroll"],
+            )
+            for fields in updates
+        ]
+
+    assert run() == [(33.0, 1, 900.0), (66.0, 2, 1000.0), (100.0, 3, 1100.0)]
+
+    # Streamed runs don't know the match count up front.
+    monkeypatch.setattr(dataset_service, "STREAMING_MIN_BYTES", 0)
+    assert run() == [(None, 1, 900.0), (None, 2, 1000.0), (None, 3, 1100.0)]
+
+
+def test_simulation_job_failure_is_recorded(db_session, tmp_path):
+    owner_id, ds = _make_dataset(db_session, tmp_path)
+    service = JobService(db_session)
+
+    job = service.submit_simulation(
+        dataset_id=ds.id,
+        owner_user_id=owner_id,
+        payload=DatasetSimulateRequest(
+            mapping=_mapping(),
+            request=_request(rule_expression="PPIDiff <"),
+            persist=False,
+        ),
+    )
+    done = service.run_job(job.id)
+
+    assert done.status == "failed"
+    assert "Invalid rule syntax" in done.error
+
+    ok = service.run_job(
+        service.submit_simulation(
+            dataset_id=ds.id,
+            owner_user_id=owner_id,
+            payload=DatasetSimulateRequest(
+                mapping=_mapping(), request=_request(), persist=True
+            ),
+        ).id
+    )
+    assert ok.status == "succeeded"
+    assert ok.result_json["total_bets"] == 3
+    assert ok.result_json["run_id"] is not None
+
+
+def test_jobs_are_scoped_to_their_owner(db_session, tmp_path):
+    owner_id, ds = _make_dataset(db_session, tmp_path)
+    service = JobService(db_session)
+
+    with pytest.raises(ValueError, match="Dataset not found"):
+        service.submit_simulation(
+            dataset_id=ds.id,
+            owner_user_id=uuid.uuid4(),
+            payload=DatasetSimulateRequest(mapping=_mapping(), request=_request()),
+        )
+
+    job = service.submit_simulation(
+        dataset_id=ds.id,
+        owner_user_id=owner_id,
+        payload=DatasetSimulateRequest(mapping=_mapping(), request=_request()),
+    )
+    with pytest.raises(ValueError, match="Job not found"):
+        service.get_job(job_id=job.id, owner_user_id=uuid.uuid4())
+
+
+def test_submit_marks_job_failed_when_enqueue_fails(db_session, tmp_path):
+    owner_id, ds = _make_dataset(db_session, tmp_path)
+
+    def broken_enqueue(job_id):
+        raise ConnectionError("broker unavailable")
+
+    service = JobService(db_session, enqueue=broken_enqueue)
+    job = service.submit_simulation(
+        dataset_id=ds.id,
+        owner_user_id=owner_id,
+        payload=DatasetSimulateRequest(mapping=_mapping(), request=_request()),
+    )
+
+    stored = service.get_job(job_id=job.id, owner_user_id=owner_id)
+    assert stored.status == "failed"
+    assert "broker unavailable" in stored.error
@@ -0,0 +1,534 @@
+import math
+import pickle
+import random
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pytest
+
+from app.application.dataset_mapping import DatasetMapping
+from app.application.in_memory_dataset_loader import (
+    iter_match_frames_from_csv,
+    load_match_frame_from_csv,
+    load_matches_from_csv,
+)
+from app.application.match_frame_sidecar import delete_sidecars
+from app.domain.simulation import rolling_features
+from app.domain.simulation.context import ROLLING_FEATURE_NAMES
+from app.domain.simulation.engine import SimulationEngine
+from app.domain.simulation.match_frame import MatchFrame, MatchRow
+from app.domain.simulation.models import SimulationRequest
+from app.domain.simulation.rolling_features import (
+    clear_rolling_cache,
+    compute_rolling_columns,
+    rolling_columns,
+)
+from app.domain.simulation.strategy import RuleStrategy
+
+
+def _write_csv(tmp_path):
+    csv_path = tmp_path / "sample.csv"
+    csv_path.write_text(
+        "League,Season,Date,HomeTeam,AwayTeam,FTR,B365CH,B365CD,B365CA,PPIDiff\n"
+        "TestLeague,2425,2025-01-07,E,F,A,2.0,3.5,4.0,0.10\n"
+        "TestLeague,2425,2025-01-03,A,B,H,2.0,3.5,4.0,0.01\n"
+        "OtherLeague,2425,2025-01-04,C,D,H,2.5,3.5,3.0,\n",
+        encoding="utf-8",
+    )
+    return csv_path
+
+
+def _mapping():
+    return DatasetMapping(
+        home_team_col="HomeTeam",
+        away_team_col="AwayTeam",
+        date_col="Date",
+        time_col=None,
+        league_col="League",
+        season_col="Season",
+        result_col="FTR",
+        odds_home_col="B365CH",
+        odds_draw_col="B365CD",
+        odds_away_col="B365CA",
+        feature_cols=["PPIDiff"],
+    )
+
+
+def _request(**overrides):
+    base = dict(
+        season="2425",
+        selection="H",
+        staking_method="fixed",
+        fixed_stake=100,
+        starting_bankroll=1000,
+    )
+    base.update(overrides)
+    return SimulationRequest(**base)
+
+
+def test_loader_builds_sorted_frame_with_missing_features(tmp_path):
+    frame = load_match_frame_from_csv(_write_csv(tmp_path), mapping=_mapping())
+
+    assert len(frame) == 3
+    assert frame.feature_names == ["PPIDiff"]
+    assert [row.home_team for row in frame] == ["A", "C", "E"]
+    assert frame[0].kickoff == datetime(2025, 1, 3)
+    assert frame[1].features == {"PPIDiff": None}
+    assert frame[1].model_home_prob is None
+    assert frame[-1].away_win_odds == 4.0
+
+
+def test_frame_rows_materialize_to_matches(tmp_path):
+    frame = load_match_frame_from_csv(_write_csv(tmp_path), mapping=_mapping())
+    matches = frame.to_matches()
+
+    assert [m.id for m in matches] == list(frame.ids)
+    assert matches[0].features == {"PPIDiff": 0.01}
+    assert MatchFrame.from_matches(matches).to_matches() == matches
+
+
+def test_frame_slicing_and_scope_filter(tmp_path):
+    frame = load_match_frame_from_csv(_write_csv(tmp_path), mapping=_mapping())
+
+    sliced = frame[1:]
+    assert isinstance(sliced, MatchFrame)
+    assert [row.home_team for row in sliced] == ["C", "E"]
+    assert isinstance(frame[0], MatchRow)
+
+    scoped = frame.filter_scope(season="2425", leagues={"TestLeague"})
+    assert [row.home_team for row in scoped] == ["A", "E"]
+
+
+def test_engine_results_match_between_frame_and_list(tmp_path):
+    csv_path = _write_csv(tmp_path)
+    frame = load_match_frame_from_csv(csv_path, mapping=_mapping())
+    matches = frame.to_matches()
+
+    for rule in (None, "PPIDiff < 0.05", "PPIDiff is None"):
+        request = _request(rule_expression=rule)
+        from_frame = SimulationEngine(request, RuleStrategy(rule, "H")).run(frame)
+        from_list = SimulationEngine(request, RuleStrategy(rule, "H")).run(matches)
+
+        assert from_frame == from_list
+
+
+def test_load_matches_from_csv_still_returns_match_list(tmp_path):
+    matches = load_matches_from_csv(_write_csv(tmp_path), mapping=_mapping())
+
+    assert len(matches) == 3
+    assert matches[0].kickoff <= matches[1].kickoff <= matches[2].kickoff
+
+
+def test_rule_candidate_mask_over_frame_columns(tmp_path):
+    frame = load_match_frame_from_csv(_write_csv(tmp_path), mapping=_mapping())
+
+    def mask(rule, selection="H"):
+        result = RuleStrategy(rule, selection).candidate_mask(frame)
+        return None if result is None else list(result)
+
+    assert mask("PPIDiff < 0.05") == [1, 0, 0]
+    assert mask("PPIDiff is None or home_win_odds > 2.2") == [0, 1, 0]
+    assert mask(None) == [1, 1, 1]
+    assert mask(None, selection="X") == [0, 0, 0]
+    assert mask("points_diff > 1") is None
+
+
+def _random_rule(rng, depth=0):
+    atoms = ["PPIDiff", "Edge", "home_win_odds", "draw_odds", "0", "0.05", "2", "-1"]
+    if depth >= 3 or rng.random() < 0.2:
+        return rng.choice(atoms + ["None", "True"])
+
+    sub = lambda: _random_rule(rng, depth + 1)  # noqa: E731
+    kind = rng.randrange(7)
+    if kind == 0:
+        ops = rng.choices(["<", "<=", ">", ">=", "==", "!="], k=rng.randint(1, 2))
+        return "(" + sub() + "".join(f" {op} {sub()}" for op in ops) + ")"
+    if kind == 1:
+        return f"({sub()} {rng.choice(['+', '-', '*', '/', '%'])} {sub()})"
+    if kind == 2:
+        op = rng.choice([" and ", " or "])
+        return "(" + op.join(sub() for _ in range(rng.randint(2, 3))) + ")"
+    if kind == 3:
+        return f"(not {sub()})"
+    if kind == 4:
+        return f"({rng.choice(['PPIDiff', 'Edge'])} is {rng.choice(['', 'not '])}None)"
+    if kind == 5:
+        return f"{rng.choice(['min', 'max'])}({sub()}, {sub()})"
+    return f"{rng.choice(['abs', 'round'])}({sub()})"
+
+
+def test_rule_candidate_mask_matches_row_by_row_evaluation(tmp_path):
+    rng = random.Random(8)
+    lines = [
+        "League,Season,Date,HomeTeam,AwayTeam,FTR,B365CH,B365CD,B365CA,PPIDiff,Edge"
+    ]
+    for day in range(1, 29):
+        ppi = rng.choice(["", "0", "0.05", f"{rng.uniform(-0.2, 0.2):.3f}"])
+        edge = rng.choice(["", "nan", "0", f"{rng.uniform(-1, 1):.2f}"])
+        odds = rng.choice(["2.0", "3.25", "1.5"])
+        lines.append(f"L,2425,2025-02-{day:02d},A,B,H,{odds},3.5,4.0,{ppi},{edge}")
+    csv_path = tmp_path / "random.csv"
+    csv_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    mapping = _mapping().model_copy(update={"feature_cols": ["PPIDiff", "Edge"]})
+    frame = load_match_frame_from_csv(csv_path, mapping=mapping)
+
+    for _ in range(400):
+        rule = _random_rule(rng)
+        strategy = RuleStrategy(rule, "H")
+        expected = [int(strategy.evaluate(row).place_bet) for row in frame]
+        assert list(strategy.candidate_mask(frame)) == expected, rule
+
+
+def _write_league_csv(tmp_path):
+    teams = ["A", "B", "C", "D"]
+    lines = ["League,Season,Date,HomeTeam,AwayTeam,FTHG,FTAG,FTR,B365CH,B365CD,B365CA"]
+    for day in range(1, 25):
+        home, away = teams[day % 4], teams[(day + 1 + day // 4) % 4]
+        if home == away:
+            away = teams[(day + 2) % 4]
+        hg, ag = day % 3, (day * 7) % 4
+        result = "H" if hg > ag else "A" if ag > hg else "D"
+        lines.append(
+            f"L,2425,2025-01-{day:02d},{home},{away},{hg},{ag},{result},2.0,3.4,3.9"
+        )
+
+    csv_path = tmp_path / "league.csv"
+    csv_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return csv_path
+
+
+def test_rolling_columns_are_cached_and_match_live_context(tmp_path):
+    mapping = _mapping().model_copy(
+        update={"home_goals_col": "FTHG", "away_goals_col": "FTAG", "feature_cols": []}
+    )
+    frame = load_match_frame_from_csv(_write_league_csv(tmp_path), mapping=mapping)
+    matches = frame.to_matches()
+
+    def as_bytes(columns):
+        # NaN != NaN, so compare the raw float64 payloads.
+        return {name: column.tobytes() for name, column in columns.items()}
+
+    clear_rolling_cache()
+    columns = rolling_columns(frame)[5]
+    assert rolling_columns(frame.take(range(len(frame))))[5] is columns
+    assert as_bytes(columns) == as_bytes(compute_rolling_columns(frame)[5])
+    assert math.isnan(columns["home_points"][0])
+
+    multi = compute_rolling_columns(frame, (3, 5, 10))
+    assert as_bytes(multi[5]) == as_bytes(columns)
+    assert as_bytes(multi[3]) == as_bytes(compute_rolling_columns(frame, (3,))[3])
+    assert as_bytes(multi[3]) != as_bytes(columns)
+
+    for rule in (
+        "points_diff is not None and points_diff > 0",
+        "home_win_rate < 0.5",
+        "home_points_w3 is not None and home_points_w3 > away_points_w10",
+    ):
+        request = _request(rule_expression=rule)
+        from_frame = SimulationEngine(request, RuleStrategy(rule, "H")).run(frame)
+        from_list = SimulationEngine(request, RuleStrategy(rule, "H")).run(matches)
+
+        assert from_frame["total_bets"] > 0
+        assert from_frame == from_list
+
+
+def test_rolling_cache_is_bounded_by_bytes(tmp_path, monkeypatch):
+    mapping = _mapping().model_copy(
+        update={"home_goals_col": "FTHG", "away_goals_col": "FTAG", "feature_cols": []}
+    )
+    frame = load_match_frame_from_csv(_write_league_csv(tmp_path), mapping=mapping)
+    entry_bytes = len(frame) * 8 * len(ROLLING_FEATURE_NAMES)
+
+    clear_rolling_cache()
+    monkeypatch.setattr(rolling_features, "ROLLING_CACHE_BYTES", 2 * entry_bytes)
+    rolling_columns(frame, (3, 5, 10))
+
+    # Only the two most recent windows fit.
+    assert [key[1] for key in rolling_features._rolling_cache] == [5, 10]
+    assert rolling_features._rolling_cache_bytes == 2 * entry_bytes
+
+    monkeypatch.setattr(rolling_features, "ROLLING_CACHE_BYTES", entry_bytes - 1)
+    clear_rolling_cache()
+    assert rolling_columns(frame, (4,))[4]
+    assert not rolling_features._rolling_cache
+
+
+def test_rolling_cache_accounting_survives_concurrent_callers(tmp_path):
+    mapping = _mapping().model_copy(
+        update={"home_goals_col": "FTHG", "away_goals_col": "FTAG", "feature_cols": []}
+    )
+    frame = load_match_frame_from_csv(_write_league_csv(tmp_path), mapping=mapping)
+    entry_bytes = len(frame) * 8 * len(ROLLING_FEATURE_NAMES)
+
+    clear_rolling_cache()
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(
+            pool.map(lambda i: rolling_columns(frame, (3 + i % 3, 10)), range(32))
+        )
+
+    assert [sorted(result) for result in results[:3]] == [[3, 10], [4, 10], [5, 10]]
+    assert sorted(key[1] for key in rolling_features._rolling_cache) == [3, 4, 5, 10]
+    assert rolling_features._rolling_cache_bytes == 4 * entry_bytes
+
+
+def test_loader_reuses_binary_sidecar(tmp_path):
+    csv_path = _write_csv(tmp_path)
+
+    parsed = load_match_frame_from_csv(csv_path, mapping=_mapping())
+    sidecars = list(tmp_path.glob("sample.csv.*.frame"))
+    assert len(sidecars) == 1
+
+    cached = load_match_frame_from_csv(csv_path, mapping=_mapping())
+    assert isinstance(cached.kickoffs, memoryview)
+    assert cached.to_matches() == parsed.to_matches()
+    assert pickle.loads(pickle.dumps(cached)).to_matches() == parsed.to_matches()
+
+    # League/season are mapped, so their defaults don't split the sidecar.
+    load_match_frame_from_csv(
+        csv_path, mapping=_mapping(), default_league="E0", default_season="2324"
+    )
+    assert list(tmp_path.glob("sample.csv.*.frame")) == sidecars
+
+    # A different mapping gets its own sidecar; so does changed content.
+    load_match_frame_from_csv(
+        csv_path, mapping=_mapping().model_copy(update={"feature_cols": []})
+    )
+    assert len(list(tmp_path.glob("sample.csv.*.frame"))) == 2
+
+    csv_path.write_text(
+        csv_path.read_text(encoding="utf-8").replace("0.10", "0.20"),
+        encoding="utf-8",
+    )
+    reloaded = load_match_frame_from_csv(csv_path, mapping=_mapping())
+    assert reloaded[-1].features == {"PPIDiff": 0.2}
+
+    delete_sidecars(csv_path)
+    assert not list(tmp_path.glob("sample.csv.*.frame"))
+
+
+def test_loader_column_converters_handle_missing_markers(tmp_path):
+    csv_path = tmp_path / "messy.csv"
+    csv_path.write_text(
+        "League,Season,Date,HomeTeam,AwayTeam,FTR,FTHG,FTAG,B365CH,B365CD,B365CA,PPIDiff,Extra\n"
+        "L,2425,2025-01-01, A ,B,H,2,1.0,NA,3.5,0,nan,x\n"
+        "\n"
+        "L,2425,2025-01-02,C,D,D, ,null,2.5, None ,4.5, 0.25 ,y\n"
+        "L,2425,2025-01-03,E,F,A,3,0,1.9,3.1,4.2\n",
+        encoding="utf-8",
+    )
+    mapping = _mapping().model_copy(
+        update={"home_goals_col": "FTHG", "away_goals_col": "FTAG"}
+    )
+
+    frame = load_match_frame_from_csv(csv_path, mapping=mapping, use_sidecar=False)
+
+    assert len(frame) == 3
+    assert [row.home_team for row in frame] == ["A", "C", "E"]
+    assert [(row.home_goals, row.away_goals) for row in frame] == [
+        (2, 1),
+        (0, 0),
+        (3, 0),
+    ]
+    # Missing or zero odds fall back to the defaults.
+    assert [(row.home_win_odds, row.draw_odds, row.away_win_odds) for row in frame] == [
+        (2.0, 3.5, 4.0),
+        (2.5, 3.5, 4.5),
+        (1.9, 3.1, 4.2),
+    ]
+    assert [row.features["PPIDiff"] for row in frame] == [None, 0.25, None]
+
+
+def test_loader_reads_empty_csv_as_empty_frame(tmp_path):
+    empty_path = tmp_path / "empty.csv"
+    empty_path.write_text("", encoding="utf-8")
+    header_only_path = tmp_path / "header_only.csv"
+    header_only_path.write_text("Date,HomeTeam\n", encoding="utf-8")
+
+    for csv_path in (empty_path, header_only_path):
+        frame = load_match_frame_from_csv(csv_path, mapping=_mapping())
+        assert len(frame) == 0
+        assert load_matches_from_csv(csv_path, mapping=_mapping()) == []
+        assert list(iter_match_frames_from_csv(csv_path, _mapping())) == []
+
+    # Missing required columns still fail once there are rows.
+    header_only_path.write_text("Date,HomeTeam\n2025-01-01,A\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="not found in dataset"):
+        load_match_frame_from_csv(header_only_path, mapping=_mapping())
+
+
+def test_loader_kickoff_parsing_matches_formats_and_fallbacks(tmp_path):
+    csv_path = tmp_path / "dates.csv"
+    csv_path.write_text(
+        "Date,Time,HomeTeam,AwayTeam,FTR\n"
+        "03/01/2025,15:00,A,B,H\n"
+        "03/01/2025,15:00,C,D,A\n"
+        "4/1/2025,9:30,E,F,D\n"
+        "05/01/2025,,G,H,H\n",
+        encoding="utf-8",
+    )
+    mapping = DatasetMapping(
+        home_team_col="HomeTeam",
+        away_team_col="AwayTeam",
+        date_col="Date",
+        time_col="Time",
+        result_col="FTR",
+        date_format="%d/%m/%Y",
+        time_format="%H:%M",
+    )
+
+    frame = load_match_frame_from_csv(csv_path, mapping=mapping, use_sidecar=False)
+
+    assert [row.kickoff for row in frame] == [
+        datetime(2025, 1, 3, 15, 0),
+        datetime(2025, 1, 3, 15, 0),
+        datetime(2025, 1, 4, 9, 30),
+        datetime(2025, 1, 5, 0, 0),
+    ]
+
+    csv_path.write_text(
+        "Date,Time,HomeTeam,AwayTeam,FTR\n"
+        "2025-01-03,15:00:30,A,B,H\n"
+        "2025-01-02,TBC,C,D,A\n"
+        "2025-01-04T12:00,,E,F,D\n",
+        encoding="utf-8",
+    )
+    iso_mapping = mapping.model_copy(update={"date_format": None, "time_format": None})
+
+    frame = load_match_frame_from_csv(csv_path, mapping=iso_mapping, use_sidecar=False)
+
+    assert [row.kickoff for row in frame] == [
+        datetime(2025, 1, 2, 0, 0),
+        datetime(2025, 1, 3, 15, 0, 30),
+        datetime(2025, 1, 4, 12, 0),
+    ]
+
+    csv_path.write_text(
+        "Date,Time,HomeTeam,AwayTeam,FTR\n2025-02-30,15:00,A,B,H\n",
+        encoding="utf-8",
+    )
+    with pytest.raises(ValueError):
+        load_match_frame_from_csv(csv_path, mapping=iso_mapping, use_sidecar=False)
+
+
+def test_loader_match_ids_are_stable_per_file_and_row(tmp_path):
+    csv_path = _write_csv(tmp_path)
+
+    frame = load_match_frame_from_csv(csv_path, mapping=_mapping())
+    reparsed = load_match_frame_from_csv(
+        csv_path, mapping=_mapping(), use_sidecar=False
+    )
+    cached = load_match_frame_from_csv(csv_path, mapping=_mapping())
+
+    ids = list(frame.ids)
+    assert all(type(value) is int and 0 <= value < 1 << 63 for value in ids)
+    assert list(reparsed.ids) == ids
+    assert list(cached.ids) == ids
+    # Kickoff-sorted, so file rows 1, 2, 0.
+    assert [value - min(ids) for value in ids] == [1, 2, 0]
+
+    other = tmp_path / "other.csv"
+    other.write_text(
+        csv_path.read_text(encoding="utf-8").replace("0.10", "0.20"),
+        encoding="utf-8",
+    )
+    other_ids = set(load_match_frame_from_csv(other, mapping=_mapping()).ids)
+    assert other_ids.isdisjoint(ids)
+
+
+def _write_shuffled_csv(tmp_path, rows=60):
+    csv_path = tmp_path / "shuffled.csv"
+    teams = "ABCDEFGH"
+    lines = ["League,Season,Date,HomeTeam,AwayTeam,FTR,B365CH,B365CD,B365CA,PPIDiff"]
+    for i in range(rows):
+        # Several rows per date, dates out of order.
+        day = 1 + (i * 7) % 20
+        home, away = teams[i % 8], teams[(i + 3) % 8]
+        lines.append(
+            f"TestLeague,2425,2025-01-{day:02d},{home},{away},{'HDA'[i % 3]},"
+            f"{1.5 + (i % 5) / 4},3.5,4.0,{(i % 9 - 4) / 10}"
+        )
+    csv_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return csv_path
+
+
+def _columns(frames):
+    return [
+        (row.id, row.kickoff, row.home_team, row.away_team, row.features)
+        for frame in frames
+        for row in frame
+    ]
+
+
+def test_streaming_loader_matches_in_memory_order(tmp_path):
+    csv_path = _write_shuffled_csv(tmp_path)
+    expected = _columns([load_match_frame_from_csv(csv_path, mapping=_mapping())])
+
+    for run_rows in (7, 1000):
+        batches = list(
+            iter_match_frames_from_csv(
+                csv_path,
+                mapping=_mapping(),
+                run_rows=run_rows,
+                batch_rows=5,
+                spill_dir=tmp_path,
+            )
+        )
+        assert all(len(batch) <= 5 for batch in batches)
+        assert _columns(batches) == expected
+
+    # Already sorted input is concatenated rather than merged.
+    sorted_path = tmp_path / "sorted.csv"
+    header, *lines = csv_path.read_text(encoding="utf-8").splitlines()
+    lines.sort(key=lambda line: line.split(",")[2])
+    sorted_path.write_text("\n".join([header, *lines]) + "\n", encoding="utf-8")
+    expected = _columns([load_match_frame_from_csv(sorted_path, mapping=_mapping())])
+    assert (
+        _columns(
+            iter_match_frames_from_csv(sorted_path, mapping=_mapping(), run_rows=7)
+        )
+        == expected
+    )
+    assert not list(tmp_path.glob("matches-sort-*"))
+
+
+def test_engine_runs_streamed_batches_like_whole_frame(tmp_path):
+    csv_path = _write_shuffled_csv(tmp_path)
+    request = _request(
+        multiple_legs=2,
+        rule_expression="PPIDiff > 0 and points_diff >= 0",
+    )
+
+    def run_engine(run):
+        strategy = RuleStrategy(request.rule_expression, request.selection)
+        return run(SimulationEngine(request, strategy))
+
+    expected = run_engine(
+        lambda engine: engine.run(load_match_frame_from_csv(csv_path, _mapping()))
+    )
+    streamed = run_engine(
+        lambda engine: engine.run_batches(
+            iter_match_frames_from_csv(
+                csv_path, _mapping(), run_rows=9, batch_rows=4, spill_dir=tmp_path
+            )
+        )
+    )
+
+    assert expected["total_bets"] > 0
+    assert streamed == expected
+
+
+def test_rule_strategy_reads_frame_rows_without_building_features(
+    tmp_path, monkeypatch
+):
+    frame = load_match_frame_from_csv(_write_csv(tmp_path), mapping=_mapping())
+    strategy = RuleStrategy("PPIDiff > 0.05 and home_win_odds >= 2", "H")
+    expected = [strategy.evaluate(m).place_bet for m in frame.to_matches()]
+
+    def no_features(row):
+        raise AssertionError("MatchRow.features built")
+
+    monkeypatch.setattr(MatchRow, "features", property(no_features))
+
+    assert [strategy.evaluate(row).place_bet for row in frame] == expected
+    assert expected == [False, False, True]
@@ -1,8 +1,31 @@
+import random
 import uuid
 from datetime import datetime
-
-from app.domain.simulation.engine import SimulationEngine
+from itertools import combinations
+
+import pytest
+
+from app.domain.simulation.context import (
+    ROLLING_FEATURE_NAMES,
+    RollingContext,
+    split_rolling_name,
+)
+from app.domain.simulation.engine import (
+    ActiveBetBook,
+    Bet,
+    ComboBuilder,
+    SimulationEngine,
+    build_valid_combo,
+    settle_matured_bets,
+)
+from app.domain.simulation.ledger import DecisionLedger, ReplayStrategy
 from app.domain.simulation.models import SimulationRequest
+from app.domain.simulation.rules import (
+    RuleCompileError,
+    clear_rule_cache,
+    compile_rule,
+    rule_cache_info,
+)
 from app.domain.simulation.strategy import RuleStrategy
 
 
@@ -125,6 +148,145 @@ def test_rule_strategy_with_expression_filters_matches():
     assert result["bets"][0]["legs"][0]["selection"] == "D"
 
 
+def test_compiled_rule_binds_used_names_positionally():
+    compiled = compile_rule("abs(PPIDiff) < 0.1 and home_win_odds > 1.5")
+
+    assert compiled.arg_names == ("PPIDiff", "home_win_odds")
+    assert compiled.positional(-0.05, 2.0) is True
+    assert compiled.func({"PPIDiff": 0.2, "home_win_odds": 2.0}) is False
+    with pytest.raises(NameError):
+        compiled.func({"home_win_odds": 2.0})
+
+    with pytest.raises(RuleCompileError):
+        compile_rule("__import__('os')")
+
+
+def test_compile_rule_is_cached_by_expression_text():
+    clear_rule_cache()
+
+    first = compile_rule("PPIDiff < 0.1")
+    again = compile_rule("PPIDiff < 0.1  ")
+    RuleStrategy("PPIDiff < 0.1", selection="H")
+
+    assert again is first
+    assert isinstance(first.used_names, frozenset)
+    info = rule_cache_info()
+    assert (info.hits, info.misses) == (2, 1)
+
+    with pytest.raises(RuleCompileError):
+        compile_rule("  PPIDiff < 0.1")
+
+
+def test_rule_strategy_missing_name_only_fails_when_reached():
+    match = FakeMatch(
+        result="H",
+        kickoff=datetime(2025, 1, 1, 15, 0),
+        features={"PPIDiff": 0.05},
+    )
+
+    short_circuit = RuleStrategy("PPIDiff < 0.1 or Unknown > 1", selection="H")
+    reached = RuleStrategy("PPIDiff > 0.1 or Unknown > 1", selection="H")
+    overridden = RuleStrategy("home_win_odds > 5", selection="H")
+    match.features["home_win_odds"] = 6.0
+
+    assert short_circuit.evaluate(match).place_bet is True
+    assert reached.evaluate(match).place_bet is False
+    assert overridden.evaluate(match).place_bet is True
+
+
+def test_rule_strategy_only_reads_rolling_features_it_uses():
+    context = RollingContext()
+    first = FakeMatch(
+        result="H", kickoff=datetime(2025, 1, 1), home_team="A", away_team="B"
+    )
+    second = FakeMatch(
+        result="D", kickoff=datetime(2025, 1, 8), home_team="A", away_team="C"
+    )
+    context.update(first)
+
+    assert context.features_for_match(second, ["points_diff", "home_points"]) == {
+        "points_diff": None,
+        "home_points": 3,
+    }
+    assert set(context.features_for_match(second)) == set(ROLLING_FEATURE_NAMES)
+
+    assert RuleStrategy("home_points >= 3", selection="H").uses_context is True
+    assert RuleStrategy("home_win_odds > 1", selection="H").uses_context is False
+    assert RuleStrategy(None, selection="H").uses_context is False
+    assert (
+        RuleStrategy("home_points >= 3", selection="H")
+        .evaluate(second, context=context)
+        .place_bet
+        is True
+    )
+
+
+def test_rolling_context_running_sums_match_recomputed_window():
+    rng = random.Random(11)
+    teams = ["A", "B", "C", "D"]
+    context = RollingContext(window_size=3)
+    history = {team: [] for team in teams}
+
+    for day in range(40):
+        home, away = rng.sample(teams, 2)
+        match = FakeMatch(
+            result=rng.choice("HDA"),
+            kickoff=datetime(2025, 1, 1),
+            home_team=home,
+            away_team=away,
+        )
+        match.home_goals, match.away_goals = rng.randint(0, 4), rng.randint(0, 4)
+        context.update(match)
+
+        margin = match.home_goals - match.away_goals
+        home_points = {"H": 3, "D": 1}.get(match.result, 0)
+        away_points = {"A": 3, "D": 1}.get(match.result, 0)
+        history[home].append((match.result == "H", home_points, margin))
+        history[away].append((match.result == "A", away_points, -margin))
+
+        for team in teams:
+            window = history[team][-3:]
+            if not window:
+                assert context.points(team) is None
+                continue
+            assert context.win_rate(team) == sum(w for w, _, _ in window) / len(window)
+            assert context.points(team) == sum(p for _, p, _ in window)
+            assert context.goal_diff(team) == sum(g for _, _, g in window)
+
+
+def test_rolling_context_tracks_extra_windows_in_one_pass():
+    rng = random.Random(5)
+    teams = ["A", "B", "C"]
+    combined = RollingContext(window_size=5, extra_windows=(2, 10))
+    single = {w: RollingContext(window_size=w) for w in (2, 5, 10)}
+
+    for _ in range(30):
+        home, away = rng.sample(teams, 2)
+        match = FakeMatch(
+            result=rng.choice("HDA"),
+            kickoff=datetime(2025, 1, 1),
+            home_team=home,
+            away_team=away,
+        )
+        features = combined.features_for_match(
+            match, ["points_diff", "points_diff_w2", "home_win_rate_w10", "x_w2"]
+        )
+        assert features == {
+            "points_diff": single[5].features_for_match(match)["points_diff"],
+            "points_diff_w2": single[2].features_for_match(match)["points_diff"],
+            "home_win_rate_w10": single[10].win_rate(home),
+        }
+
+        combined.update(match)
+        for context in single.values():
+            context.update(match)
+
+    strategy = RuleStrategy("points_diff_w10 > home_points_w3", selection="H")
+    assert strategy.uses_context is True
+    assert strategy.rolling_windows == {3, 10}
+    assert split_rolling_name("points_diff_w0") is None
+
+
 def test_fixed_singles_all_wins():
     matches = [
         FakeMatch(result="H", kickoff=datetime(2025, 1, 1, 15, 0)),
@@ -198,3 +360,232 @@ def test_min_odds_filters_out_short_prices():
 
     assert result["total_bets"] == 1
     assert len(result["bets"]) == 1
+
+
+def test_active_bet_book_pops_only_matured_bets_in_placement_order():
+    early = datetime(2025, 1, 1, 15, 0)
+    late = datetime(2025, 1, 3, 15, 0)
+
+    def make_bet(settles_at):
+        match = FakeMatch(result="H", kickoff=settles_at)
+        return Bet(
+            matches=[match],
+            stake=10,
+            combined_odds=2.0,
+            settles_at=settles_at,
+            selections={match.id: "H"},
+        )
+
+    first_late = make_bet(late)
+    first_early = make_bet(early)
+    second_early = make_bet(early)
+
+    book = ActiveBetBook()
+    for bet in (first_late, first_early, second_early):
+        book.add(bet)
+
+    assert book.pop_matured(datetime(2025, 1, 2)) == [first_early, second_early]
+    assert len(book) == 1
+
+    team_locks = {team: True for team in first_late.teams}
+    bankroll, settled = settle_matured_bets(book, late, 0, team_locks)
+
+    assert [b.matches for b in settled] == [first_late.matches]
+    assert bankroll == 20
+    assert team_locks == {}
+    assert len(book) == 0
+
+
+def test_summary_mode_matches_full_metrics_without_bets():
+    matches = [
+        FakeMatch(result="H", kickoff=datetime(2025, 1, 1, 15, 0)),
+        FakeMatch(result="A", kickoff=datetime(2025, 1, 1, 15, 0)),
+        FakeMatch(result="H", kickoff=datetime(2025, 1, 2, 15, 0)),
+        FakeMatch(result="D", kickoff=datetime(2025, 1, 3, 15, 0)),
+    ]
+
+    request = make_request(selection="H", staking_method="percent", percent_stake=0.1)
+
+    full = SimulationEngine(request, RuleStrategy(None, "H")).run(matches)
+    summary = SimulationEngine(
+        request, RuleStrategy(None, "H"), result_mode="summary"
+    ).run(matches)
+
+    assert summary["bets"] == []
+    assert summary["equity_curve"] == []
+    assert len(full["bets"]) == 4
+
+    for key in (
+        "final_bankroll",
+        "max_drawdown_percent",
+        "total_bets",
+        "total_wins",
+        "total_losses",
+        "roi_percent",
+        "strike_rate_percent",
+        "profit_factor",
+        "total_staked",
+        "total_profit",
+    ):
+        assert summary[key] == full[key]
+
+
+def test_feed_in_chunks_matches_single_run():
+    kickoffs = [
+        datetime(2025, 1, 1, 15, 0),
+        datetime(2025, 1, 1, 15, 0),
+        datetime(2025, 1, 1, 15, 0),
+        datetime(2025, 1, 2, 15, 0),
+        datetime(2025, 1, 3, 15, 0),
+    ]
+    matches = [
+        FakeMatch(result=result, kickoff=kickoff, features={"PPIDiff": 0.05})
+        for result, kickoff in zip("HAHDH", kickoffs)
+    ]
+
+    request = make_request(selection="H", multiple_legs=2)
+
+    expected = SimulationEngine(request, RuleStrategy(None, "H")).run(matches)
+
+    engine = SimulationEngine(request, RuleStrategy(None, "H"))
+    # Split the first kickoff across two chunks.
+    engine.feed(matches[:2])
+    engine.feed(iter(matches[2:4]))
+    engine.feed(matches[4:])
+
+    assert engine.close() == expected
+
+
+def test_snapshot_reports_progress_before_close():
+    matches = [
+        FakeMatch(result="H", kickoff=datetime(2025, 1, 1, 15, 0)),
+        FakeMatch(result="A", kickoff=datetime(2025, 1, 2, 15, 0)),
+        FakeMatch(result="H", kickoff=datetime(2025, 1, 3, 15, 0)),
+    ]
+
+    request = make_request(selection="H", fixed_stake=100)
+    engine = SimulationEngine(request, RuleStrategy(None, "H"))
+
+    engine.feed(matches[:2])
+    snapshot = engine.snapshot()
+
+    # The second kickoff is held back until a later kickoff arrives.
+    assert snapshot["matches_processed"] == 1
+    assert snapshot["open_bets"] == 1
+    assert snapshot["open_stake"] == 100
+    assert snapshot["total_bets"] == 0
+
+    engine.feed(matches[2:])
+    snapshot = engine.snapshot()
+    assert snapshot["matches_processed"] == 2
+    assert snapshot["total_bets"] == 1
+    assert snapshot["total_wins"] == 1
+
+    result = engine.close()
+    assert result["total_bets"] == 3
+
+    with pytest.raises(RuntimeError):
+        engine.feed(matches)
+
+
+def _brute_force_combo(eligible, legs):
+    for candidate in combinations(eligible, legs):
+        teams = [
+            team
+            for match, _ in candidate
+            for team in (match.home_team, match.away_team)
+        ]
+        if len(teams) == len(set(teams)):
+            return list(candidate)
+    return None
+
+
+def test_combo_builder_matches_first_valid_combination():
+    rng = random.Random(7)
+    kickoff = datetime(2025, 1, 4, 15, 0)
+
+    for _ in range(200):
+        teams = [f"T{i}" for i in range(rng.randint(3, 9))]
+        eligible = []
+        for _ in range(rng.randint(0, 10)):
+            home, away = rng.sample(teams, 2)
+            match = FakeMatch(
+                result="H", kickoff=kickoff, home_team=home, away_team=away
+            )
+            eligible.append((match, "H"))
+
+        legs = rng.randint(2, 4)
+        assert build_valid_combo(eligible, legs) == _brute_force_combo(eligible, legs)
+
+
+def test_combo_builder_removes_used_candidates_and_supports_greedy_mode():
+    kickoff = datetime(2025, 1, 4, 15, 0)
+    a_b = (FakeMatch(result="H", kickoff=kickoff, home_team="A", away_team="B"), "H")
+    b_c = (FakeMatch(result="H", kickoff=kickoff, home_team="B", away_team="C"), "H")
+    c_d = (FakeMatch(result="H", kickoff=kickoff, home_team="C", away_team="D"), "H")
+    e_f = (FakeMatch(result="H", kickoff=kickoff, home_team="E", away_team="F"), "H")
+
+    builder = ComboBuilder(3)
+    builder.extend([b_c, a_b, c_d, e_f])
+
+    keys = builder.find()
+    assert builder.candidates(keys) == [a_b, c_d, e_f]
+
+    builder.remove(keys)
+    assert len(builder) == 1
+    assert builder.find() is None
+
+    greedy = ComboBuilder(3, mode="greedy")
+    greedy.extend([b_c, a_b, c_d, e_f])
+    # Greedy keeps B-C, so A-B and C-D conflict and no 3-leg combo is found.
+    assert greedy.find() is None
+
+
+def test_multiple_legs_skips_conflicting_teams():
+    kickoff = datetime(2025, 1, 4, 15, 0)
+    matches = [
+        FakeMatch(result="H", kickoff=kickoff, home_team="A", away_team="B"),
+        FakeMatch(result="H", kickoff=kickoff, home_team="B", away_team="C"),
+        FakeMatch(result="H", kickoff=kickoff, home_team="D", away_team="E"),
+    ]
+
+    request = make_request(selection="H", multiple_legs=2)
+    result = SimulationEngine(request, RuleStrategy(None, "H")).run(matches)
+
+    assert result["total_bets"] == 1
+    legs = result["bets"][0]["legs"]
+    assert [(leg["home_team"], leg["away_team"]) for leg in legs] == [
+        ("A", "B"),
+        ("D", "E"),
+    ]
+
+
+def test_ledger_replay_matches_rule_strategy_for_staking_variants():
+    teams = ["A", "B", "C", "D"]
+    matches = []
+    for day in range(1, 15):
+        home, away = teams[day % 4], teams[(day + 1) % 4]
+        matches.append(
+            FakeMatch(
+                result="HAD"[day % 3],
+                kickoff=datetime(2025, 1, day, 15, 0),
+                home_team=home,
+                away_team=away,
+                home_win_odds=1.5 + (day % 4) * 0.5,
+            )
+        )
+
+    rule = "home_points is not None and home_points >= 3"
+    ledger = DecisionLedger.record(RuleStrategy(rule, "H"), matches)
+
+    for overrides in (
+        {"fixed_stake": 50},
+        {"staking_method": "percent", "percent_stake": 0.2},
+        {"min_odds": 2.0},
+    ):
+        request = make_request(selection="H", rule_expression=rule, **overrides)
+
+        direct = SimulationEngine(request, RuleStrategy(rule, "H")).run(matches)
+        replayed = SimulationEngine(request, ReplayStrategy(ledger)).run(matches)
+
+        assert replayed == direct
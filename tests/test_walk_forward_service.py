@@ -51,3 +51,28 @@ def test_walk_forward_runs_multiple_segments():
     assert result["total_segments"] == 4
     assert len(result["segments"]) == 4
     assert result["total_bets"] == 20
+
+
+def test_walk_forward_consumes_generators_like_lists():
+    results = "HAHDHHAHDAHHDHAAHHDHHAHDHAHHDA"
+    for step in (3, 4, 12):
+        config = SimulationRequest(
+            season="2025",
+            selection="H",
+            staking_method="fixed",
+            fixed_stake=100,
+            starting_bankroll=1000,
+            walk_forward=True,
+            train_window_matches=6,
+            test_window_matches=4,
+            step_matches=step,
+        )
+        matches = [FakeMatch(i, result=r) for i, r in enumerate(results)]
+
+        expected = WalkForwardService().run(matches, config, result_mode="full")
+        streamed = WalkForwardService().run(
+            (m for m in matches), config, result_mode="full"
+        )
+
+        assert expected["total_segments"] > 1
+        assert streamed == expected
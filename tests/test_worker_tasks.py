@@ -0,0 +1,96 @@
+import uuid
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+pytest.importorskip("celery")
+
+from api.routes.jobs import enqueue_job  # noqa: E402
+from app.application.dataset_mapping import DatasetMapping  # noqa: E402
+from app.application.dataset_simulation_models import (  # noqa: E402
+    DatasetSimulateRequest,
+)
+from app.application.job_service import JobService  # noqa: E402
+from app.domain.simulation.models import SimulationRequest  # noqa: E402
+from app.infrastructure.persistence_models.dataset import Dataset  # noqa: E402
+from app.infrastructure.repositories.job_repository import JobRepository  # noqa: E402
+from worker import tasks  # noqa: E402
+
+
+def test_job_submitted_through_celery_task_runs_to_completion(
+    db_session, tmp_path, monkeypatch
+):
+    # As with CELERY_TASK_ALWAYS_EAGER=true: delay() runs the task inline.
+    monkeypatch.setattr(tasks.celery_app.conf, "task_always_eager", True)
+    monkeypatch.setattr(tasks.celery_app.conf, "task_eager_propagates", True)
+    monkeypatch.setattr(tasks, "SessionLocal", sessionmaker(bind=db_session.get_bind()))
+
+    csv_path = tmp_path / "sample.csv"
+    csv_path.write_text(
+        "League,Season,Date,HomeTeam,AwayTeam,FTR,B365CH,B365CD,B365CA\n"
+        "TestLeague,2425,2025-01-03,A,B,H,2.0,3.5,4.0\n"
+        "TestLeague,2425,2025-01-04,C,D,H,2.0,3.5,4.0\n",
+        encoding="utf-8",
+    )
+    owner_id = uuid.uuid4()
+    ds = Dataset(
+        owner_user_id=owner_id,
+        original_filename="sample.csv",
+        stored_path=str(csv_path),
+    )
+    db_session.add(ds)
+    db_session.commit()
+
+    statuses = []
+    original_create = JobRepository.create
+    original_update = JobRepository.update
+
+    def record_create(self, job):
+        job = original_create(self, job)
+        statuses.append(job.status)
+        return job
+
+    def record_update(self, job, **fields):
+        job = original_update(self, job, **fields)
+        if "status" in fields:
+            statuses.append(job.status)
+        return job
+
+    monkeypatch.setattr(JobRepository, "create", record_create)
+    monkeypatch.setattr(JobRepository, "update", record_update)
+
+    job = JobService(db_session, enqueue=enqueue_job).submit_simulation(
+        dataset_id=ds.id,
+        owner_user_id=owner_id,
+        payload=DatasetSimulateRequest(
+            mapping=DatasetMapping(
+                home_team_col="HomeTeam",
+                away_team_col="AwayTeam",
+                date_col="Date",
+                time_col=None,
+                league_col="League",
+                season_col="Season",
+                result_col="FTR",
+                odds_home_col="B365CH",
+                odds_draw_col="B365CD",
+                odds_away_col="B365CA",
+            ),
+            request=SimulationRequest(
+                league="TestLeague",
+                season="2425",
+                selection="H",
+                staking_method="fixed",
+                fixed_stake=100,
+                starting_bankroll=1000,
+            ),
+            persist=False,
+        ),
+    )
+
+    assert statuses == ["queued", "running", "succeeded"]
+
+    db_session.expire_all()
+    stored = JobService(db_session).get_job(job_id=job.id, owner_user_id=owner_id)
+    assert stored.status == "succeeded"
+    assert stored.progress_percent == 100.0
+    assert stored.result_json["total_bets"] == 2
@@ -1,12 +1,31 @@
+from uuid import UUID
+
 from celery import Celery
 
+import app.infrastructure.db.models  # noqa: F401
+from app.application.job_service import JobService
+from app.core.settings import settings
+from app.infrastructure.db.session import SessionLocal
+
 celery_app = Celery(
     "worker",
-    broker="redis://redis:6379/0",
-    backend="redis://redis:6379/0",
+    broker=settings.redis_url,
+    backend=settings.redis_url,
 )
+celery_app.conf.task_always_eager = settings.celery_task_always_eager
 
 
 @celery_app.task
 def test_task():
     return "Worker is alive"
+
+
+@celery_app.task(name="jobs.run")
+def run_job(job_id: str):
+    db = SessionLocal()
+    try:
+        # Task arguments arrive as strings; the jobs table keys on UUIDs.
+        job = JobService(db).run_job(UUID(job_id))
+        return {"job_id": job_id, "status": job.status}
+    finally:
+        db.close()